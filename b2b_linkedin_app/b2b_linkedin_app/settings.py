@@ -1,7 +1,7 @@
 import os
 import logging
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from django.templatetags.static import static
 
 
@@ -23,12 +23,21 @@ ALLOWED_HOSTS = []
 
 #HUNTER API KEY
 HUNTER_API_KEY = config('HUNTER_API_KEY', cast=str, default=None)
+HUNTER_TIMEOUT = config('HUNTER_TIMEOUT', cast=int, default=10)
+HUNTER_POOL_SIZE = config('HUNTER_POOL_SIZE', cast=int, default=10)
+HUNTER_CACHE_TTL = config('HUNTER_CACHE_TTL', cast=int, default=30 * 24 * 3600)  # found emails
+HUNTER_NEGATIVE_CACHE_TTL = config('HUNTER_NEGATIVE_CACHE_TTL', cast=int, default=7 * 24 * 3600)  # "no email"
+HUNTER_COOLDOWN_SECONDS = config('HUNTER_COOLDOWN_SECONDS', cast=int, default=60)  # after a 429 without Retry-After
+HUNTER_QUOTA_COOLDOWN_SECONDS = config('HUNTER_QUOTA_COOLDOWN_SECONDS', cast=int, default=6 * 3600)  # after 402/403
 
 #-----------------------------
 #     MailGun SETTINGS 
 #-----------------------------
 MAILGUN_DOMAIN=config('MAILGUN_DOMAIN', cast=str, default=None)
 MAILGUN_API_KEY=config('MAILGUN_API_KEY', cast=str, default=None)
+MAILGUN_TIMEOUT = config('MAILGUN_TIMEOUT', cast=int, default=15)  # seconds per API call
+MAILGUN_BATCH_SIZE = config('MAILGUN_BATCH_SIZE', cast=int, default=1000)  # recipients per call (Mailgun max 1000)
+MAILGUN_POOL_SIZE = config('MAILGUN_POOL_SIZE', cast=int, default=10)
 
 #APP
 INSTALLED_APPS = [
@@ -170,6 +179,44 @@ LINKEDIN_SEARCH_URL = config('LINKEDIN_SEARCH_URL', cast=str, default="https://a
 EMAIL = config('EMAIL', cast=str)
 PASSWORD = config('PASSWORD', cast=str)
 
+# =========================
+# CHROME DRIVER POOL
+# =========================
+DRIVER_POOL_ENABLED = config('DRIVER_POOL_ENABLED', cast=bool, default=True)
+DRIVER_POOL_SIZE = config('DRIVER_POOL_SIZE', cast=int, default=2)  # warm drivers kept per worker process (search + domain lookups)
+DRIVER_POOL_IDLE_TIMEOUT = config('DRIVER_POOL_IDLE_TIMEOUT', cast=int, default=900)  # seconds
+DRIVER_POOL_MAX_AGE = config('DRIVER_POOL_MAX_AGE', cast=int, default=3600)  # seconds
+DRIVER_POOL_MAX_LEASES = config('DRIVER_POOL_MAX_LEASES', cast=int, default=25)
+
+# Company domain lookups run on a dedicated driver in a background thread
+DOMAIN_RESOLVER_ENABLED = config('DOMAIN_RESOLVER_ENABLED', cast=bool, default=True)
+DOMAIN_RESOLVER_TIMEOUT = config('DOMAIN_RESOLVER_TIMEOUT', cast=int, default=90)  # seconds to wait for one lookup
+
+# Company -> domain results shared across requests (stored in the default cache)
+DOMAIN_CACHE_TTL = config('DOMAIN_CACHE_TTL', cast=int, default=30 * 24 * 3600)  # found domains
+DOMAIN_CACHE_NEGATIVE_TTL = config('DOMAIN_CACHE_NEGATIVE_TTL', cast=int, default=24 * 3600)  # "no domain found"
+
+# Per-domain email patterns learned from Hunter domain-search and delivered mail
+EMAIL_PATTERN_TTL = config('EMAIL_PATTERN_TTL', cast=int, default=30 * 24 * 3600)
+EMAIL_PATTERN_MIN_CONFIDENCE = config('EMAIL_PATTERN_MIN_CONFIDENCE', cast=int, default=60)  # below this Hunter email-finder is asked
+EMAIL_PATTERN_DOMAIN_SEARCH = config('EMAIL_PATTERN_DOMAIN_SEARCH', cast=bool, default=True)  # one domain-search per unknown domain
+
+# MX / SMTP RCPT verification of guessed domains and emails (needs dnspython)
+EMAIL_VERIFY_ENABLED = config('EMAIL_VERIFY_ENABLED', cast=bool, default=True)
+EMAIL_VERIFY_SMTP_PROBE = config('EMAIL_VERIFY_SMTP_PROBE', cast=bool, default=False)  # RCPT probing needs outbound port 25
+EMAIL_VERIFY_NAMESERVERS = config('EMAIL_VERIFY_NAMESERVERS', cast=Csv(), default='')  # empty = system resolver
+EMAIL_VERIFY_DNS_PORT = config('EMAIL_VERIFY_DNS_PORT', cast=int, default=53)
+EMAIL_VERIFY_SMTP_PORT = config('EMAIL_VERIFY_SMTP_PORT', cast=int, default=25)
+EMAIL_VERIFY_CONCURRENCY = config('EMAIL_VERIFY_CONCURRENCY', cast=int, default=20)
+EMAIL_VERIFY_TIMEOUT = config('EMAIL_VERIFY_TIMEOUT', cast=int, default=5)  # seconds per DNS / SMTP step
+EMAIL_VERIFY_MX_CACHE_TTL = config('EMAIL_VERIFY_MX_CACHE_TTL', cast=int, default=24 * 3600)
+EMAIL_VERIFY_HELO_HOST = config('EMAIL_VERIFY_HELO_HOST', default=None)
+EMAIL_VERIFY_MAIL_FROM = config('EMAIL_VERIFY_MAIL_FROM', default='')  # empty = null sender
+
+# Profiles yielded by the search are saved in bulk, one batch per page at most
+PARSING_SAVE_BATCH_SIZE = config('PARSING_SAVE_BATCH_SIZE', cast=int, default=10)
+PARSING_SAVE_FLUSH_INTERVAL = config('PARSING_SAVE_FLUSH_INTERVAL', cast=int, default=30)  # seconds before a partial batch is saved and exported
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -321,6 +368,16 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', cast=str, default=None)
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', cast=str, default=None)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', cast=str, default=None)
+SMTP_MESSAGES_PER_CONNECTION = config('SMTP_MESSAGES_PER_CONNECTION', cast=int, default=100)  # reconnect after this many messages
+OUTREACH_STRATEGY = config('OUTREACH_STRATEGY', default='round_robin')  # 'round_robin' or 'weighted' (by read rate)
+OUTREACH_BATCH_SIZE = config('OUTREACH_BATCH_SIZE', cast=int, default=100)  # messages per smtp_send_mail_batch task
+
+# Outgoing mail is queued per recipient domain and released by the dispatch_mail_queue tick
+MAIL_DISPATCH_ENABLED = config('MAIL_DISPATCH_ENABLED', cast=bool, default=True)
+MAIL_DISPATCH_TICK_SECONDS = config('MAIL_DISPATCH_TICK_SECONDS', cast=int, default=10)
+MAIL_DISPATCH_DOMAIN_PER_MINUTE = config('MAIL_DISPATCH_DOMAIN_PER_MINUTE', cast=int, default=6)  # per recipient domain
+MAIL_DISPATCH_DOMAIN_BURST = config('MAIL_DISPATCH_DOMAIN_BURST', cast=int, default=2)  # per domain per tick
+MAIL_DISPATCH_GLOBAL_PER_MINUTE = config('MAIL_DISPATCH_GLOBAL_PER_MINUTE', cast=int, default=300)
 
 
 # =========================
@@ -332,8 +389,27 @@ GSHEET_SPREADSHEET_ID = "10reLINkOiYPSfMaWoF7MSd4doXNKk0X3skbJzij8s3E"
 # Google Sheets Export Settings
 GSHEET_EXPORT_ENABLED = config('GSHEET_EXPORT_ENABLED', cast=bool, default=True)
 GSHEET_BATCH_SIZE = config('GSHEET_BATCH_SIZE', cast=int, default=10)
+GSHEET_EXPORT_MODE = config('GSHEET_EXPORT_MODE', default='upsert')  # 'upsert' (keyed by profile URL) or 'append'
+GSHEET_SHARD_BY = config('GSHEET_SHARD_BY', default='request')  # 'request', 'month' or 'none' (everything on sheet1)
+GSHEET_SHARD_MAX_ROWS = config('GSHEET_SHARD_MAX_ROWS', cast=int, default=50000)  # rows before rolling over to a new worksheet
+
+# Export outbox: saved profiles are queued per destination and drained in bulk
+EXPORT_OUTBOX_DESTINATIONS = config('EXPORT_OUTBOX_DESTINATIONS', cast=Csv(), default='sheets')
+EXPORT_OUTBOX_BATCH_SIZE = config('EXPORT_OUTBOX_BATCH_SIZE', cast=int, default=500)
+EXPORT_OUTBOX_MAX_BATCHES = config('EXPORT_OUTBOX_MAX_BATCHES', cast=int, default=20)  # per drain run
+EXPORT_OUTBOX_MAX_ATTEMPTS = config('EXPORT_OUTBOX_MAX_ATTEMPTS', cast=int, default=5)
+EXPORT_OUTBOX_CLAIM_TIMEOUT = config('EXPORT_OUTBOX_CLAIM_TIMEOUT', cast=int, default=600)  # seconds before a stuck in_progress row is requeued
+EXPORT_STREAM_CHUNK_SIZE = config('EXPORT_STREAM_CHUNK_SIZE', cast=int, default=2000)  # rows per server-side cursor fetch
 GSHEET_RETRY_ATTEMPTS = config('GSHEET_RETRY_ATTEMPTS', cast=int, default=3)
 GSHEET_RATE_LIMIT_DELAY = config('GSHEET_RATE_LIMIT_DELAY', cast=int, default=2)
+GSHEET_RATE_LIMIT_PER_MINUTE = config('GSHEET_RATE_LIMIT_PER_MINUTE', cast=int, default=60)  # shared by all workers
+GSHEET_RATE_LIMIT_BURST = config('GSHEET_RATE_LIMIT_BURST', cast=int, default=10)
+
+# Parquet archive for analytics (needs pyarrow)
+PARQUET_ARCHIVE_DIR = config('PARQUET_ARCHIVE_DIR', default=str(BASE_DIR / "shared_volume" / "archive"))
+PARQUET_ARCHIVE_COMPRESSION = config('PARQUET_ARCHIVE_COMPRESSION', default='zstd')
+PARQUET_ARCHIVE_BATCH_SIZE = config('PARQUET_ARCHIVE_BATCH_SIZE', cast=int, default=100000)  # rows per part file
+PARQUET_ARCHIVE_LAG_MINUTES = config('PARQUET_ARCHIVE_LAG_MINUTES', cast=int, default=10)  # skip rows newer than this
 
 # Validate Google Sheets configuration on startup
 def validate_google_sheets_config():
@@ -0,0 +1,185 @@
+# exporter/csv_exporter.py - Streaming CSV / NDJSON export of ParsingInfo
+
+import csv
+import json
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from parser_controler.models import ParsingInfo
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = [
+    "id",
+    "full_name",
+    "position",
+    "company_name",
+    "email",
+    "profile_url",
+    "parser_request_id",
+    "search_keywords",
+    "search_location",
+    "page_found",
+    "created_at",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+FALSE_VALUES = {"0", "false", "no", "off"}
+
+
+class Echo:
+    """File-like object whose write() just returns the line, so csv.writer can feed a generator"""
+
+    def write(self, value):
+        return value
+
+
+def _parse_bound(value, end=False):
+    """'2025-01-31' or an ISO datetime -> (lookup suffix, value); date-only bounds are inclusive"""
+    if not value:
+        return None, None
+    parsed = parse_datetime(value)
+    if parsed is not None:
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return ("lte" if end else "gte"), parsed
+    parsed = parse_date(value)
+    if parsed is not None:
+        return ("date__lte" if end else "date__gte"), parsed
+    raise ValueError(f"Invalid date: {value}")
+
+
+def _parse_bool(value):
+    if value is None or value == "":
+        return None
+    value = str(value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def filter_parsing_infos(parser_request_id=None, user=None, date_from=None, date_to=None, has_email=None):
+    """
+    ParsingInfo queryset for an export. `user` matches profiles the user created or
+    that belong to one of their parser requests (same rule as the admin).
+    Dates are strings ('YYYY-MM-DD' or ISO datetimes), has_email is a bool or a bool-ish string.
+    """
+    queryset = ParsingInfo.objects.all()
+
+    if parser_request_id:
+        queryset = queryset.filter(parser_request_id=parser_request_id)
+    if user is not None:
+        queryset = queryset.filter(Q(creator=user) | Q(parser_request__user=user))
+
+    for value, end in ((date_from, False), (date_to, True)):
+        lookup, bound = _parse_bound(value, end=end)
+        if lookup:
+            queryset = queryset.filter(**{f"created_at__{lookup}": bound})
+
+    has_email = has_email if isinstance(has_email, bool) else _parse_bool(has_email)
+    if has_email is True:
+        queryset = queryset.exclude(email__isnull=True).exclude(email="")
+    elif has_email is False:
+        queryset = queryset.filter(Q(email__isnull=True) | Q(email=""))
+
+    return queryset
+
+
+def iter_export_rows(queryset, chunk_size=None):
+    """
+    Tuples in EXPORT_FIELDS order, read through a server-side cursor.
+    Only `chunk_size` rows are held in memory at a time, whatever the result size.
+    """
+    chunk_size = chunk_size or getattr(settings, "EXPORT_STREAM_CHUNK_SIZE", 2000)
+    rows = queryset.order_by("id").values_list(*EXPORT_FIELDS)
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def _format_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def iter_csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def iter_ndjson_lines(rows):
+    for row in rows:
+        record = {field: value for field, value in zip(EXPORT_FIELDS, row)}
+        yield json.dumps(record, default=str, ensure_ascii=False) + "\n"
+
+
+def iter_export_chunks(queryset, fmt="csv", chunk_size=None, lines_per_chunk=500):
+    """
+    Encoded export in blocks of `lines_per_chunk` lines, so the response is not
+    flushed one tiny write per row.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    rows = iter_export_rows(queryset, chunk_size=chunk_size)
+    lines = iter_csv_lines(rows) if fmt == "csv" else iter_ndjson_lines(rows)
+
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= lines_per_chunk:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_export_response(queryset, fmt="csv", filename=None):
+    """StreamingHttpResponse serving the queryset as a CSV or NDJSON download"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    filename = filename or f"profiles_{timezone.now():%Y%m%d_%H%M%S}.{fmt}"
+    response = StreamingHttpResponse(
+        iter_export_chunks(queryset, fmt),
+        content_type=f"{EXPORT_FORMATS[fmt]}; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["X-Accel-Buffering"] = "no"  # let nginx pass chunks straight through
+    return response
+
+
+def write_export(fileobj, queryset, fmt="csv", chunk_size=None):
+    """Write the export to an open text file; returns the number of rows written"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    rows = counted(iter_export_rows(queryset, chunk_size=chunk_size))
+    lines = iter_csv_lines(rows) if fmt == "csv" else iter_ndjson_lines(rows)
+    for line in lines:
+        fileobj.write(line)
+
+    logger.info(f"📄 Exported {count} profiles as {fmt}")
+    return count
@@ -1,31 +1,77 @@
 # IMPROVED exporter/google_sheets_exporter.py
 
+import os
+import redis
 import gspread
 import logging
+import threading
 import time
 from oauth2client.service_account import ServiceAccountCredentials
 from django.conf import settings
-from gspread.exceptions import APIError, SpreadsheetNotFound
+from gspread.exceptions import APIError, SpreadsheetNotFound, WorksheetNotFound
 from googleapiclient.errors import HttpError
 
+from exporter.rate_limiter import sheets_rate_limiter
+from parser_controler.profile_index import normalize_profile_url
+
 logger = logging.getLogger(__name__)
 
-class GoogleSheetsExporter:
-    def __init__(self):
-        self.client = None
-        self.sheet = None
-        self.spreadsheet = None
-        self._initialize_client()
-    
-    def _initialize_client(self):
-        """Initialize Google Sheets client with error handling"""
-        try:
-            scope = [
-                "https://spreadsheets.google.com/feeds",
-                "https://www.googleapis.com/auth/drive",
-                "https://www.googleapis.com/auth/spreadsheets"  # ✅ Added explicit sheets scope
-            ]
-            
+SCOPES = [
+    "https://spreadsheets.google.com/feeds",
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/spreadsheets"  # ✅ Added explicit sheets scope
+]
+
+# One authorized client + worksheet handle per worker process. gspread's
+# AuthorizedSession refreshes the access token by itself when it expires.
+_shared_lock = threading.Lock()
+_shared = {"pid": None, "client": None, "spreadsheet": None, "sheet": None, "worksheets": {}, "headers_checked": set()}
+
+HEADERS = ["Full Name", "Position", "Company", "Email", "Profile URL", "Exported At"]
+
+# Row counts per worksheet and current shard per base name, tracked in Redis instead of read back from Sheets
+ROW_COUNTS_KEY = "gsheet:row_counts"
+SHARDS_KEY = "gsheet:shards"
+
+
+def _redis():
+    return redis.Redis(host="redis", port=6379, decode_responses=True)
+
+
+def get_tracked_rows(title):
+    try:
+        value = _redis().hget(ROW_COUNTS_KEY, title)
+        return int(value) if value is not None else None
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"⚠️ Could not read tracked row count for '{title}': {e}")
+        return None
+
+
+def set_tracked_rows(title, rows):
+    try:
+        _redis().hset(ROW_COUNTS_KEY, title, rows)
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"⚠️ Could not store row count for '{title}': {e}")
+
+
+def add_tracked_rows(title, rows):
+    try:
+        _redis().hincrby(ROW_COUNTS_KEY, title, rows)
+    except redis.exceptions.RedisError as e:
+        logger.warning(f"⚠️ Could not update row count for '{title}': {e}")
+
+
+def shard_title(base, index):
+    return base if index <= 1 else f"{base} ({index})"
+
+
+def get_shared_sheet(force_refresh=False):
+    """Return (client, spreadsheet, worksheet), authorizing only on first use in this process"""
+    with _shared_lock:
+        if _shared["pid"] != os.getpid() or force_refresh:
+            _shared.update(pid=os.getpid(), client=None, spreadsheet=None, sheet=None, worksheets={}, headers_checked=set())
+
+        if _shared["sheet"] is None:
             # Check if credentials file exists
             if not hasattr(settings, 'GSHEET_CREDENTIALS_PATH') or not settings.GSHEET_CREDENTIALS_PATH:
                 raise ValueError("GSHEET_CREDENTIALS_PATH not configured in settings")
@@ -35,62 +81,190 @@ class GoogleSheetsExporter:
             
             # Initialize credentials
             creds = ServiceAccountCredentials.from_json_keyfile_name(
-                settings.GSHEET_CREDENTIALS_PATH, scope
+                settings.GSHEET_CREDENTIALS_PATH, SCOPES
             )
-            self.client = gspread.authorize(creds)
+            client = gspread.authorize(creds)
             
             # Try to open the spreadsheet
             try:
-                self.spreadsheet = self.client.open_by_key(settings.GSHEET_SPREADSHEET_ID)
-                self.sheet = self.spreadsheet.sheet1
+                sheets_rate_limiter.acquire()
+                spreadsheet = client.open_by_key(settings.GSHEET_SPREADSHEET_ID)
             except SpreadsheetNotFound:
                 logger.error(f"❌ Spreadsheet not found: {settings.GSHEET_SPREADSHEET_ID}")
                 raise ValueError(f"Spreadsheet {settings.GSHEET_SPREADSHEET_ID} not found or not accessible")
             
-            # Ensure headers exist
-            self._ensure_headers()
-            
+            _shared.update(client=client, spreadsheet=spreadsheet, sheet=spreadsheet.sheet1)
             logger.info("✅ Google Sheets client initialized successfully")
-            logger.info(f"📊 Connected to spreadsheet: {self.spreadsheet.title}")
+            logger.info(f"📊 Connected to spreadsheet: {spreadsheet.title}")
+
+        return _shared["client"], _shared["spreadsheet"], _shared["sheet"]
+
+
+def is_auth_error(error):
+    text = str(error)
+    return "UNAUTHENTICATED" in text or "401" in text or "invalid_grant" in text
+
+
+class GoogleSheetsExporter:
+    """
+    Writes profiles to the configured spreadsheet.
+
+    With GSHEET_SHARD_BY = "request" each ParserRequest gets its own worksheet
+    ("Request 42"), with "month" rows go to one worksheet per month ("2025-06"),
+    and "none" keeps everything on the first sheet. A shard that reaches
+    GSHEET_SHARD_MAX_ROWS rolls over to "<name> (2)", "<name> (3)", ...
+    """
+    
+    def __init__(self, parser_request_id=None):
+        self.parser_request_id = parser_request_id
+        self.client = None
+        self.sheet = None
+        self.spreadsheet = None
+        self._initialize_client()
+    
+    def _initialize_client(self, force_refresh=False):
+        """Attach to the process-wide Google Sheets client (authorizing it only when needed)"""
+        try:
+            self.client, self.spreadsheet, default_sheet = get_shared_sheet(force_refresh=force_refresh)
+            if self._shard_base() is None:
+                self.sheet = default_sheet
+                if get_tracked_rows(default_sheet.title) is None:
+                    sheets_rate_limiter.acquire()
+                    set_tracked_rows(default_sheet.title, len(default_sheet.col_values(1)))
+            else:
+                self._select_worksheet()
+            self._check_headers_once(self.sheet)
             
         except Exception as e:
             logger.error(f"❌ Failed to initialize Google Sheets client: {e}")
             raise
     
-    def _ensure_headers(self):
+    # ------------------------------------------------------------------
+    # Sharding
+    # ------------------------------------------------------------------
+    def _shard_base(self):
+        strategy = getattr(settings, 'GSHEET_SHARD_BY', 'request')
+        if strategy == 'request' and self.parser_request_id:
+            return f"Request {self.parser_request_id}"
+        if strategy in ('request', 'month'):
+            return time.strftime("%Y-%m")
+        return None
+    
+    def _shard_index(self, base):
+        try:
+            return int(_redis().hget(SHARDS_KEY, base) or 1)
+        except redis.exceptions.RedisError:
+            return 1
+    
+    def _shard_titles(self):
+        """Every worksheet title of this exporter's shard, oldest first"""
+        base = self._shard_base()
+        if base is None:
+            return [self.sheet.title]
+        return [shard_title(base, index) for index in range(1, self._shard_index(base) + 1)]
+    
+    def _select_worksheet(self, rows_needed=0):
+        """Current shard worksheet, rolling over to a new one if rows_needed would not fit"""
+        base = self._shard_base()
+        if base is None:
+            return self.sheet
+        
+        max_rows = getattr(settings, 'GSHEET_SHARD_MAX_ROWS', 50000)
+        index = self._shard_index(base)
+        title = shard_title(base, index)
+        worksheet = self._get_worksheet(title)
+        
+        if (get_tracked_rows(title) or 0) + rows_needed > max_rows:
+            index += 1
+            title = shard_title(base, index)
+            logger.info(f"📑 Worksheet '{shard_title(base, index - 1)}' is full, rolling over to '{title}'")
+            worksheet = self._get_worksheet(title)
+            try:
+                _redis().hset(SHARDS_KEY, base, index)
+            except redis.exceptions.RedisError as e:
+                logger.warning(f"⚠️ Could not store shard index for '{base}': {e}")
+        
+        self.sheet = worksheet
+        return worksheet
+    
+    def _get_worksheet(self, title):
+        """Worksheet by title from the process cache, opening or creating it on first use"""
+        with _shared_lock:
+            worksheet = _shared["worksheets"].get(title)
+        if worksheet is not None:
+            return worksheet
+        
+        try:
+            sheets_rate_limiter.acquire()
+            worksheet = self.spreadsheet.worksheet(title)
+            if get_tracked_rows(title) is None:
+                # Worksheet created before row tracking - count it once
+                sheets_rate_limiter.acquire()
+                set_tracked_rows(title, len(worksheet.col_values(1)))
+        except WorksheetNotFound:
+            logger.info(f"📑 Creating worksheet '{title}'")
+            sheets_rate_limiter.acquire()
+            worksheet = self.spreadsheet.add_worksheet(title=title, rows=100, cols=len(HEADERS))
+            self._write_headers(worksheet)
+            set_tracked_rows(title, 1)
+            with _shared_lock:
+                _shared["headers_checked"].add(title)
+        
+        with _shared_lock:
+            _shared["worksheets"][title] = worksheet
+        return worksheet
+    
+    def _check_headers_once(self, worksheet):
+        # Ensure headers exist - once per worksheet per process, not on every export
+        with _shared_lock:
+            if worksheet.title in _shared["headers_checked"]:
+                return
+            _shared["headers_checked"].add(worksheet.title)
+        self._ensure_headers(worksheet)
+    
+    def _ensure_headers(self, worksheet=None):
         """Ensure the sheet has proper headers"""
+        worksheet = worksheet or self.sheet
         try:
             # Check if first row has headers
             try:
-                existing_headers = self.sheet.row_values(1)
+                sheets_rate_limiter.acquire()
+                existing_headers = worksheet.row_values(1)
             except Exception:
                 existing_headers = []
             
-            expected_headers = ["Full Name", "Position", "Company", "Email", "Profile URL", "Exported At"]
-            
-            if not existing_headers or len(existing_headers) < len(expected_headers):
+            if not existing_headers or len(existing_headers) < len(HEADERS):
                 logger.info("📋 Setting up Google Sheets headers...")
                 
                 # Clear first row and add headers
                 if existing_headers:
-                    self.sheet.delete_rows(1)
+                    sheets_rate_limiter.acquire()
+                    worksheet.delete_rows(1)
                 
-                self.sheet.insert_row(expected_headers, 1)
-                
-                # Format headers (bold, background color)
-                try:
-                    self.sheet.format('A1:F1', {
-                        "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
-                        "textFormat": {"bold": True}
-                    })
-                except Exception as format_error:
-                    logger.warning(f"⚠️ Could not format headers: {format_error}")
-                
-                logger.info("✅ Headers set up successfully")
+                self._write_headers(worksheet, insert=True)
                 
         except Exception as e:
             logger.warning(f"⚠️ Could not set up headers: {e}")
     
+    def _write_headers(self, worksheet, insert=False):
+        sheets_rate_limiter.acquire()
+        if insert:
+            worksheet.insert_row(HEADERS, 1)
+        else:
+            worksheet.update('A1:F1', [HEADERS])
+        
+        # Format headers (bold, background color)
+        try:
+            sheets_rate_limiter.acquire()
+            worksheet.format('A1:F1', {
+                "backgroundColor": {"red": 0.9, "green": 0.9, "blue": 0.9},
+                "textFormat": {"bold": True}
+            })
+        except Exception as format_error:
+            logger.warning(f"⚠️ Could not format headers: {format_error}")
+        
+        logger.info(f"✅ Headers set up successfully on '{worksheet.title}'")
+    
     def write_profile(self, profile_data: dict, max_retries=3):
         """Write a single profile to Google Sheets with retry logic"""
         for attempt in range(max_retries):
@@ -110,8 +284,11 @@ class GoogleSheetsExporter:
                     time.strftime("%Y-%m-%d %H:%M:%S")  # Timestamp
                 ]
                 
-                # Append the row to the sheet
-                self.sheet.append_row(row, value_input_option="RAW")
+                # Append the row to the current shard (waiting for a cluster-wide quota token first)
+                worksheet = self._select_worksheet(rows_needed=1)
+                sheets_rate_limiter.acquire()
+                worksheet.append_row(row, value_input_option="RAW")
+                add_tracked_rows(worksheet.title, 1)
                 
                 logger.info(f"✅ Successfully exported to Google Sheets: {profile_data.get('full_name', 'Unknown')}")
                 return True
@@ -132,11 +309,12 @@ class GoogleSheetsExporter:
                         logger.warning(f"⚠️ Google Sheets API error (attempt {attempt + 1}), retrying in {wait_time}s: {api_error}")
                         time.sleep(wait_time)
                         
-                        # Reinitialize client on API errors
-                        try:
-                            self._initialize_client()
-                        except Exception as reinit_error:
-                            logger.error(f"❌ Failed to reinitialize client: {reinit_error}")
+                        # Only a rejected token needs a new client - other errors just retry
+                        if is_auth_error(api_error):
+                            try:
+                                self._initialize_client(force_refresh=True)
+                            except Exception as reinit_error:
+                                logger.error(f"❌ Failed to reinitialize client: {reinit_error}")
                             
                         continue
                     else:
@@ -173,6 +351,95 @@ class GoogleSheetsExporter:
         
         return False
     
+    def _profile_row(self, profile_data: dict, timestamp: str) -> list:
+        return [
+            profile_data.get("full_name", ""),
+            profile_data.get("position", ""),
+            profile_data.get("company_name", ""),
+            profile_data.get("email", ""),
+            profile_data.get("profile_url", ""),
+            timestamp
+        ]
+    
+    def _load_row_index(self) -> dict:
+        """
+        profile_url -> (worksheet title, row number, [name, position, company, email, url])
+        from one read of each of this exporter's shard worksheets
+        """
+        index = {}
+        for title in self._shard_titles():
+            worksheet = self._get_worksheet(title) if self._shard_base() else self.sheet
+            sheets_rate_limiter.acquire()
+            values = worksheet.get_values("A:E")
+            set_tracked_rows(title, len(values))  # the read is free row-count sync
+            
+            for row_number, row in enumerate(values[1:], start=2):  # row 1 holds the headers
+                row = (row + [""] * 5)[:5]
+                key = normalize_profile_url(row[4])
+                if key:
+                    index[key] = (title, row_number, row)
+        return index
+    
+    def upsert_batch(self, profiles_data: list):
+        """
+        Idempotent export keyed by profile_url.
+        
+        The sheet's rows are indexed once per call; profiles already in the sheet are
+        rewritten with one batch_update only if something changed, new ones are added
+        with one append_rows. Retried or repeated exports therefore never duplicate rows.
+        """
+        if not profiles_data:
+            return {"success": True, "appended": 0, "updated": 0, "unchanged": 0}
+        
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        index = self._load_row_index()
+        
+        updates = {}
+        appends = []
+        unchanged = 0
+        seen = set()
+        for profile_data in profiles_data:
+            if not profile_data.get("full_name"):
+                continue
+            
+            row = self._profile_row(profile_data, timestamp)
+            key = normalize_profile_url(profile_data.get("profile_url"))
+            if key and key in seen:
+                continue
+            if key:
+                seen.add(key)
+            
+            existing = index.get(key) if key else None
+            if existing is None:
+                appends.append(row)
+            elif [str(value) for value in row[:5]] == existing[2]:
+                unchanged += 1
+            else:
+                title, row_number, _ = existing
+                updates.setdefault(title, []).append({"range": f"A{row_number}:F{row_number}", "values": [row]})
+        
+        for title, title_updates in updates.items():
+            worksheet = self._get_worksheet(title) if self._shard_base() else self.sheet
+            sheets_rate_limiter.acquire()
+            worksheet.batch_update(title_updates, value_input_option="RAW")
+        if appends:
+            worksheet = self._select_worksheet(rows_needed=len(appends))
+            sheets_rate_limiter.acquire()
+            worksheet.append_rows(appends, value_input_option="RAW")
+            add_tracked_rows(worksheet.title, len(appends))
+        
+        updated = sum(len(title_updates) for title_updates in updates.values())
+        
+        logger.info(f"✅ Sheets upsert: {len(appends)} appended, {updated} updated, {unchanged} unchanged")
+        return {
+            "success": True,
+            "appended": len(appends),
+            "updated": updated,
+            "unchanged": unchanged,
+            "count": len(appends) + updated,
+            "exported_at": timestamp
+        }
+    
     def write_batch(self, profiles_data: list, batch_size=10):
         """Write multiple profiles in batches for better performance"""
         try:
@@ -204,7 +471,10 @@ class GoogleSheetsExporter:
                     # Batch insert with retry
                     for attempt in range(3):
                         try:
-                            self.sheet.append_rows(rows, value_input_option="RAW")
+                            worksheet = self._select_worksheet(rows_needed=len(rows))
+                            sheets_rate_limiter.acquire()
+                            worksheet.append_rows(rows, value_input_option="RAW")
+                            add_tracked_rows(worksheet.title, len(rows))
                             total_exported += len(rows)
                             logger.info(f"✅ Batch exported {len(rows)} profiles to Google Sheets")
                             break
@@ -212,12 +482,10 @@ class GoogleSheetsExporter:
                             if attempt < 2:
                                 logger.warning(f"⚠️ Batch export attempt {attempt + 1} failed, retrying: {e}")
                                 time.sleep(2 ** attempt)
+                                if is_auth_error(e):
+                                    self._initialize_client(force_refresh=True)
                             else:
                                 raise
-                
-                # Small delay between batches
-                if i + batch_size < len(profiles_data):
-                    time.sleep(1)
             
             return {
                 "success": True,
@@ -240,14 +508,16 @@ class GoogleSheetsExporter:
                 "col_count": self.sheet.col_count,
             }
             
-            # Get actual data count (excluding header)
-            try:
-                all_values = self.sheet.get_all_values()
-                data_rows = len([row for row in all_values if any(cell.strip() for cell in row)]) - 1  # Exclude header
-                sheet_info["data_rows"] = max(0, data_rows)
-            except Exception as e:
-                logger.warning(f"⚠️ Could not get row count: {e}")
+            # Data rows (excluding headers) come from the tracked counts, not from downloading the sheet
+            tracked = [get_tracked_rows(title) for title in self._shard_titles()]
+            if any(rows is None for rows in tracked):
                 sheet_info["data_rows"] = "Unknown"
+            else:
+                sheet_info["data_rows"] = sum(max(0, rows - 1) for rows in tracked)
+            sheet_info["shards"] = len(tracked)
+            
+            # Shared quota usage: calls made, calls that had to wait and total wait time
+            sheet_info["rate_limiter"] = sheets_rate_limiter.stats()
             
             return sheet_info
             
@@ -268,4 +538,4 @@ class GoogleSheetsExporter:
                 return False
         except Exception as e:
             logger.error(f"❌ Google Sheets connection test error: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exporter.parquet_archive import ARCHIVE_TABLES, archive_table, get_archive_dir, get_watermark, reset_archive
+
+
+class Command(BaseCommand):
+    help = 'Append ParsingInfo / ParserRequest rows created since the last run to the Parquet archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            action='append',
+            choices=sorted(ARCHIVE_TABLES),
+            help='Table to archive (repeatable, default: all)',
+        )
+        parser.add_argument('--batch-size', type=int, help='Rows per part file')
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete the archived part files and the watermark, then archive from the beginning',
+        )
+        parser.add_argument('--status', action='store_true', help='Only show the current watermarks')
+
+    def handle(self, *args, **options):
+        tables = options['table'] or list(ARCHIVE_TABLES)
+        self.stdout.write(f"🗄️ Archive directory: {get_archive_dir()}")
+
+        if options['status']:
+            for table in tables:
+                created_at, row_id = get_watermark(table)
+                if created_at:
+                    self.stdout.write(f"📌 {table}: archived up to {created_at.isoformat()} (id {row_id})")
+                else:
+                    self.stdout.write(f"📌 {table}: nothing archived yet")
+            return
+
+        for table in tables:
+            if options['reset']:
+                reset_archive(table)
+                self.stdout.write(self.style.WARNING(f"♻️ Archive and watermark for {table} deleted"))
+
+            try:
+                totals = archive_table(table, batch_size=options['batch_size'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {table}: {totals['rows']} rows archived in {totals['files']} files"
+            ))
@@ -0,0 +1,57 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authorization.models import User
+from exporter.csv_exporter import EXPORT_FORMATS, filter_parsing_infos, write_export
+
+
+class Command(BaseCommand):
+    help = 'Dump ParsingInfo profiles to CSV or NDJSON (streamed, constant memory)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv', help='Export format')
+        parser.add_argument('--request-id', type=int, help='Only profiles of this parser request')
+        parser.add_argument('--user', help='Only profiles of this user (id or email)')
+        parser.add_argument('--date-from', help='Created on/after (YYYY-MM-DD or ISO datetime)')
+        parser.add_argument('--date-to', help='Created on/before (YYYY-MM-DD or ISO datetime)')
+        email_group = parser.add_mutually_exclusive_group()
+        email_group.add_argument('--with-email', action='store_true', help='Only profiles with an email')
+        email_group.add_argument('--without-email', action='store_true', help='Only profiles without an email')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per cursor round trip')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            lookup = {'id': options['user']} if options['user'].isdigit() else {'email': options['user']}
+            try:
+                user = User.objects.get(**lookup)
+            except User.DoesNotExist:
+                raise CommandError(f"User not found: {options['user']}")
+
+        has_email = None
+        if options['with_email']:
+            has_email = True
+        elif options['without_email']:
+            has_email = False
+
+        try:
+            queryset = filter_parsing_infos(
+                parser_request_id=options['request_id'],
+                user=user,
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                has_email=has_email,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = options['output']
+        if output:
+            with open(output, 'w', encoding='utf-8', newline='') as fileobj:
+                count = write_export(fileobj, queryset, options['format'], chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Exported {count} profiles to {output}"))
+        else:
+            count = write_export(sys.stdout, queryset, options['format'], chunk_size=options['chunk_size'])
+            self.stderr.write(f"✅ Exported {count} profiles")
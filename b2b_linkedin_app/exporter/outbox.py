@@ -0,0 +1,158 @@
+# exporter/outbox.py - Export outbox: enqueue saved profiles, drain them in bulk per destination
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from parser_controler.models import ExportOutbox
+from exporter.google_sheets_exporter import GoogleSheetsExporter
+
+logger = logging.getLogger(__name__)
+
+
+def export_to_sheets(parsing_infos, parser_request_id=None):
+    """Upsert one request's rows into its Google Sheets worksheet"""
+    exporter = GoogleSheetsExporter(parser_request_id=parser_request_id)
+    exporter.upsert_batch([
+        {
+            "full_name": info.full_name,
+            "position": info.position or "",
+            "company_name": info.company_name or "",
+            "email": info.email or "",
+            "profile_url": info.profile_url or "",
+        }
+        for info in parsing_infos
+    ])
+
+
+# destination -> callable(parsing_infos, parser_request_id); add CRMs here
+EXPORT_HANDLERS = {
+    'sheets': export_to_sheets,
+}
+
+
+def get_outbox_destinations():
+    return [d for d in getattr(settings, 'EXPORT_OUTBOX_DESTINATIONS', ['sheets']) if d in EXPORT_HANDLERS]
+
+
+def enqueue_exports(parsing_info_ids, destinations=None):
+    """
+    Queue profiles for export (one outbox row per destination).
+    Profiles already in the outbox go back to pending so changed data is exported again.
+    """
+    parsing_info_ids = [pk for pk in parsing_info_ids if pk]
+    destinations = destinations or get_outbox_destinations()
+    if not parsing_info_ids or not destinations:
+        return 0
+
+    rows = [
+        ExportOutbox(parsing_info_id=pk, destination=destination, status='pending', attempts=0)
+        for pk in parsing_info_ids
+        for destination in destinations
+    ]
+    ExportOutbox.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['parsing_info', 'destination'],
+        update_fields=['status', 'attempts', 'claimed_at', 'updated_at'],
+    )
+    return len(rows)
+
+
+def requeue_stale_claims(destination, timeout=None):
+    """Put rows claimed longer than EXPORT_OUTBOX_CLAIM_TIMEOUT ago (the drainer died) back to pending"""
+    timeout = timeout or getattr(settings, 'EXPORT_OUTBOX_CLAIM_TIMEOUT', 600)
+    requeued = ExportOutbox.objects.filter(
+        destination=destination,
+        status='in_progress',
+        claimed_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status='pending', claimed_at=None, updated_at=timezone.now())
+    if requeued:
+        logger.warning(f"⚠️ Requeued {requeued} stale {destination} outbox claims")
+    return requeued
+
+
+def claim_batch(destination, batch_size, exclude_ids=()):
+    """
+    Claim up to batch_size pending rows: a short transaction picks them with
+    SELECT ... FOR UPDATE SKIP LOCKED and marks them in_progress. Returns the claimed ids.
+    """
+    with transaction.atomic():
+        ids = list(
+            ExportOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(destination=destination, status='pending')
+            .exclude(id__in=exclude_ids)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            now = timezone.now()
+            ExportOutbox.objects.filter(id__in=ids).update(status='in_progress', claimed_at=now, updated_at=now)
+    return ids
+
+
+def drain_outbox(destination='sheets', batch_size=None, max_batches=None):
+    """
+    Export pending outbox rows for one destination, batch by batch.
+
+    Each batch is claimed in its own short transaction (see claim_batch) so several
+    drainers can run at once without exporting a row twice; the export itself runs
+    outside any transaction. Rows are then marked done, or pending / failed after an
+    error. Claims left behind by a crashed drainer are requeued after
+    EXPORT_OUTBOX_CLAIM_TIMEOUT. Returns {"exported", "failed"}.
+    """
+    handler = EXPORT_HANDLERS[destination]
+    batch_size = batch_size or getattr(settings, 'EXPORT_OUTBOX_BATCH_SIZE', 500)
+    max_batches = max_batches or getattr(settings, 'EXPORT_OUTBOX_MAX_BATCHES', 20)
+    max_attempts = getattr(settings, 'EXPORT_OUTBOX_MAX_ATTEMPTS', 5)
+    totals = {"exported": 0, "failed": 0}
+    failed_ids = []  # rows that failed in this run wait for the next one
+
+    requeue_stale_claims(destination)
+
+    for _ in range(max_batches):
+        ids = claim_batch(destination, batch_size, exclude_ids=failed_ids)
+        if not ids:
+            break
+        rows = list(ExportOutbox.objects.select_related('parsing_info').filter(id__in=ids).order_by('id'))
+
+        # Exporters work per request (each request has its own worksheet)
+        by_request = defaultdict(list)
+        for row in rows:
+            by_request[row.parsing_info.parser_request_id].append(row)
+
+        for parser_request_id, request_rows in by_request.items():
+            request_ids = [row.id for row in request_rows]
+            # Only rows still in_progress are settled: a row requeued by enqueue_exports meanwhile stays pending
+            claimed = ExportOutbox.objects.filter(id__in=request_ids, status='in_progress')
+            try:
+                handler([row.parsing_info for row in request_rows], parser_request_id=parser_request_id)
+            except Exception as e:
+                logger.error(f"❌ Outbox export to {destination} failed for request {parser_request_id}: {e}")
+                claimed.update(
+                    attempts=F('attempts') + 1,
+                    last_error=str(e)[:2000],
+                    status=Case(When(attempts__gte=max_attempts - 1, then=Value('failed')), default=Value('pending')),
+                    claimed_at=None,
+                    updated_at=timezone.now(),
+                )
+                failed_ids.extend(request_ids)
+                totals["failed"] += len(request_rows)
+                continue
+
+            now = timezone.now()
+            claimed.update(status='done', exported_at=now, last_error=None, claimed_at=None, updated_at=now)
+            totals["exported"] += len(request_rows)
+
+        if len(ids) < batch_size:
+            break
+
+    if totals["exported"] or totals["failed"]:
+        logger.info(f"📤 Outbox drained for {destination}: {totals['exported']} exported, {totals['failed']} failed")
+    return totals
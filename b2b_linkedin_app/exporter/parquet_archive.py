@@ -0,0 +1,208 @@
+# exporter/parquet_archive.py - Incremental Parquet archive of ParsingInfo / ParserRequest for analytics
+
+import json
+import logging
+import os
+import shutil
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from parser_controler.models import ParserRequest, ParsingInfo
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+
+def _string():
+    return pa.string()
+
+
+def _int():
+    return pa.int64()
+
+
+def _timestamp():
+    return pa.timestamp("us", tz="UTC")
+
+
+# table name -> (model, [(column, arrow type factory)])
+ARCHIVE_TABLES = {
+    "parsing_info": (ParsingInfo, [
+        ("id", _int),
+        ("creator_id", _int),
+        ("parser_request_id", _int),
+        ("full_name", _string),
+        ("position", _string),
+        ("company_name", _string),
+        ("email", _string),
+        ("profile_url", _string),
+        ("search_keywords", _string),
+        ("search_location", _string),
+        ("page_found", _int),
+        ("created_at", _timestamp),
+        ("updated_at", _timestamp),
+    ]),
+    "parser_request": (ParserRequest, [
+        ("id", _int),
+        ("user_id", _int),
+        ("keywords", _string),
+        ("location", _string),
+        ("limit", _int),
+        ("start_page", _int),
+        ("end_page", _int),
+        ("status", _string),
+        ("current_page", _int),
+        ("profiles_found", _int),
+        ("emails_extracted", _int),
+        ("created_at", _timestamp),
+        ("started_at", _timestamp),
+        ("completed_at", _timestamp),
+        ("error_message", _string),
+    ]),
+}
+
+
+def get_archive_dir():
+    return Path(getattr(settings, "PARQUET_ARCHIVE_DIR", settings.BASE_DIR / "shared_volume" / "archive"))
+
+
+def _state_path(table):
+    return get_archive_dir() / "_state" / f"{table}.json"
+
+
+def get_watermark(table):
+    """(created_at, id) of the last archived row, or (None, 0) if nothing is archived yet"""
+    try:
+        with open(_state_path(table)) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None, 0
+    return parse_datetime(state["created_at"]), state["id"]
+
+
+def set_watermark(table, created_at, row_id, rows_written):
+    path = _state_path(table)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "created_at": created_at.isoformat(),
+        "id": row_id,
+        "archived_at": timezone.now().isoformat(),
+        "rows_this_run": rows_written,
+    }
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def reset_watermark(table):
+    try:
+        _state_path(table).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def reset_archive(table):
+    """Delete the table's part files and its watermark so the next run archives everything again"""
+    shutil.rmtree(get_archive_dir() / table, ignore_errors=True)
+    reset_watermark(table)
+
+
+def _partition(created_at):
+    return f"year={created_at.year:04d}/month={created_at.month:02d}"
+
+
+def _write_partition(table, partition, columns, rows):
+    """Write rows as one new part file; the temp file + rename keeps readers from seeing partial files"""
+    schema = pa.schema([(name, type_factory()) for name, type_factory in columns])
+    data = {name: [row[i] for row in rows] for i, (name, _) in enumerate(columns)}
+    arrow_table = pa.Table.from_pydict(data, schema=schema)
+
+    directory = get_archive_dir() / table / partition
+    directory.mkdir(parents=True, exist_ok=True)
+    first_id, last_id = rows[0][0], rows[-1][0]
+    path = directory / f"part-{first_id:012d}-{last_id:012d}.parquet"
+    tmp_path = directory / f".{path.name}.tmp"
+
+    pq.write_table(
+        arrow_table,
+        tmp_path,
+        compression=getattr(settings, "PARQUET_ARCHIVE_COMPRESSION", "zstd"),
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_table(table, batch_size=None, chunk_size=None):
+    """
+    Append rows created since the table's watermark to the Parquet archive.
+
+    Rows are read in (created_at, id) order through a server-side cursor and written in
+    batches of `batch_size` rows, one part file per month partition
+    (<archive dir>/<table>/year=YYYY/month=MM/part-<first id>-<last id>.parquet).
+    The watermark advances after each batch, so an interrupted run resumes where it stopped.
+    Rows newer than PARQUET_ARCHIVE_LAG_MINUTES are left for the next run so that
+    transactions still in flight are not skipped. The archive is append-only: later edits
+    to a row already archived (e.g. a ParserRequest finishing) are not rewritten.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed - Parquet archive is unavailable")
+
+    model, columns = ARCHIVE_TABLES[table]
+    batch_size = batch_size or getattr(settings, "PARQUET_ARCHIVE_BATCH_SIZE", 100000)
+    chunk_size = chunk_size or getattr(settings, "EXPORT_STREAM_CHUNK_SIZE", 2000)
+    lag = timedelta(minutes=getattr(settings, "PARQUET_ARCHIVE_LAG_MINUTES", 10))
+
+    field_names = [name for name, _ in columns]
+    created_index = field_names.index("created_at")
+
+    watermark_at, watermark_id = get_watermark(table)
+    queryset = model.objects.filter(created_at__lt=timezone.now() - lag)
+    if watermark_at is not None:
+        queryset = queryset.filter(
+            Q(created_at__gt=watermark_at) | Q(created_at=watermark_at, id__gt=watermark_id)
+        )
+    rows = queryset.order_by("created_at", "id").values_list(*field_names).iterator(chunk_size=chunk_size)
+
+    totals = {"rows": 0, "files": 0}
+
+    def flush(batch):
+        by_partition = defaultdict(list)
+        for row in batch:
+            by_partition[_partition(row[created_index])].append(row)
+        for partition, partition_rows in by_partition.items():
+            _write_partition(table, partition, columns, partition_rows)
+            totals["files"] += 1
+        totals["rows"] += len(batch)
+        last = batch[-1]
+        set_watermark(table, last[created_index], last[0], totals["rows"])
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    logger.info(f"🗄️ Parquet archive {table}: {totals['rows']} rows in {totals['files']} files")
+    return totals
+
+
+def archive_all(tables=None, batch_size=None):
+    results = {}
+    for table in tables or ARCHIVE_TABLES:
+        results[table] = archive_table(table, batch_size=batch_size)
+    return results
@@ -0,0 +1,119 @@
+# exporter/rate_limiter.py - Redis token bucket shared by every worker
+
+import logging
+import time
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket from the time elapsed since the last call, then either takes
+# the tokens (returns 0) or returns how many milliseconds until enough are available.
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local state = redis.call('HMGET', key, 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + (now - updated_at) * refill_per_ms)
+
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait_ms = math.ceil((requested - tokens) / refill_per_ms)
+end
+
+redis.call('HSET', key, 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', key, math.ceil(capacity / refill_per_ms) * 2)
+return wait_ms
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket kept in Redis so all Celery workers share one quota.
+
+    acquire() blocks until a token is available and returns the seconds it waited;
+    waits are accumulated under `<key>:stats` (calls, throttled, wait_seconds).
+    If Redis is unreachable calls go through unthrottled rather than failing the export.
+    """
+
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.stats_key = f"{key}:stats"
+        self.capacity = capacity
+        self.refill_per_ms = refill_per_second / 1000.0
+        self._redis = None
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            self._redis = redis.Redis(host="redis", port=6379)
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def acquire(self, tokens=1, timeout=120):
+        waited = 0.0
+        try:
+            script = self._get_script()
+            while True:
+                wait_ms = int(script(keys=[self.key], args=[self.capacity, self.refill_per_ms, tokens]))
+                if wait_ms <= 0:
+                    break
+                if waited >= timeout:
+                    logger.warning(f"⚠️ Rate limiter {self.key}: gave up waiting after {waited:.1f}s")
+                    break
+                sleep_for = min(wait_ms / 1000.0, timeout - waited)
+                time.sleep(sleep_for)
+                waited += sleep_for
+        except redis.exceptions.RedisError as e:
+            logger.warning(f"⚠️ Rate limiter {self.key} unavailable, continuing without it: {e}")
+            self._script = None
+            return waited
+
+        self._record(waited)
+        return waited
+
+    def _record(self, waited):
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hincrby(self.stats_key, "calls", 1)
+            if waited > 0:
+                pipe.hincrby(self.stats_key, "throttled", 1)
+                pipe.hincrbyfloat(self.stats_key, "wait_seconds", waited)
+            pipe.execute()
+        except redis.exceptions.RedisError:
+            pass
+        if waited > 0:
+            logger.info(f"⏳ Rate limiter {self.key}: waited {waited:.2f}s for a token")
+
+    def stats(self):
+        try:
+            self._get_script()
+            raw = self._redis.hgetall(self.stats_key)
+        except redis.exceptions.RedisError as e:
+            return {"error": str(e)}
+        calls = int(raw.get(b"calls", 0))
+        wait_seconds = float(raw.get(b"wait_seconds", 0))
+        return {
+            "calls": calls,
+            "throttled": int(raw.get(b"throttled", 0)),
+            "wait_seconds": round(wait_seconds, 2),
+            "avg_wait": round(wait_seconds / calls, 3) if calls else 0,
+        }
+
+
+sheets_rate_limiter = RedisTokenBucket(
+    key="rate_limit:google_sheets",
+    capacity=getattr(settings, "GSHEET_RATE_LIMIT_BURST", 10),
+    refill_per_second=getattr(settings, "GSHEET_RATE_LIMIT_PER_MINUTE", 60) / 60.0,
+)
@@ -0,0 +1,196 @@
+# mailer/dispatch.py - Per-recipient-domain throttled send queue kept in Redis
+
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+
+import redis
+from django.conf import settings
+
+from parser_controler.models import ParsingInfo
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = "mail_dispatch:queue:"      # list of pending jobs per recipient domain
+WHEEL_KEY = "mail_dispatch:wheel"          # zset domain -> time the domain may send next
+NEXT_AT_PREFIX = "mail_dispatch:next_at:"  # earliest next send per domain, expires once that time has passed
+LAST_TICK_KEY = "mail_dispatch:last_tick"
+CAMPAIGN_PREFIX = "mail_dispatch:campaign:"
+CAMPAIGN_TTL = 7 * 24 * 3600
+
+# Push jobs for one domain and put the domain on the wheel (no earlier than its next allowed send)
+ENQUEUE_SCRIPT = """
+local queue, wheel, next_at_key = KEYS[1], KEYS[2], KEYS[3]
+local domain = ARGV[1]
+local now = tonumber(ARGV[2])
+for i = 3, #ARGV do
+    redis.call('RPUSH', queue, ARGV[i])
+end
+if not redis.call('ZSCORE', wheel, domain) then
+    local next_at = tonumber(redis.call('GET', next_at_key) or '0')
+    redis.call('ZADD', wheel, math.max(now, next_at), domain)
+end
+return redis.call('LLEN', queue)
+"""
+
+# Take up to `count` jobs for a due domain and move it forward on the wheel (or off it when drained)
+POP_SCRIPT = """
+local queue, wheel, next_at_key = KEYS[1], KEYS[2], KEYS[3]
+local domain = ARGV[1]
+local count = tonumber(ARGV[2])
+local spacing = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local items = redis.call('LRANGE', queue, 0, count - 1)
+redis.call('LTRIM', queue, #items, -1)
+local next_at = now + #items * spacing
+if #items > 0 then
+    redis.call('SET', next_at_key, next_at, 'EX', math.max(1, math.ceil(next_at - now)))
+end
+if redis.call('LLEN', queue) == 0 then
+    redis.call('ZREM', wheel, domain)
+else
+    redis.call('ZADD', wheel, next_at, domain)
+end
+return items
+"""
+
+
+def get_redis():
+    return redis.Redis(host="redis", port=6379, decode_responses=True)
+
+
+def is_enabled():
+    return getattr(settings, "MAIL_DISPATCH_ENABLED", True)
+
+
+def recipient_domain(email):
+    return email.rsplit("@", 1)[-1].strip().lower() if email and "@" in email else ""
+
+
+def _push(jobs_by_domain, r=None):
+    r = r or get_redis()
+    script = r.register_script(ENQUEUE_SCRIPT)
+    now = time.time()
+    queued = 0
+    for domain, jobs in jobs_by_domain.items():
+        script(
+            keys=[f"{QUEUE_PREFIX}{domain}", WHEEL_KEY, f"{NEXT_AT_PREFIX}{domain}"],
+            args=[domain, now, *[json.dumps(job) for job in jobs]],
+        )
+        queued += len(jobs)
+    return queued
+
+
+def enqueue_smtp(pairs):
+    """Queue (blueprint_id, parsing_info_id) SMTP sends, bucketed by the profile's email domain"""
+    pairs = [(int(blueprint_id), int(info_id)) for blueprint_id, info_id in pairs]
+    emails = dict(ParsingInfo.objects.filter(id__in={info_id for _, info_id in pairs}).values_list("id", "email"))
+
+    jobs_by_domain = defaultdict(list)
+    for blueprint_id, info_id in pairs:
+        domain = recipient_domain(emails.get(info_id))
+        if domain:
+            jobs_by_domain[domain].append({
+                "kind": "smtp",
+                "domain": domain,
+                "blueprint_id": blueprint_id,
+                "parsing_info_id": info_id,
+            })
+    queued = _push(jobs_by_domain)
+    logger.info(f"[DISPATCH] Queued {queued} SMTP sends across {len(jobs_by_domain)} domains")
+    return queued
+
+
+def enqueue_mailgun(recipients, subject, template):
+    """Queue Mailgun sends; subject/template are stored once per campaign instead of per job"""
+    r = get_redis()
+    campaign_id = uuid.uuid4().hex
+    r.set(f"{CAMPAIGN_PREFIX}{campaign_id}", json.dumps({"subject": subject, "template": template}), ex=CAMPAIGN_TTL)
+
+    jobs_by_domain = defaultdict(list)
+    for recipient in recipients:
+        domain = recipient_domain(recipient.get("email"))
+        if domain:
+            jobs_by_domain[domain].append({
+                "kind": "mailgun",
+                "domain": domain,
+                "campaign": campaign_id,
+                "email": recipient["email"],
+                "name": recipient.get("name", "Friend"),
+            })
+    queued = _push(jobs_by_domain, r)
+    logger.info(f"[DISPATCH] Queued {queued} Mailgun sends across {len(jobs_by_domain)} domains")
+    return queued
+
+
+def requeue_jobs(jobs, r=None):
+    """Put popped jobs back on their domain queues, e.g. when handing them to Celery failed"""
+    # Jobs queued before they carried their domain are looked up like enqueue_smtp does
+    missing = {job["parsing_info_id"] for job in jobs if not job.get("domain") and job.get("kind") == "smtp"}
+    emails = dict(ParsingInfo.objects.filter(id__in=missing).values_list("id", "email")) if missing else {}
+
+    jobs_by_domain = defaultdict(list)
+    for job in jobs:
+        domain = job.get("domain") or recipient_domain(job.get("email") or emails.get(job.get("parsing_info_id")))
+        if domain:
+            jobs_by_domain[domain].append(job)
+    queued = _push(jobs_by_domain, r)
+    logger.warning(f"[DISPATCH] Requeued {queued} sends across {len(jobs_by_domain)} domains")
+    return queued
+
+
+def get_campaign(campaign_id, r=None):
+    raw = (r or get_redis()).get(f"{CAMPAIGN_PREFIX}{campaign_id}")
+    return json.loads(raw) if raw else None
+
+
+def pop_due_jobs(r=None):
+    """
+    Jobs that may be sent now under the per-domain and global limits.
+
+    Domains whose slot has come up are served oldest-first; each gets at most
+    MAIL_DISPATCH_DOMAIN_BURST jobs and is then pushed back by 60 / MAIL_DISPATCH_DOMAIN_PER_MINUTE
+    seconds per job taken. The global budget refills at MAIL_DISPATCH_GLOBAL_PER_MINUTE based on
+    the time since the previous tick (capped at one minute).
+    """
+    r = r or get_redis()
+    now = time.time()
+    domain_spacing = 60.0 / max(getattr(settings, "MAIL_DISPATCH_DOMAIN_PER_MINUTE", 6), 1)
+    domain_burst = max(getattr(settings, "MAIL_DISPATCH_DOMAIN_BURST", 2), 1)
+    global_per_second = getattr(settings, "MAIL_DISPATCH_GLOBAL_PER_MINUTE", 300) / 60.0
+
+    last_tick = float(r.getset(LAST_TICK_KEY, now) or 0)
+    elapsed = min(now - last_tick, 60.0) if last_tick else getattr(settings, "MAIL_DISPATCH_TICK_SECONDS", 10)
+    budget = int(elapsed * global_per_second)
+    if budget <= 0:
+        return []
+
+    script = r.register_script(POP_SCRIPT)
+    jobs = []
+    for domain in r.zrangebyscore(WHEEL_KEY, "-inf", now, start=0, num=budget):
+        take = min(domain_burst, budget - len(jobs))
+        if take <= 0:
+            break
+        items = script(
+            keys=[f"{QUEUE_PREFIX}{domain}", WHEEL_KEY, f"{NEXT_AT_PREFIX}{domain}"],
+            args=[domain, take, domain_spacing, now],
+        )
+        jobs.extend(json.loads(item) for item in items)
+    return jobs
+
+
+def get_dispatch_stats(r=None):
+    r = r or get_redis()
+    now = time.time()
+    domains = r.zrange(WHEEL_KEY, 0, -1)
+    pipe = r.pipeline()
+    for domain in domains:
+        pipe.llen(f"{QUEUE_PREFIX}{domain}")
+    sizes = pipe.execute() if domains else []
+    return {
+        "domains_waiting": len(domains),
+        "domains_due": r.zcount(WHEEL_KEY, "-inf", now),
+        "queued": sum(sizes),
+    }
@@ -1,24 +1,56 @@
+import json
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
+from django.utils.html import escape
 from mailer.models import EmailLog
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAILGUN_MAX_RECIPIENTS = 1000  # Mailgun's limit per batch-sending call
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Keep-alive session shared by the process, so calls skip the TCP/TLS handshake"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.auth = ("api", settings.MAILGUN_API_KEY)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=getattr(settings, "MAILGUN_POOL_SIZE", 10))
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _post_message(data: dict) -> requests.Response:
+    return get_session().post(
+        f"https://api.mailgun.net/v3/{settings.MAILGUN_DOMAIN}/messages",
+        data=data,
+        timeout=getattr(settings, "MAILGUN_TIMEOUT", 15),
+    )
+
+
+def _sender() -> str:
+    return f"SolidWay <mailgun@{settings.MAILGUN_DOMAIN}>"
+
 
 def send_email(to_email: str, subject: str, html_message: str) -> bool:
     try:
-        response = requests.post(
-            f"https://api.mailgun.net/v3/{settings.MAILGUN_DOMAIN}/messages",
-            auth=("api", settings.MAILGUN_API_KEY),
-            data={
-                "from": f"SolidWay <mailgun@{settings.MAILGUN_DOMAIN}>",
-                "to": [to_email],
-                "subject": subject,
-                "html": html_message,
-                "text": "Your email client does not support HTML.",
-            },
-        )
+        response = _post_message({
+            "from": _sender(),
+            "to": [to_email],
+            "subject": subject,
+            "html": html_message,
+            "text": "Your email client does not support HTML.",
+        })
         mailgun_id = None
         status = "sent"
         error_message = ""
@@ -52,3 +84,64 @@ def send_email(to_email: str, subject: str, html_message: str) -> bool:
             error_message=str(e),
         )
         return False
+
+
+def send_batch_email(recipients: list, subject: str, template: str) -> dict:
+    """
+    Send one personalized message per recipient with Mailgun batch sending.
+
+    recipients are {"email", "name"} dicts; "{{name}}" in the template becomes
+    %recipient.name% and is filled by Mailgun from recipient-variables, so up to
+    MAILGUN_MAX_RECIPIENTS messages go out per API call (each recipient only sees
+    their own address). One EmailLog bulk_create is written per call.
+    """
+    unique = {}
+    for r in recipients:
+        email = (r.get("email") or "").strip()
+        if email and email not in unique:
+            unique[email] = {"name": escape(r.get("name") or "Friend")}
+
+    html = template.replace("{{name}}", "%recipient.name%")
+    batch_size = min(getattr(settings, "MAILGUN_BATCH_SIZE", MAILGUN_MAX_RECIPIENTS), MAILGUN_MAX_RECIPIENTS)
+    emails = list(unique)
+    totals = {"sent": 0, "failed": 0}
+
+    for i in range(0, len(emails), batch_size):
+        chunk = emails[i:i + batch_size]
+        mailgun_id = None
+        status = "sent"
+        error_message = ""
+        try:
+            response = _post_message({
+                "from": _sender(),
+                "to": chunk,
+                "subject": subject,
+                "html": html,
+                "text": "Your email client does not support HTML.",
+                "recipient-variables": json.dumps({email: unique[email] for email in chunk}),
+            })
+            if response.status_code == 200:
+                mailgun_id = response.json().get("id")
+                logger.info(f"[MAIL BATCH] Sent to {len(chunk)} recipients")
+            else:
+                status = "failed"
+                error_message = response.text
+                logger.warning(f"[MAIL BATCH] Failed to send {len(chunk)} emails: {response.text}")
+        except Exception as e:
+            logger.exception("[MAIL BATCH] Exception during batch sending:")
+            status = "error"
+            error_message = str(e)
+
+        EmailLog.objects.bulk_create([
+            EmailLog(
+                email=email,
+                subject=subject,
+                status=status,
+                mailgun_id=mailgun_id,
+                error_message=error_message,
+            )
+            for email in chunk
+        ])
+        totals["sent" if status == "sent" else "failed"] += len(chunk)
+
+    return totals
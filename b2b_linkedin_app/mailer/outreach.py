@@ -0,0 +1,93 @@
+# mailer/outreach.py - Pick a message blueprint per profile in memory and queue sends in batches
+
+import itertools
+import logging
+import random
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .models import EmailMessageStatus, MessagesBlueprintText
+from . import dispatch
+from .tasks import smtp_send_mail_batch
+
+logger = logging.getLogger(__name__)
+
+
+class OutreachPlanner:
+    """
+    Assigns one of the user's blueprints to every profile that needs an email.
+
+    Blueprints are loaded once when the planner is created. Strategies:
+      - round_robin: cycles through the blueprints (from a random start)
+      - weighted: picks at random, weighted by each blueprint's read rate so far
+        ((reads + 1) / (sends + 2), so new blueprints still get traffic)
+    add() collects (blueprint_id, parsing_info_id) pairs; flush() hands them to the
+    per-domain dispatch queue (or straight to smtp_send_mail_batch when it is disabled).
+    """
+
+    STRATEGIES = ("round_robin", "weighted")
+
+    def __init__(self, blueprint_ids, strategy=None, weights=None, batch_size=None):
+        self.blueprint_ids = list(blueprint_ids)
+        self.strategy = strategy or getattr(settings, "OUTREACH_STRATEGY", "round_robin")
+        if self.strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown outreach strategy: {self.strategy}")
+        self.weights = list(weights) if weights else [1] * len(self.blueprint_ids)
+        self.batch_size = batch_size or getattr(settings, "OUTREACH_BATCH_SIZE", 100)
+        self.pending = []
+        self.queued = 0
+
+        if self.blueprint_ids:
+            start = random.randrange(len(self.blueprint_ids))
+            self._cycle = itertools.cycle(self.blueprint_ids[start:] + self.blueprint_ids[:start])
+
+    @classmethod
+    def for_user(cls, user, strategy=None, batch_size=None):
+        """Planner over the user's blueprints (one query), or None if there is nothing to send"""
+        if not user:
+            return None
+
+        strategy = strategy or getattr(settings, "OUTREACH_STRATEGY", "round_robin")
+        blueprints = MessagesBlueprintText.objects.filter(creator=user).order_by("id")
+        if strategy == "weighted":
+            rows = blueprints.annotate(
+                sends=Count("emailmessage"),
+                reads=Count("emailmessage", filter=Q(emailmessage__status=EmailMessageStatus.READED)),
+            ).values_list("id", "sends", "reads")
+            blueprint_ids = [row[0] for row in rows]
+            weights = [(reads + 1) / (sends + 2) for _, sends, reads in rows]
+        else:
+            blueprint_ids = list(blueprints.values_list("id", flat=True))
+            weights = None
+
+        if not blueprint_ids:
+            logger.info(f"[OUTREACH] No message blueprints for {user} - automatic emails disabled")
+            return None
+        return cls(blueprint_ids, strategy=strategy, weights=weights, batch_size=batch_size)
+
+    def pick(self):
+        """Next blueprint id according to the strategy"""
+        if self.strategy == "weighted":
+            return random.choices(self.blueprint_ids, weights=self.weights, k=1)[0]
+        return next(self._cycle)
+
+    def add(self, parsing_info_id):
+        self.pending.append((self.pick(), parsing_info_id))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Queue everything collected so far; returns the number of messages queued"""
+        count = 0
+        while self.pending:
+            chunk, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            if dispatch.is_enabled():
+                dispatch.enqueue_smtp(chunk)
+            else:
+                smtp_send_mail_batch.delay(chunk)
+            count += len(chunk)
+        if count:
+            self.queued += count
+            logger.info(f"[OUTREACH] Queued {count} emails ({self.queued} total)")
+        return count
@@ -1,8 +1,11 @@
+from smtplib import SMTPServerDisconnected
+
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage as MailMessage, get_connection
 
 from parser_controler.models import ParsingInfo
-from .mailgun import send_email
+from .mailgun import send_email, send_batch_email, MAILGUN_MAX_RECIPIENTS
+from . import dispatch
 from celery import shared_task, group
 from django.utils.html import escape
 import logging
@@ -25,47 +28,213 @@ def send_email_task(self, email: str, name: str, subject: str, template: str):
         logger.exception(f"[EMAIL ERROR] Exception for {email}: {e}")
         raise self.retry(exc=e)
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=60, name="send_batch_email_task")
+def send_batch_email_task(self, recipients: list, subject: str, template: str):
+    try:
+        result = send_batch_email(recipients, subject, template)
+        logger.info(f"[EMAIL BATCH] {result['sent']} sent, {result['failed']} failed.")
+        return result
+    except Exception as e:
+        logger.exception(f"[EMAIL BATCH ERROR] Exception for batch of {len(recipients)}: {e}")
+        raise self.retry(exc=e)
+
+
 @shared_task(name="send_bulk_emails")
-def send_bulk_emails(recipients: list, subject: str, template: str):
-    tasks = []
+def send_bulk_emails(recipients: list, subject: str, template: str, batch: bool = True):
+    """
+    Batch mode (default): one Mailgun call per MAILGUN_BATCH_SIZE recipients.
+    batch=False keeps the old one-task-per-recipient fan-out.
+    """
+    valid = []
     for r in recipients:
-        email = r.get("email")
-        name = r.get("name", "Friend")
-        if not email:
-            logger.warning(f"[SKIP] Skipped empty email for {name}")
+        if not r.get("email"):
+            logger.warning(f"[SKIP] Skipped empty email for {r.get('name', 'Friend')}")
             continue
-        tasks.append(send_email_task.s(email, name, subject, template))
+        valid.append(r)
+
+    if batch and dispatch.is_enabled():
+        # Throttled per recipient domain - dispatch_mail_queue feeds the batch sends
+        queued = dispatch.enqueue_mailgun(valid, subject, template)
+        return {"queued": queued}
+
+    if batch:
+        batch_size = min(getattr(settings, "MAILGUN_BATCH_SIZE", MAILGUN_MAX_RECIPIENTS), MAILGUN_MAX_RECIPIENTS)
+        tasks = [
+            send_batch_email_task.s(valid[i:i + batch_size], subject, template)
+            for i in range(0, len(valid), batch_size)
+        ]
+        logger.info(f"[EMAIL GROUP] Created {len(tasks)} batch sends for {len(valid)} emails.")
+    else:
+        tasks = [
+            send_email_task.s(r["email"], r.get("name", "Friend"), subject, template)
+            for r in valid
+        ]
+        logger.info(f"[EMAIL GROUP] Created group with {len(tasks)} emails.")
 
     job = group(tasks)
-    logger.info(f"[EMAIL GROUP] Created group with {len(tasks)} emails.")
     return job.apply_async()
 
 
 @shared_task(name="smtp_send_mail")
 def smtp_send_mail(message_blueprint_obj_id, parsing_info_obj_id):
-    message_blueprint_obj = MessagesBlueprintText.objects.get(pk=message_blueprint_obj_id)
-    parsing_info_obj = ParsingInfo.objects.get(pk=parsing_info_obj_id)
-    if not parsing_info_obj or not message_blueprint_obj:
-        return
+    """Send one message (admin send / resend) - always sends, even if the profile was mailed before"""
+    return smtp_send_mail_batch([(message_blueprint_obj_id, parsing_info_obj_id)], resend=True)
+
+
+def _open_smtp_connection():
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    return connection
+
+
+@shared_task(name="smtp_send_mail_batch")
+def smtp_send_mail_batch(pairs, resend=False):
+    """
+    Send many (message_blueprint_id, parsing_info_id) messages over one reused SMTP connection.
+
+    Blueprints and profiles are loaded with two queries, messages go out through a single
+    connection (reopened every SMTP_MESSAGES_PER_CONNECTION messages or when the server
+    drops it) and the EmailMessage rows are written with one bulk_create.
+    Profiles that were already mailed successfully are skipped unless resend=True.
+    """
+    pairs = [(int(blueprint_id), int(info_id)) for blueprint_id, info_id in pairs]
+    if not pairs:
+        return {"sent": 0, "failed": 0, "skipped": 0}
+
+    blueprints = MessagesBlueprintText.objects.in_bulk({blueprint_id for blueprint_id, _ in pairs})
+    parsing_infos = ParsingInfo.objects.in_bulk({info_id for _, info_id in pairs})
+
+    already_sent = set()
+    if not resend:
+        already_sent = set(
+            EmailMessage.objects.filter(
+                parsing_info_id__in=parsing_infos.keys(),
+                status__in=[EmailMessageStatus.SENDED, EmailMessageStatus.READED],
+            ).values_list("parsing_info_id", flat=True)
+        )
 
-    recipient_email = parsing_info_obj.email  # Email получателя
     sender_email = settings.EMAIL_HOST_USER  # Email отправителя
+    outgoing = []
+    seen = set()
+    skipped = 0
+    for blueprint_id, info_id in pairs:
+        blueprint = blueprints.get(blueprint_id)
+        parsing_info = parsing_infos.get(info_id)
+        # Не отправляем, если email отсутствует (или профиль уже в этой пачке / уже получил письмо)
+        if not blueprint or not parsing_info or not parsing_info.email or info_id in seen or info_id in already_sent:
+            skipped += 1
+            continue
+        seen.add(info_id)
+        mail = MailMessage(
+            blueprint.message_title or "Default Subject",
+            blueprint.message_text or "Default Message",
+            sender_email,
+            [parsing_info.email],
+        )
+        outgoing.append((blueprint, parsing_info, mail))
+
+    per_connection = getattr(settings, "SMTP_MESSAGES_PER_CONNECTION", 100)
+    results = []
+    connection = None
+    sent_on_connection = 0
+    try:
+        for blueprint, parsing_info, mail in outgoing:
+            status = EmailMessageStatus.ERROR
+            for attempt in range(2):
+                try:
+                    if connection is None or sent_on_connection >= per_connection:
+                        if connection is not None:
+                            connection.close()
+                        connection = _open_smtp_connection()
+                        sent_on_connection = 0
+                    mail.connection = connection
+                    connection.send_messages([mail])
+                    sent_on_connection += 1
+                    status = EmailMessageStatus.SENDED
+                    break
+                except SMTPServerDisconnected as e:
+                    # Server closed the session - reconnect once and retry this message
+                    logger.warning(f"[SMTP] Connection dropped, reconnecting: {e}")
+                    connection = None
+                except Exception as e:
+                    logger.warning(f"[SMTP ERROR] {parsing_info.email}: {e}")
+                    break
+            results.append(EmailMessage(message=blueprint, parsing_info=parsing_info, status=status))
+    finally:
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
 
-    if not recipient_email:
-        return  # Не отправляем, если email отсутствует
+    # Сохранение результатов в EmailMessage одним запросом
+    if results:
+        EmailMessage.objects.bulk_create(
+            results,
+            update_conflicts=True,
+            unique_fields=["parsing_info"],
+            update_fields=["message", "status"],
+        )
 
-    subject = message_blueprint_obj.message_title if message_blueprint_obj else "Default Subject"
-    message_body = message_blueprint_obj.message_text if message_blueprint_obj else "Default Message"
+    sent = sum(1 for row in results if row.status == EmailMessageStatus.SENDED)
+    summary = {"sent": sent, "failed": len(results) - sent, "skipped": skipped}
+    logger.info(f"[SMTP BATCH] {summary['sent']} sent, {summary['failed']} failed, {summary['skipped']} skipped")
+    return summary
 
+
+@shared_task(name="dispatch_mail_queue")
+def dispatch_mail_queue():
+    """
+    Periodic tick: take the sends that are due under the per-domain / global limits
+    and hand them to the batch senders. Jobs that cannot be handed over go back on the queue.
+    """
+    r = dispatch.get_redis()
+    lock = r.lock("dispatch_mail_queue_lock", timeout=60, blocking_timeout=0)
+    if not lock.acquire():
+        return {"skipped": True}
     try:
-        send_mail(subject, message_body, sender_email, [recipient_email], fail_silently=False)
-        status = EmailMessageStatus.SENDED
-    except Exception:
-        status = EmailMessageStatus.ERROR
-
-    # Сохранение результата в EmailMessage
-    EmailMessage.objects.create(
-        message=message_blueprint_obj,
-        parsing_info=parsing_info_obj,
-        status=status
-    )
\ No newline at end of file
+        jobs = dispatch.pop_due_jobs(r)
+        if not jobs:
+            return {"dispatched": 0}
+
+        smtp_jobs = []
+        campaigns = {}
+        for job in jobs:
+            if job["kind"] == "smtp":
+                smtp_jobs.append(job)
+            else:
+                campaigns.setdefault(job["campaign"], []).append(job)
+
+        failed = []
+        batch_size = getattr(settings, "OUTREACH_BATCH_SIZE", 100)
+        for i in range(0, len(smtp_jobs), batch_size):
+            chunk = smtp_jobs[i:i + batch_size]
+            try:
+                smtp_send_mail_batch.delay([(job["blueprint_id"], job["parsing_info_id"]) for job in chunk])
+            except Exception as e:
+                logger.error(f"[DISPATCH] Could not queue {len(chunk)} SMTP sends: {e}")
+                failed.extend(chunk)
+
+        for campaign_id, campaign_jobs in campaigns.items():
+            campaign = dispatch.get_campaign(campaign_id, r)
+            if not campaign:
+                logger.warning(f"[DISPATCH] Campaign {campaign_id} expired, dropping {len(campaign_jobs)} sends")
+                continue
+            recipients = [{"email": job["email"], "name": job["name"]} for job in campaign_jobs]
+            try:
+                send_batch_email_task.delay(recipients, campaign["subject"], campaign["template"])
+            except Exception as e:
+                logger.error(f"[DISPATCH] Could not queue {len(campaign_jobs)} Mailgun sends: {e}")
+                failed.extend(campaign_jobs)
+
+        if failed:
+            dispatch.requeue_jobs(failed, r)
+
+        dispatched = len(jobs) - len(failed)
+        logger.info(f"[DISPATCH] Dispatched {dispatched} sends ({len(smtp_jobs)} SMTP, {len(jobs) - len(smtp_jobs)} Mailgun, {len(failed)} requeued)")
+        return {"dispatched": dispatched, "requeued": len(failed)}
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
@@ -20,10 +20,12 @@ def mailgun_webhook(request):
 
         logger.info(f"[MAILGUN WEBHOOK] Event: {event} | ID: {mailgun_id}")
 
-        log = EmailLog.objects.filter(mailgun_id=mailgun_id).first()
-        if log:
-            log.status = event
-            log.save(update_fields=["status"])
+        # Batch sends share one mailgun_id, so narrow down by recipient when it is given
+        logs = EmailLog.objects.filter(mailgun_id=mailgun_id)
+        recipient = payload.get("recipient")
+        if recipient:
+            logs = logs.filter(email=recipient)
+        if logs.update(status=event):
             return JsonResponse({"status": "updated"}, status=200)
 
         # Optional fallback
@@ -0,0 +1,131 @@
+# domain_resolver.py - Company domain lookups on their own browser and thread
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from parser.engine.linkedin.driver_pool import driver_pool
+from parser.engine.linkedin.search_options.extract_company_domain import extract_domain
+from parser.engine.linkedin.search_options.domain_cache import get_cached_domain
+
+logger = logging.getLogger(__name__)
+
+
+class DomainResolver:
+    """
+    Resolves company -> domain in the background so the search browser never leaves the results.
+
+    Companies are queued with submit() as soon as their cards are collected; a single worker
+    thread leases its own logged-in driver from the pool and visits the company pages one by one.
+    resolve() waits for a queued lookup (submitting it first if needed) and returns the domain.
+    Results are only handed out through resolve(), so callers can keep their own cache dict
+    without sharing it across threads.
+    """
+
+    def __init__(self, known_domains: Optional[Dict[str, Optional[str]]] = None, timeout: int = 90):
+        self.timeout = timeout
+        self._known = dict(known_domains or {})
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="domain-resolver")
+        self._pooled = None
+        self._driver_failed = False
+
+    def submit(self, company: str):
+        """Queue a company lookup (no-op if it is known or already queued)"""
+        if not company or company == "Unknown":
+            return
+        with self._lock:
+            if company in self._known or company in self._futures:
+                return
+        
+        # Companies resolved by earlier requests never reach the worker
+        hit, domain = get_cached_domain(company)
+        with self._lock:
+            if hit:
+                self._known[company] = domain
+                return
+            if company in self._futures:
+                return
+            self._futures[company] = self._executor.submit(self._lookup, company)
+        logger.info(f"[DOMAIN_RESOLVER] Queued lookup for {company}")
+
+    def resolve(self, company: str) -> Optional[str]:
+        """Domain for the company, waiting for the background lookup if it is still running"""
+        if not company or company == "Unknown":
+            return None
+        if company in self._known:
+            return self._known[company]
+
+        self.submit(company)
+        with self._lock:
+            if company in self._known:
+                return self._known[company]
+            future = self._futures[company]
+        try:
+            domain = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Remember the miss so other people at this company don't wait out the timeout again
+            logger.warning(f"[DOMAIN_RESOLVER] Lookup for {company} timed out after {self.timeout}s")
+            future.cancel()
+            domain = None
+        except Exception as e:
+            logger.warning(f"[DOMAIN_RESOLVER] Lookup for {company} failed: {e}")
+            domain = None
+
+        with self._lock:
+            self._known[company] = domain
+            self._futures.pop(company, None)
+        return domain
+
+    def close(self):
+        """Drop pending lookups and hand the resolver's driver back to the pool"""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.submit(self._release_driver)
+        self._executor.shutdown(wait=True)
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _lookup(self, company: str) -> Optional[str]:
+        driver = self._get_driver()
+        if driver is None:
+            return None
+        try:
+            domain = extract_domain(driver, company)
+            logger.info(f"[DOMAIN_RESOLVER] {company} -> {domain}")
+            return domain
+        except Exception as e:
+            logger.warning(f"[DOMAIN_RESOLVER] Domain extraction failed for {company}: {e}")
+            return None
+
+    def _get_driver(self):
+        if self._pooled is None and not self._driver_failed:
+            try:
+                self._pooled = driver_pool.acquire()
+                logger.info("[DOMAIN_RESOLVER] Leased a dedicated driver for domain lookups")
+            except Exception as e:
+                logger.error(f"[DOMAIN_RESOLVER] Could not get a driver, domain lookups disabled: {e}")
+                self._driver_failed = True
+        return self._pooled.driver if self._pooled else None
+
+    def _release_driver(self):
+        if self._pooled is None:
+            return
+        try:
+            driver_pool.release(self._pooled)
+        except Exception as e:
+            logger.warning(f"[DOMAIN_RESOLVER] Error releasing driver: {e}")
+        self._pooled = None
+
+
+def create_domain_resolver(known_domains: Optional[Dict[str, Optional[str]]] = None) -> Optional[DomainResolver]:
+    """A background resolver, or None when lookups should stay on the search driver"""
+    if not getattr(settings, "DOMAIN_RESOLVER_ENABLED", True):
+        return None
+    return DomainResolver(known_domains, timeout=getattr(settings, "DOMAIN_RESOLVER_TIMEOUT", 90))
@@ -0,0 +1,246 @@
+# driver_pool.py - Per-worker pool of warm, logged-in Chrome drivers
+import os
+import time
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.conf import settings
+from selenium.webdriver.support.ui import WebDriverWait
+
+from parser.engine.linkedin.login import get_logged_driver, credential
+
+logger = logging.getLogger(__name__)
+LINKEDIN_FEED_URL = "https://www.linkedin.com/feed/"
+
+
+@dataclass
+class PooledDriver:
+    driver: object
+    email: Optional[str]
+    created_at: float
+    last_used_at: float
+    leases: int = 0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    @property
+    def idle_for(self) -> float:
+        return time.time() - self.last_used_at
+
+    @property
+    def is_fresh(self) -> bool:
+        """True on the first lease, i.e. the browser was just launched and logged in"""
+        return self.leases <= 1
+
+
+class DriverPool:
+    """
+    Keeps logged-in Chrome drivers alive between parsing runs of the same worker process.
+
+    Drivers are leased with acquire() and handed back with release() (or discard() when
+    the run left the browser in an unknown state). Idle drivers are evicted after
+    idle_timeout seconds and every driver is recycled after max_age seconds or
+    max_leases runs, so long-lived sessions don't accumulate LinkedIn suspicion or memory.
+    """
+
+    def __init__(self,
+                 max_size: int = 1,
+                 idle_timeout: int = 900,  # 15 minutes
+                 max_age: int = 3600,  # 1 hour
+                 max_leases: int = 25,
+                 reaper_interval: int = 60,
+                 enabled: bool = True):
+
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.max_leases = max_leases
+        self.reaper_interval = reaper_interval
+        self.enabled = enabled
+
+        self._idle: List[PooledDriver] = []
+        self._leased = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+        self._reaper_thread = None
+        self._stop_reaper = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
+    def acquire(self) -> PooledDriver:
+        """Lease a healthy logged-in driver, launching a new one if none is warm"""
+        self._reset_after_fork()
+        self.evict_expired()
+
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None  # LIFO - warmest first
+
+            if entry is None:
+                break
+
+            if self._is_healthy(entry):
+                return self._mark_leased(entry)
+
+            logger.info("[POOL] Warm driver failed health check, discarding")
+            self._quit(entry, reason="unhealthy")
+
+        logger.info("[POOL] No warm driver available, launching a new one...")
+        driver = get_logged_driver()
+        active = credential.active_credentials or {}
+        now = time.time()
+        entry = PooledDriver(driver=driver, email=active.get("email"), created_at=now, last_used_at=now)
+        return self._mark_leased(entry)
+
+    def release(self, entry: PooledDriver):
+        """Return a driver to the pool, or quit it if it can't be reused"""
+        with self._lock:
+            self._leased = max(0, self._leased - 1)
+        entry.last_used_at = time.time()
+
+        if not self.enabled:
+            self._quit(entry, reason="pool disabled")
+            return
+
+        if entry.age > self.max_age or entry.leases >= self.max_leases:
+            self._quit(entry, reason="max age/leases reached")
+            return
+
+        # Park the browser on the feed now so the next lease starts immediately
+        if not self._reset_to_feed(entry):
+            self._quit(entry, reason="session lost")
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(entry)
+                entry = None
+
+        if entry is not None:
+            self._quit(entry, reason="pool full")
+            return
+
+        logger.info(f"[POOL] Driver returned to pool ({len(self._idle)} idle)")
+        self._start_reaper()
+
+    def discard(self, entry: PooledDriver):
+        """Quit a leased driver without returning it to the pool"""
+        with self._lock:
+            self._leased = max(0, self._leased - 1)
+        self._quit(entry, reason="discarded")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def evict_expired(self):
+        """Quit idle drivers that have been unused too long or are too old"""
+        with self._lock:
+            expired = [e for e in self._idle if e.idle_for > self.idle_timeout or e.age > self.max_age]
+            self._idle = [e for e in self._idle if e not in expired]
+
+        for entry in expired:
+            self._quit(entry, reason="expired")
+        return len(expired)
+
+    def shutdown(self):
+        """Quit every idle driver (called on worker shutdown)"""
+        self._stop_reaper.set()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._quit(entry, reason="shutdown")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "leased": self._leased,
+                "max_size": self.max_size,
+                "enabled": self.enabled,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _mark_leased(self, entry: PooledDriver) -> PooledDriver:
+        entry.leases += 1
+        entry.last_used_at = time.time()
+        with self._lock:
+            self._leased += 1
+        logger.info(f"[POOL] Leased driver for {entry.email} (lease #{entry.leases}, age {int(entry.age)}s)")
+        return entry
+
+    def _is_healthy(self, entry: PooledDriver) -> bool:
+        """Cheap check first (browser alive and still on /feed), full reload only if needed"""
+        try:
+            if "/feed" in entry.driver.current_url:
+                return True
+        except Exception as e:
+            logger.warning(f"[POOL] Driver not responding: {e}")
+            return False
+        return self._reset_to_feed(entry)
+
+    def _reset_to_feed(self, entry: PooledDriver) -> bool:
+        try:
+            entry.driver.get(LINKEDIN_FEED_URL)
+            WebDriverWait(entry.driver, 15).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            current_url = entry.driver.current_url
+            if "/feed" not in current_url or "login" in current_url or "checkpoint" in current_url:
+                logger.warning(f"[POOL] Session no longer on feed: {current_url}")
+                return False
+            return True
+        except Exception as e:
+            logger.warning(f"[POOL] Failed to reset driver to feed: {e}")
+            return False
+
+    def _quit(self, entry: PooledDriver, reason: str = ""):
+        try:
+            entry.driver.quit()
+            logger.info(f"[POOL] Driver for {entry.email} closed ({reason})")
+        except Exception as e:
+            logger.warning(f"[POOL] Error closing driver: {e}")
+
+    def _reset_after_fork(self):
+        """Drivers created in a parent process are not usable from a forked child"""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle = []
+            self._leased = 0
+            self._lock = threading.Lock()
+            self._reaper_thread = None
+            self._stop_reaper = threading.Event()
+
+    def _start_reaper(self):
+        if self._reaper_thread and self._reaper_thread.is_alive():
+            return
+        self._reaper_thread = threading.Thread(target=self._reaper_loop, daemon=True, name="driver-pool-reaper")
+        self._reaper_thread.start()
+
+    def _reaper_loop(self):
+        while not self._stop_reaper.wait(self.reaper_interval):
+            try:
+                self.evict_expired()
+                with self._lock:
+                    if not self._idle:
+                        break
+            except Exception as e:
+                logger.error(f"[POOL] Reaper error: {e}")
+
+
+driver_pool = DriverPool(
+    max_size=getattr(settings, "DRIVER_POOL_SIZE", 2),
+    idle_timeout=getattr(settings, "DRIVER_POOL_IDLE_TIMEOUT", 900),
+    max_age=getattr(settings, "DRIVER_POOL_MAX_AGE", 3600),
+    max_leases=getattr(settings, "DRIVER_POOL_MAX_LEASES", 25),
+    enabled=getattr(settings, "DRIVER_POOL_ENABLED", True),
+)
+atexit.register(driver_pool.shutdown)
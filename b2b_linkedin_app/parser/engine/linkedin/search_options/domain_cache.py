@@ -0,0 +1,88 @@
+# domain_cache.py - Shared company -> domain cache (Redis via Django cache)
+import re
+import logging
+import unicodedata
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "company_domain:"
+HITS_KEY = "company_domain_stats:hits"
+MISSES_KEY = "company_domain_stats:misses"
+NO_DOMAIN = ""  # stored for companies we looked up and found nothing for
+
+# Legal suffixes dropped so "Acme SAS" and "ACME" share an entry
+LEGAL_SUFFIXES = r"\b(inc|llc|ltd|limited|corp|corporation|co|gmbh|sa|sas|sarl|srl|bv|ag|plc|group|groupe)\b"
+
+
+def normalize_company_name(company_name: str) -> str:
+    name = unicodedata.normalize("NFKD", company_name or "").encode("ascii", "ignore").decode("ascii")
+    name = re.sub(r"[^a-z0-9\s]", " ", name.lower())
+    name = re.sub(LEGAL_SUFFIXES, " ", name)
+    return re.sub(r"\s+", " ", name).strip()
+
+
+def get_cached_domain(company_name: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (hit, domain). A hit with domain None means the company was looked up
+    recently and has no known domain, so callers should not look it up again.
+    """
+    key = normalize_company_name(company_name)
+    if not key:
+        return False, None
+
+    try:
+        value = cache.get(CACHE_PREFIX + key)
+    except Exception as e:
+        logger.warning(f"[DOMAIN_CACHE] Cache read failed for {company_name}: {e}")
+        return False, None
+
+    if value is None:
+        _count(MISSES_KEY)
+        return False, None
+
+    _count(HITS_KEY)
+    logger.info(f"[DOMAIN_CACHE] Hit for {company_name}: {value or 'no domain'}")
+    return True, value or None
+
+
+def cache_domain(company_name: str, domain: Optional[str]):
+    """Store a lookup result - a found domain for DOMAIN_CACHE_TTL, a miss for DOMAIN_CACHE_NEGATIVE_TTL"""
+    key = normalize_company_name(company_name)
+    if not key:
+        return
+
+    if domain:
+        timeout = getattr(settings, "DOMAIN_CACHE_TTL", 30 * 24 * 3600)
+    else:
+        timeout = getattr(settings, "DOMAIN_CACHE_NEGATIVE_TTL", 24 * 3600)
+
+    try:
+        cache.set(CACHE_PREFIX + key, domain or NO_DOMAIN, timeout=timeout)
+    except Exception as e:
+        logger.warning(f"[DOMAIN_CACHE] Cache write failed for {company_name}: {e}")
+
+
+def get_domain_cache_stats() -> dict:
+    try:
+        hits = cache.get(HITS_KEY) or 0
+        misses = cache.get(MISSES_KEY) or 0
+    except Exception:
+        hits = misses = 0
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total * 100, 1) if total else 0,
+    }
+
+
+def _count(key: str):
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        pass
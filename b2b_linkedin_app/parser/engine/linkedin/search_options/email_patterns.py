@@ -0,0 +1,213 @@
+# email_patterns.py - Per-domain email pattern model learned from confirmed emails (Django cache)
+import re
+import logging
+import time
+import unicodedata
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "email_pattern:"
+SEARCHED_PREFIX = "email_pattern_searched:"  # domains already sent to Hunter domain-search
+
+# Hunter's pattern notation, so domain-search patterns can be used as-is
+PATTERNS = [
+    "{first}.{last}",
+    "{first}",
+    "{first}{last}",
+    "{f}{last}",
+    "{first}.{l}",
+    "{f}.{last}",
+    "{last}.{first}",
+    "{last}",
+    "{first}-{last}",
+    "{first}_{last}",
+    "{first}{l}",
+    "{last}{f}",
+    "{last}.{f}",
+    "{last}{first}",
+    "{f}{l}",
+]
+
+# Evidence weights by source
+WEIGHT_DELIVERED = 3.0   # mail to the address was delivered / read
+WEIGHT_HUNTER = 1.0      # Hunter domain-search / email-finder result
+WEIGHT_HUNTER_PATTERN = 2.0  # Hunter's own pattern for the domain
+
+
+def clean_name(name: str) -> str:
+    name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def split_full_name(full_name: str) -> Tuple[str, str]:
+    """Same split as the search engine: first word / last word"""
+    parts = (full_name or "").split()
+    return (parts[0] if parts else ""), (parts[-1] if len(parts) > 1 else "")
+
+
+def render_pattern(pattern: str, first_name: str, last_name: str) -> Optional[str]:
+    first, last = clean_name(first_name), clean_name(last_name)
+    if not first or (("{last}" in pattern or "{l}" in pattern) and not last):
+        return None
+    return pattern.format(first=first, last=last, f=first[:1], l=last[:1])
+
+
+def detect_pattern(email: str, first_name: str, last_name: str) -> Optional[str]:
+    """Which pattern produced this address's local part (None if no known pattern fits)"""
+    if not email or "@" not in email:
+        return None
+    local = email.split("@", 1)[0].lower()
+    for pattern in PATTERNS:
+        if render_pattern(pattern, first_name, last_name) == local:
+            return pattern
+    return None
+
+
+def get_domain_model(domain: str) -> Optional[Dict]:
+    """
+    {"hunter": {pattern: weight}, "history": {pattern: weight}, "samples": {"hunter": n, "history": n}}
+    or None. Hunter evidence accumulates; delivery history is replaced on every rebuild.
+    """
+    if not domain:
+        return None
+    try:
+        return cache.get(CACHE_PREFIX + domain.lower())
+    except Exception as e:
+        logger.warning(f"[EMAIL_PATTERN] Cache read failed for {domain}: {e}")
+        return None
+
+
+def _save_model(domain: str, model: Dict):
+    try:
+        cache.set(CACHE_PREFIX + domain.lower(), model, timeout=getattr(settings, "EMAIL_PATTERN_TTL", 30 * 24 * 3600))
+    except Exception as e:
+        logger.warning(f"[EMAIL_PATTERN] Cache write failed for {domain}: {e}")
+
+
+def learn_patterns(domain: str, observations: Iterable[Tuple[str, float]], source: str = "hunter"):
+    """Add (pattern, weight) observations to the domain's model ("history" replaces the previous history)"""
+    observations = [(pattern, weight) for pattern, weight in observations if pattern in PATTERNS]
+    if not domain or not observations:
+        return
+    model = get_domain_model(domain) or {"hunter": {}, "history": {}, "samples": {"hunter": 0, "history": 0}}
+    if source == "history":
+        model["history"] = {}
+        model["samples"]["history"] = 0
+    counts = model[source]
+    for pattern, weight in observations:
+        counts[pattern] = counts.get(pattern, 0) + weight
+        model["samples"][source] += 1
+    model["updated_at"] = time.time()
+    _save_model(domain, model)
+
+
+def learn_from_email(email: str, first_name: str, last_name: str, weight: float = WEIGHT_HUNTER) -> Optional[str]:
+    """Learn from one confirmed address; returns the detected pattern"""
+    pattern = detect_pattern(email, first_name, last_name)
+    if pattern:
+        learn_patterns(email.rsplit("@", 1)[1].lower(), [(pattern, weight)])
+    return pattern
+
+
+def best_pattern(domain: str) -> Tuple[Optional[str], int]:
+    """
+    (pattern, confidence 0-100) for the domain. Confidence is the pattern's share of the
+    evidence, discounted while there are only a few samples.
+    """
+    model = get_domain_model(domain)
+    if not model:
+        return None, 0
+    counts = dict(model["hunter"])
+    for pattern, weight in model["history"].items():
+        counts[pattern] = counts.get(pattern, 0) + weight
+    if not counts:
+        return None, 0
+    pattern = max(counts, key=counts.get)
+    share = counts[pattern] / sum(counts.values())
+    samples = sum(model["samples"].values())
+    confidence = share * samples / (samples + 1)
+    return pattern, round(confidence * 100)
+
+
+def generate_email(first_name: str, last_name: str, domain: str) -> Tuple[Optional[str], int]:
+    """(email, confidence) from the domain's learned pattern, without any API call"""
+    pattern, confidence = best_pattern(domain)
+    if not pattern:
+        return None, 0
+    local = render_pattern(pattern, first_name, last_name)
+    if not local:
+        return None, 0
+    return f"{local}@{domain.lower()}", confidence
+
+
+def learn_from_hunter_domain_search(domain: str, client) -> bool:
+    """
+    One Hunter domain-search call per domain (remembered for EMAIL_PATTERN_TTL):
+    learns Hunter's pattern plus every named address it returns.
+    `client` is a hunter_client.HunterClient.
+    """
+    if not domain or client is None:
+        return False
+    searched_key = SEARCHED_PREFIX + domain.lower()
+    try:
+        if cache.get(searched_key):
+            return False
+    except Exception:
+        pass
+
+    data = client.domain_search(domain)
+    if data is None:
+        return False  # failed or rate limited - try again next time
+    try:
+        cache.set(searched_key, 1, timeout=getattr(settings, "EMAIL_PATTERN_TTL", 30 * 24 * 3600))
+    except Exception:
+        pass
+
+    observations = []
+    if data.get("pattern") in PATTERNS:
+        observations.append((data["pattern"], WEIGHT_HUNTER_PATTERN))
+    for entry in data.get("emails") or []:
+        pattern = detect_pattern(entry.get("value"), entry.get("first_name"), entry.get("last_name"))
+        if pattern:
+            observations.append((pattern, WEIGHT_HUNTER * (entry.get("confidence") or 50) / 100))
+
+    learn_patterns(domain, observations)
+    logger.info(f"[EMAIL_PATTERN] Learned {len(observations)} observations for {domain} from Hunter")
+    return bool(observations)
+
+
+def rebuild_patterns_from_history(delivered_statuses=("delivered", "opened", "clicked")) -> Dict[str, int]:
+    """
+    Learn from every address we know reached a person: profiles whose email shows up in
+    EmailLog with a delivery event, or whose SMTP outreach was read. Unconfirmed ParsingInfo
+    emails are skipped - many are our own guesses and would only reinforce them.
+    """
+    from mailer.models import EmailLog, EmailMessage, EmailMessageStatus
+    from parser_controler.models import ParsingInfo
+
+    delivered = {
+        email.lower()
+        for email in EmailLog.objects.filter(status__in=delivered_statuses).values_list("email", flat=True).distinct()
+    }
+    read_ids = set(
+        EmailMessage.objects.filter(status=EmailMessageStatus.READED).values_list("parsing_info_id", flat=True)
+    )
+
+    observations = {}
+    profiles = ParsingInfo.objects.exclude(email__isnull=True).exclude(email="").values_list("id", "full_name", "email")
+    for info_id, full_name, email in profiles.iterator(chunk_size=5000):
+        if email.lower() not in delivered and info_id not in read_ids:
+            continue
+        first, last = split_full_name(full_name)
+        pattern = detect_pattern(email, first, last)
+        if pattern:
+            observations.setdefault(email.rsplit("@", 1)[1].lower(), []).append((pattern, WEIGHT_DELIVERED))
+
+    for domain, domain_observations in observations.items():
+        learn_patterns(domain, domain_observations, source="history")
+    logger.info(f"[EMAIL_PATTERN] Learned patterns for {len(observations)} domains from delivery history")
+    return {domain: len(items) for domain, items in observations.items()}
@@ -0,0 +1,305 @@
+# email_verifier.py - Concurrent MX lookup and optional SMTP RCPT probing for guessed domains / emails
+import asyncio
+import concurrent.futures
+import logging
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:
+    dns = None
+
+logger = logging.getLogger(__name__)
+
+MX_CACHE_PREFIX = "mx_records:"
+CATCH_ALL_PREFIX = "smtp_catch_all:"
+
+_verifier = None
+_verifier_settings = None
+_verifier_lock = threading.Lock()
+
+
+class EmailVerifier:
+    """
+    Checks candidate domains / addresses concurrently (at most `concurrency` at a time).
+
+    MX records are cached in-process and in the Django cache (an empty list means "no mail
+    server"); a domain without MX but with an A record counts as its own mail server.
+    With smtp_probe=True each candidate is also tried with EHLO / MAIL FROM / RCPT TO against
+    the domain's first MX; domains that accept a random address are treated as catch-all
+    and their answers are ignored. Nameservers and ports are configurable so the verifier can
+    run against a local stub DNS / SMTP server.
+    """
+
+    def __init__(
+        self,
+        nameservers: Optional[List[str]] = None,
+        dns_port: int = 53,
+        smtp_port: int = 25,
+        smtp_probe: bool = False,
+        concurrency: int = 20,
+        timeout: float = 5.0,
+        helo_host: Optional[str] = None,
+        mail_from: str = "",
+        mx_cache_ttl: int = 24 * 3600,
+    ):
+        self.nameservers = nameservers or []
+        self.dns_port = dns_port
+        self.smtp_port = smtp_port
+        self.smtp_probe = smtp_probe
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.helo_host = helo_host or socket.getfqdn()
+        self.mail_from = mail_from
+        self.mx_cache_ttl = mx_cache_ttl
+        self._mx: Dict[str, tuple] = {}  # domain -> (expires_at, hosts)
+
+    @staticmethod
+    def settings_kwargs() -> Dict:
+        return dict(
+            nameservers=list(getattr(settings, "EMAIL_VERIFY_NAMESERVERS", []) or []),
+            dns_port=getattr(settings, "EMAIL_VERIFY_DNS_PORT", 53),
+            smtp_port=getattr(settings, "EMAIL_VERIFY_SMTP_PORT", 25),
+            smtp_probe=getattr(settings, "EMAIL_VERIFY_SMTP_PROBE", False),
+            concurrency=getattr(settings, "EMAIL_VERIFY_CONCURRENCY", 20),
+            timeout=getattr(settings, "EMAIL_VERIFY_TIMEOUT", 5),
+            helo_host=getattr(settings, "EMAIL_VERIFY_HELO_HOST", None),
+            mail_from=getattr(settings, "EMAIL_VERIFY_MAIL_FROM", ""),
+            mx_cache_ttl=getattr(settings, "EMAIL_VERIFY_MX_CACHE_TTL", 24 * 3600),
+        )
+
+    @classmethod
+    def from_settings(cls) -> "EmailVerifier":
+        return cls(**cls.settings_kwargs())
+
+    # ------------------------------------------------------------------
+    # DNS
+    # ------------------------------------------------------------------
+    def _resolver(self):
+        resolver = dns.asyncresolver.Resolver(configure=not self.nameservers)
+        if self.nameservers:
+            resolver.nameservers = self.nameservers
+        resolver.port = self.dns_port
+        resolver.lifetime = self.timeout
+        return resolver
+
+    def _cached_mx(self, domain: str) -> Optional[List[str]]:
+        entry = self._mx.get(domain)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        try:
+            hosts = cache.get(MX_CACHE_PREFIX + domain)
+        except Exception:
+            hosts = None
+        if hosts is not None:
+            self._mx[domain] = (time.time() + self.mx_cache_ttl, hosts)
+        return hosts
+
+    def _store_mx(self, domain: str, hosts: List[str]):
+        self._mx[domain] = (time.time() + self.mx_cache_ttl, hosts)
+        try:
+            cache.set(MX_CACHE_PREFIX + domain, hosts, timeout=self.mx_cache_ttl)
+        except Exception as e:
+            logger.warning(f"[VERIFY] MX cache write failed for {domain}: {e}")
+
+    async def resolve_mx(self, domain: str, resolver=None) -> Optional[List[str]]:
+        """Mail hosts by preference, [] if the domain cannot receive mail, None if DNS failed"""
+        domain = domain.lower().rstrip(".")
+        hosts = self._cached_mx(domain)
+        if hosts is not None:
+            return hosts
+
+        resolver = resolver or self._resolver()
+        try:
+            answer = await resolver.resolve(domain, "MX")
+            records = sorted(answer, key=lambda record: record.preference)
+            hosts = [record.exchange.to_text().rstrip(".") for record in records]
+            hosts = [host for host in hosts if host]  # "." is a null MX (RFC 7505)
+        except dns.resolver.NXDOMAIN:
+            hosts = []
+        except dns.resolver.NoAnswer:
+            hosts = None
+        except dns.exception.DNSException as e:  # timeouts, no nameservers, invalid names (LabelTooLong, ...)
+            logger.warning(f"[VERIFY] MX lookup failed for {domain}: {e}")
+            return None
+
+        if hosts is None:
+            # No MX: the A record is the implicit mail server (RFC 5321)
+            try:
+                await resolver.resolve(domain, "A")
+                hosts = [domain]
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                hosts = []
+            except dns.exception.DNSException as e:
+                logger.warning(f"[VERIFY] A lookup failed for {domain}: {e}")
+                return None
+
+        self._store_mx(domain, hosts)
+        return hosts
+
+    # ------------------------------------------------------------------
+    # SMTP
+    # ------------------------------------------------------------------
+    async def _read_reply(self, reader) -> int:
+        """Status code of a (possibly multi-line) SMTP reply"""
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            if line[3:4] != b"-":
+                return int(line[:3])
+
+    async def _rcpt(self, host: str, addresses: List[str]) -> List[Optional[bool]]:
+        """RCPT TO each address in one session: True accepted, False rejected, None unknown"""
+        results: List[Optional[bool]] = [None] * len(addresses)
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, self.smtp_port), self.timeout)
+
+            async def command(line: str) -> int:
+                writer.write(f"{line}\r\n".encode())
+                await writer.drain()
+                return await self._read_reply(reader)
+
+            if await self._read_reply(reader) != 220:
+                return results
+            if await command(f"EHLO {self.helo_host}") != 250 and await command(f"HELO {self.helo_host}") != 250:
+                return results
+            if await command(f"MAIL FROM:<{self.mail_from}>") != 250:
+                return results
+            for i, address in enumerate(addresses):
+                code = await command(f"RCPT TO:<{address}>")
+                if code in (250, 251):
+                    results[i] = True
+                elif 500 <= code < 600:
+                    results[i] = False
+            await command("QUIT")
+        except (OSError, asyncio.TimeoutError, ConnectionError, ValueError) as e:
+            logger.info(f"[VERIFY] SMTP probe against {host} failed: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+        return results
+
+    async def probe_addresses(self, domain: str, addresses: List[str], mx_hosts: List[str]) -> List[Optional[bool]]:
+        """RCPT results for addresses at one domain; all None for catch-all domains"""
+        catch_all_key = CATCH_ALL_PREFIX + domain
+        try:
+            catch_all = cache.get(catch_all_key)
+        except Exception:
+            catch_all = None
+        if catch_all:
+            return [None] * len(addresses)
+
+        probe = f"{uuid.uuid4().hex[:16]}@{domain}"
+        results = await self._rcpt(mx_hosts[0], addresses + [probe])
+        if results[-1] is not None:
+            try:
+                cache.set(catch_all_key, results[-1], timeout=self.mx_cache_ttl)
+            except Exception:
+                pass
+        if results[-1]:
+            logger.info(f"[VERIFY] {domain} accepts any address (catch-all)")
+            return [None] * len(addresses)
+        return results[:-1]
+
+    # ------------------------------------------------------------------
+    # Candidate selection
+    # ------------------------------------------------------------------
+    async def best_domain(self, domains: List[str], resolver=None) -> Optional[str]:
+        """First domain (in the given order) that can receive mail, None if none can"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        resolver = resolver or self._resolver()
+
+        async def check(domain):
+            async with semaphore:
+                return await self.resolve_mx(domain, resolver)
+
+        results = await asyncio.gather(*(check(domain) for domain in domains))
+        for domain, hosts in zip(domains, results):
+            if hosts:
+                return domain
+        if domains and all(hosts is None for hosts in results):
+            return domains[0]  # DNS unreachable - keep the old unverified guess
+        return None
+
+    async def best_email(self, candidates: List[str], resolver=None) -> Optional[str]:
+        """
+        The first candidate the mail server accepts, or - when probing is off or inconclusive -
+        the first candidate whose domain has a mail server. None if no domain can receive mail.
+        """
+        by_domain: Dict[str, List[str]] = {}
+        for email in candidates:
+            by_domain.setdefault(email.rsplit("@", 1)[1].lower(), []).append(email)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        resolver = resolver or self._resolver()
+
+        async def check(domain, addresses):
+            async with semaphore:
+                hosts = await self.resolve_mx(domain, resolver)
+                if not hosts:
+                    return hosts, [None] * len(addresses)
+                if not self.smtp_probe:
+                    return hosts, [None] * len(addresses)
+                return hosts, await self.probe_addresses(domain, addresses, hosts)
+
+        checked = await asyncio.gather(*(check(domain, addresses) for domain, addresses in by_domain.items()))
+
+        verdicts = {}
+        deliverable_domains = set()
+        for (domain, addresses), (hosts, results) in zip(by_domain.items(), checked):
+            if hosts or hosts is None:  # DNS failure: don't throw the guess away
+                deliverable_domains.add(domain)
+            verdicts.update(zip(addresses, results))
+
+        for email in candidates:
+            if verdicts.get(email) is True:
+                return email
+        for email in candidates:
+            domain = email.rsplit("@", 1)[1].lower()
+            if domain in deliverable_domains and verdicts.get(email) is not False:
+                return email
+        return None
+
+
+def is_enabled() -> bool:
+    return dns is not None and getattr(settings, "EMAIL_VERIFY_ENABLED", True)
+
+
+def run_async(coro):
+    """Run a coroutine from sync code, even if this thread already has an event loop running"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def get_verifier() -> EmailVerifier:
+    """Process-wide verifier, so its in-process MX cache outlives a single lookup (rebuilt if settings change)"""
+    global _verifier, _verifier_settings
+    kwargs = EmailVerifier.settings_kwargs()
+    with _verifier_lock:
+        if _verifier is None or _verifier_settings != kwargs:
+            _verifier = EmailVerifier(**kwargs)
+            _verifier_settings = kwargs
+        return _verifier
+
+
+def pick_verified_domain(domains: List[str]) -> Optional[str]:
+    return run_async(get_verifier().best_domain(domains))
+
+
+def pick_verified_email(candidates: List[str]) -> Optional[str]:
+    return run_async(get_verifier().best_email(candidates))
@@ -8,9 +8,25 @@ import time
 import logging
 import re
 
+from parser.engine.linkedin.search_options.domain_cache import get_cached_domain, cache_domain
+from parser.engine.linkedin.search_options.email_verifier import is_enabled as is_verification_enabled, pick_verified_domain
+
 logger = logging.getLogger(__name__)
 
 def extract_domain(driver, company_name: str) -> str | None:
+    """
+    Domain for a company - from the shared cache when possible, otherwise scraped
+    (and cached, including "no domain found" results)
+    """
+    hit, domain = get_cached_domain(company_name)
+    if hit:
+        return domain
+
+    domain = scrape_domain(driver, company_name)
+    cache_domain(company_name, domain)
+    return domain
+
+def scrape_domain(driver, company_name: str) -> str | None:
     """
     Enhanced domain extraction with multiple fallback strategies
     """
@@ -144,6 +160,17 @@ def guess_domain_from_company_name(company_name: str) -> str | None:
             f"https://{clean_name}.com",
         ]
         
+        # Keep the first guess whose domain can receive mail (checked concurrently)
+        if is_verification_enabled():
+            hosts = [domain.split("://", 1)[1].replace("www.", "", 1) for domain in possible_domains]
+            verified = pick_verified_domain(list(dict.fromkeys(hosts)))
+            if not verified:
+                logger.info(f"[GUESS] No guessed domain for {company_name} has a mail server")
+                return None
+            domain = possible_domains[hosts.index(verified)]
+            logger.info(f"[GUESS] Verified domain: {domain}")
+            return domain
+        
         # Return first guess (you could validate these with HTTP requests)
         for domain in possible_domains:
             logger.info(f"[GUESS] Guessing domain: {domain}")
@@ -1,80 +1,100 @@
 # Enhanced extract_email.py
-import requests
 import logging
 import re
 import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+
+from django.conf import settings
+
+from parser.engine.linkedin.search_options.email_patterns import (
+    generate_email,
+    learn_from_email,
+    learn_from_hunter_domain_search,
+)
+from parser.engine.linkedin.search_options.hunter_client import get_hunter_client
+from parser.engine.linkedin.search_options.email_verifier import is_enabled as is_verification_enabled, pick_verified_email
 
 logger = logging.getLogger(__name__)
 
 class EmailExtractor:
     def __init__(self, hunter_api_key: str = None):
         self.hunter_api_key = hunter_api_key
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+
+    @property
+    def hunter(self):
+        """Shared pooled client: cached results, circuit breaker on rate limits"""
+        return get_hunter_client(self.hunter_api_key)
 
     def extract_personal_email(self, first_name: str, last_name: str, domain: str, company: str = None) -> Optional[str]:
         """
         Enhanced email extraction with multiple fallback methods
         """
+        return self.find_email(first_name, last_name, domain, company)[0]
+
+    def find_email(self, first_name: str, last_name: str, domain: str, company: str = None) -> Tuple[Optional[str], int, str]:
+        """
+        (email, confidence 0-100, source) - source is "pattern", "hunter" or "guess"
+        """
         if not domain or not first_name or not last_name:
-            return None
+            return None, 0, ""
             
         # Clean domain
         clean_domain = self.clean_domain(domain)
         if not clean_domain:
-            return None
+            return None, 0, ""
+        
+        min_confidence = getattr(settings, "EMAIL_PATTERN_MIN_CONFIDENCE", 60)
+        
+        # Method 1: Pattern learned for the domain - generated locally, no API call
+        email, confidence = generate_email(first_name, last_name, clean_domain)
+        if confidence < min_confidence and self.hunter_api_key and getattr(settings, "EMAIL_PATTERN_DOMAIN_SEARCH", True):
+            # One domain-search per domain teaches the pattern for everyone who works there
+            if learn_from_hunter_domain_search(clean_domain, self.hunter):
+                email, confidence = generate_email(first_name, last_name, clean_domain)
+        if email and confidence >= min_confidence:
+            logger.info(f"[PATTERN] Generated {email} from learned pattern (confidence: {confidence})")
+            return email, confidence, "pattern"
             
-        # Method 1: Hunter.io (if API key available)
+        # Method 2: Hunter.io email-finder (if API key available)
         if self.hunter_api_key:
             email = self.try_hunter_api(first_name, last_name, clean_domain)
             if email:
-                return email
+                learn_from_email(email, first_name, last_name)
+                return email, 70, "hunter"
                 
-        # Method 2: Common email pattern guessing
+        # Method 3: Weak learned pattern beats a blind guess
+        pattern_email, confidence = generate_email(first_name, last_name, clean_domain)
+        if pattern_email:
+            return pattern_email, confidence, "pattern"
+        
+        # Method 4: Common email pattern guessing
         email = self.guess_email_patterns(first_name, last_name, clean_domain)
         if email:
-            return email
+            return email, 10, "guess"
             
-        # Method 3: Company-specific pattern detection
-        if company:
+        # Method 5: Company-specific pattern detection (unverified guesses - only when verification
+        # is off; with it on, Method 4 already rejected these local parts for the domain)
+        if company and not is_verification_enabled():
             email = self.company_specific_patterns(first_name, last_name, clean_domain, company)
             if email:
-                return email
+                return email, 10, "guess"
                 
-        return None
+        return None, 0, ""
 
     def try_hunter_api(self, first_name: str, last_name: str, domain: str) -> Optional[str]:
         """
         Try Hunter.io API with better error handling
         """
+        if self.hunter is None:
+            return None
         try:
-            url = (
-                f"https://api.hunter.io/v2/email-finder"
-                f"?domain={domain}&first_name={first_name}&last_name={last_name}"
-                f"&api_key={self.hunter_api_key}"
-            )
-            
-            response = self.session.get(url, timeout=10)
+            email, confidence = self.hunter.find_email(first_name, last_name, domain)
             
-            if response.status_code == 200:
-                data = response.json()
-                email_data = data.get("data", {})
-                email = email_data.get("email")
-                confidence = email_data.get("score", 0)
-                
-                if email and confidence > 30:  # Only accept if confidence > 30%
-                    logger.info(f"[HUNTER] Found email {email} (score: {confidence})")
-                    return email
-                else:
-                    logger.info(f"[HUNTER] Low confidence email for {first_name} {last_name} @ {domain}")
-                    
-            elif response.status_code == 429:
-                logger.warning(f"[HUNTER] Rate limit reached")
-            else:
-                logger.warning(f"[HUNTER] API returned {response.status_code}")
+            if email and confidence > 30:  # Only accept if confidence > 30%
+                logger.info(f"[HUNTER] Found email {email} (score: {confidence})")
+                return email
+            elif email:
+                logger.info(f"[HUNTER] Low confidence email for {first_name} {last_name} @ {domain}")
                 
         except Exception as e:
             logger.error(f"[HUNTER] Exception: {e}")
@@ -112,6 +132,16 @@ class EmailExtractor:
                     f"{first}_{last}@{domain}",
                 ])
             
+            # Pick the best candidate the mail server will take (MX, optional RCPT probe)
+            if is_verification_enabled():
+                candidates = [pattern for pattern in patterns if self.is_valid_email_format(pattern)]
+                email = pick_verified_email(candidates) if candidates else None
+                if email:
+                    logger.info(f"[PATTERN] Verified email: {email}")
+                else:
+                    logger.info(f"[PATTERN] No deliverable candidate for {first_name} {last_name} @ {domain}")
+                return email
+            
             # Return most likely pattern (you could validate these with SMTP)
             for pattern in patterns:
                 if self.is_valid_email_format(pattern):
@@ -211,9 +241,14 @@ class EmailExtractor:
         return re.match(pattern, email) is not None
 
 # Updated function for use in your existing code
+_extractors: Dict[Optional[str], EmailExtractor] = {}
+
+
 def extract_personal_email(first_name: str, last_name: str, domain: str, api_key: str = None, company: str = None) -> str | None:
     """
     Wrapper function to maintain compatibility with existing code
     """
-    extractor = EmailExtractor(api_key)
-    return extractor.extract_personal_email(first_name, last_name, domain, company)
\ No newline at end of file
+    extractor = _extractors.get(api_key)
+    if extractor is None:
+        extractor = _extractors[api_key] = EmailExtractor(api_key)
+    return extractor.extract_personal_email(first_name, last_name, domain, company)
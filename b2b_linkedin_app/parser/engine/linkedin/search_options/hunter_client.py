@@ -0,0 +1,146 @@
+# hunter_client.py - Shared Hunter.io client: pooled session, result cache, rate-limit circuit breaker
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+from parser.engine.linkedin.search_options.email_patterns import clean_name
+
+logger = logging.getLogger(__name__)
+
+HUNTER_API_URL = "https://api.hunter.io/v2"
+RESULT_PREFIX = "hunter_email:"
+CIRCUIT_KEY = "hunter_circuit_open"  # set while Hunter must not be called; value is the reason
+NOT_FOUND = ""  # cached for people Hunter has no (confident) email for
+
+_clients: Dict[str, "HunterClient"] = {}
+_clients_lock = threading.Lock()
+_clients_pid = None
+
+
+def result_key(first_name: str, last_name: str, domain: str) -> str:
+    return f"{RESULT_PREFIX}{(domain or '').lower()}:{clean_name(first_name)}:{clean_name(last_name)}"
+
+
+def is_circuit_open() -> bool:
+    try:
+        return bool(cache.get(CIRCUIT_KEY))
+    except Exception:
+        return False
+
+
+def open_circuit(reason: str, seconds: int):
+    """Stop every worker from calling Hunter for `seconds`"""
+    try:
+        cache.set(CIRCUIT_KEY, reason, timeout=seconds)
+    except Exception as e:
+        logger.warning(f"[HUNTER] Could not open circuit breaker: {e}")
+    logger.warning(f"[HUNTER] {reason} - pausing Hunter calls for {seconds}s")
+
+
+class HunterClient:
+    """
+    One per API key and process (see get_hunter_client).
+
+    Requests share a keep-alive session with a timeout. email-finder results are cached by
+    normalized (first, last, domain) - misses too - for HUNTER_CACHE_TTL / HUNTER_NEGATIVE_CACHE_TTL.
+    A 429 opens a circuit breaker shared through the cache for HUNTER_COOLDOWN_SECONDS (or the
+    Retry-After value); an exhausted quota (402/403) opens it for HUNTER_QUOTA_COOLDOWN_SECONDS.
+    While it is open every call returns None without touching the network.
+    """
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=getattr(settings, "HUNTER_POOL_SIZE", 10))
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        self.timeout = getattr(settings, "HUNTER_TIMEOUT", 10)
+
+    def _get(self, endpoint: str, params: dict) -> Optional[dict]:
+        """JSON body of a successful call, {} for "nothing found", None when the call failed or was skipped"""
+        if is_circuit_open():
+            logger.info(f"[HUNTER] Circuit open - skipping {endpoint}")
+            return None
+
+        try:
+            response = self.session.get(
+                f"{HUNTER_API_URL}/{endpoint}",
+                params={**params, "api_key": self.api_key},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            logger.error(f"[HUNTER] Exception: {e}")
+            return None
+
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code in (400, 404):
+            return {}
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            seconds = int(retry_after) if retry_after.isdigit() else getattr(settings, "HUNTER_COOLDOWN_SECONDS", 60)
+            open_circuit("Rate limit reached", seconds)
+        elif response.status_code in (402, 403):
+            open_circuit(
+                f"Quota exhausted ({response.status_code})",
+                getattr(settings, "HUNTER_QUOTA_COOLDOWN_SECONDS", 6 * 3600),
+            )
+        else:
+            logger.warning(f"[HUNTER] API returned {response.status_code}")
+        return None
+
+    def find_email(self, first_name: str, last_name: str, domain: str) -> Tuple[Optional[str], int]:
+        """(email, score) from email-finder, served from the cache when this person was looked up before"""
+        key = result_key(first_name, last_name, domain)
+        try:
+            cached = cache.get(key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            logger.info(f"[HUNTER] Cache hit for {first_name} {last_name} @ {domain}")
+            return (cached["email"], cached["score"]) if cached else (None, 0)
+
+        body = self._get("email-finder", {"domain": domain, "first_name": first_name, "last_name": last_name})
+        if body is None:
+            return None, 0  # failed or skipped - not cached, try again next time
+
+        data = body.get("data") or {}
+        email, score = data.get("email"), data.get("score") or 0
+        try:
+            if email:
+                cache.set(key, {"email": email, "score": score}, timeout=getattr(settings, "HUNTER_CACHE_TTL", 30 * 24 * 3600))
+            else:
+                cache.set(key, NOT_FOUND, timeout=getattr(settings, "HUNTER_NEGATIVE_CACHE_TTL", 7 * 24 * 3600))
+        except Exception as e:
+            logger.warning(f"[HUNTER] Cache write failed: {e}")
+        return email, score
+
+    def domain_search(self, domain: str, limit: int = 10) -> Optional[dict]:
+        """`data` of a domain-search ({} when Hunter knows nothing), None when the call failed or was skipped"""
+        body = self._get("domain-search", {"domain": domain, "limit": limit})
+        if body is None:
+            return None
+        return body.get("data") or {}
+
+
+def get_hunter_client(api_key: str) -> Optional[HunterClient]:
+    """Process-wide client for the key (recreated after a fork so sessions are never shared)"""
+    global _clients_pid
+    if not api_key:
+        return None
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = HunterClient(api_key)
+        return client
@@ -0,0 +1,214 @@
+import asyncio
+from unittest import skipIf
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from parser.engine.linkedin.search_options import email_verifier
+from parser.engine.linkedin.search_options.email_verifier import EmailVerifier
+
+if email_verifier.dns is not None:
+    import dns.name
+
+
+class StubMX:
+    def __init__(self, preference, exchange):
+        self.preference = preference
+        self.exchange = dns.name.from_text(exchange)
+
+
+class StubResolver:
+    """Answers from a {(domain, rdtype): records or exception} table; anything else is NXDOMAIN"""
+
+    def __init__(self, answers=None):
+        self.answers = answers or {}
+        self.queries = []
+
+    async def resolve(self, domain, rdtype):
+        self.queries.append((domain, rdtype))
+        answer = self.answers.get((domain, rdtype))
+        if answer is None:
+            raise dns.resolver.NXDOMAIN()
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class StubSMTPServer:
+    """Minimal SMTP server: 250 for known recipients (or everyone when catch_all), 550 otherwise"""
+
+    def __init__(self, known=(), catch_all=False):
+        self.known = {address.lower() for address in known}
+        self.catch_all = catch_all
+        self.recipients = []
+
+    async def handle(self, reader, writer):
+        writer.write(b"220 stub ESMTP\r\n")
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                writer.write(b"250-stub\r\n250 OK\r\n")
+            elif verb == "MAIL":
+                writer.write(b"250 OK\r\n")
+            elif verb == "RCPT":
+                address = command[command.index("<") + 1:command.rindex(">")].lower()
+                self.recipients.append(address)
+                accepted = self.catch_all or address in self.known
+                writer.write(b"250 OK\r\n" if accepted else b"550 No such user\r\n")
+            elif verb == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"502 Not implemented\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@skipIf(email_verifier.dns is None, "dnspython is not installed")
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ResolveMXTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.verifier = EmailVerifier(timeout=2, helo_host="test.local")
+
+    def resolve(self, domain, resolver):
+        return asyncio.run(self.verifier.resolve_mx(domain, resolver))
+
+    def test_mx_hosts_are_ordered_by_preference(self):
+        resolver = StubResolver({
+            ("acme.com", "MX"): [StubMX(20, "mx2.acme.com."), StubMX(10, "mx1.acme.com.")],
+        })
+        self.assertEqual(self.resolve("Acme.com.", resolver), ["mx1.acme.com", "mx2.acme.com"])
+
+    def test_result_is_cached(self):
+        resolver = StubResolver({("acme.com", "MX"): [StubMX(10, "mx1.acme.com.")]})
+        self.resolve("acme.com", resolver)
+        self.assertEqual(self.resolve("acme.com", resolver), ["mx1.acme.com"])
+        self.assertEqual(resolver.queries, [("acme.com", "MX")])
+
+    def test_no_mx_falls_back_to_a_record(self):
+        resolver = StubResolver({
+            ("acme.com", "MX"): dns.resolver.NoAnswer(),
+            ("acme.com", "A"): ["192.0.2.1"],
+        })
+        self.assertEqual(self.resolve("acme.com", resolver), ["acme.com"])
+
+    def test_no_mx_and_no_a_record_cannot_receive_mail(self):
+        resolver = StubResolver({
+            ("acme.com", "MX"): dns.resolver.NoAnswer(),
+            ("acme.com", "A"): dns.resolver.NoAnswer(),
+        })
+        self.assertEqual(self.resolve("acme.com", resolver), [])
+
+    def test_null_mx_cannot_receive_mail(self):
+        resolver = StubResolver({("acme.com", "MX"): [StubMX(0, ".")]})
+        self.assertEqual(self.resolve("acme.com", resolver), [])
+
+    def test_nxdomain_skips_the_a_lookup(self):
+        resolver = StubResolver()
+        self.assertEqual(self.resolve("acme.com", resolver), [])
+        self.assertEqual(resolver.queries, [("acme.com", "MX")])
+
+    def test_dns_errors_are_inconclusive_and_not_cached(self):
+        for error in (dns.exception.Timeout(), dns.resolver.NoNameservers(), dns.name.LabelTooLong()):
+            with self.subTest(error=type(error).__name__):
+                resolver = StubResolver({("acme.com", "MX"): error})
+                self.assertIsNone(self.resolve("acme.com", resolver))
+        self.assertIsNone(cache.get(email_verifier.MX_CACHE_PREFIX + "acme.com"))
+
+    def test_a_lookup_error_is_inconclusive(self):
+        resolver = StubResolver({
+            ("acme.com", "MX"): dns.resolver.NoAnswer(),
+            ("acme.com", "A"): dns.exception.Timeout(),
+        })
+        self.assertIsNone(self.resolve("acme.com", resolver))
+
+    def test_best_domain_keeps_candidate_order(self):
+        resolver = StubResolver({
+            ("acme.fr", "MX"): [StubMX(10, "mx.acme.fr.")],
+            ("acme.io", "MX"): [StubMX(10, "mx.acme.io.")],
+        })
+        domain = asyncio.run(self.verifier.best_domain(["acme.com", "acme.io", "acme.fr"], resolver))
+        self.assertEqual(domain, "acme.io")
+
+    def test_best_domain_keeps_first_guess_when_dns_is_down(self):
+        resolver = StubResolver({
+            ("acme.com", "MX"): dns.exception.Timeout(),
+            ("acme.io", "MX"): dns.exception.Timeout(),
+        })
+        domain = asyncio.run(self.verifier.best_domain(["acme.com", "acme.io"], resolver))
+        self.assertEqual(domain, "acme.com")
+
+    def test_best_domain_none_when_no_domain_receives_mail(self):
+        domain = asyncio.run(self.verifier.best_domain(["acme.com", "acme.io"], StubResolver()))
+        self.assertIsNone(domain)
+
+
+@skipIf(email_verifier.dns is None, "dnspython is not installed")
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class EmailVerifierSMTPTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # acme.com's MX points at the stub SMTP server
+        self.resolver = StubResolver({("acme.com", "MX"): [StubMX(10, "127.0.0.1.")]})
+
+    def run_against(self, server, coro_factory):
+        async def scenario():
+            smtp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+            port = smtp.sockets[0].getsockname()[1]
+            verifier = EmailVerifier(smtp_port=port, smtp_probe=True, timeout=2, helo_host="test.local")
+            try:
+                return await coro_factory(verifier)
+            finally:
+                smtp.close()
+                await smtp.wait_closed()
+
+        return asyncio.run(scenario())
+
+    def test_probe_addresses_reports_each_recipient(self):
+        server = StubSMTPServer(known=["jane.doe@acme.com"])
+        results = self.run_against(
+            server,
+            lambda v: v.probe_addresses("acme.com", ["jdoe@acme.com", "jane.doe@acme.com"], ["127.0.0.1"]),
+        )
+        self.assertEqual(results, [False, True])
+        # The random catch-all probe goes last in the same session
+        self.assertEqual(len(server.recipients), 3)
+
+    def test_best_email_prefers_accepted_address_over_candidate_order(self):
+        server = StubSMTPServer(known=["jdoe@acme.com"])
+        email = self.run_against(
+            server,
+            lambda v: v.best_email(["jane.doe@acme.com", "jane@acme.com", "jdoe@acme.com"], self.resolver),
+        )
+        self.assertEqual(email, "jdoe@acme.com")
+
+    def test_best_email_skips_rejected_addresses(self):
+        server = StubSMTPServer(known=[])
+        email = self.run_against(server, lambda v: v.best_email(["jane.doe@acme.com", "jdoe@acme.com"], self.resolver))
+        self.assertIsNone(email)
+
+    def test_best_email_skips_domains_without_mail_server(self):
+        server = StubSMTPServer(known=["jane@acme.com"])
+        email = self.run_against(server, lambda v: v.best_email(["jane@acme.io", "jane@acme.com"], self.resolver))
+        self.assertEqual(email, "jane@acme.com")
+
+    def test_catch_all_domain_is_inconclusive(self):
+        server = StubSMTPServer(catch_all=True)
+        results = self.run_against(
+            server,
+            lambda v: v.probe_addresses("acme.com", ["jane.doe@acme.com", "jdoe@acme.com"], ["127.0.0.1"]),
+        )
+        self.assertEqual(results, [None, None])
+
+        # The verdict is cached, so best_email falls back to candidate order without probing again
+        server.recipients.clear()
+        email = self.run_against(server, lambda v: v.best_email(["jane.doe@acme.com", "jdoe@acme.com"], self.resolver))
+        self.assertEqual(email, "jane.doe@acme.com")
+        self.assertEqual(server.recipients, [])
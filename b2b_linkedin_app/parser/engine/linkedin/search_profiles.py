@@ -1,7 +1,7 @@
 import time
 import logging
 import random
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Callable
 from urllib.parse import quote
 from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
@@ -16,9 +16,12 @@ from parser.engine.linkedin.search_options.extract_position import extract_posit
 from parser.engine.linkedin.search_options.exract_profile_url import extract_profile_url_from_card
 from parser.engine.linkedin.search_options.extract_email import extract_personal_email
 from parser.engine.linkedin.search_options.extract_company_domain import extract_domain
+from parser.engine.linkedin.search_options.domain_cache import get_cached_domain
 from parser.engine.linkedin.search_options.location_codes import LOCATION_CODES
 from parser.engine.linkedin.search_options.safety_scripts import scroll_script
-from parser.engine.linkedin.login import get_logged_driver, save_captcha_session_for_transfer, check_captcha_success, recover_solved_session
+from parser.engine.linkedin.login import save_captcha_session_for_transfer, check_captcha_success, recover_solved_session
+from parser.engine.linkedin.driver_pool import driver_pool
+from parser.engine.linkedin.domain_resolver import create_domain_resolver
 
 # Import WebSocket broadcaster
 try:
@@ -29,10 +32,31 @@ except ImportError:
         def send_update(self, *args, **kwargs): pass
         def send_log(self, *args, **kwargs): pass
 
+# Index of profiles already stored by earlier requests
+try:
+    from parser_controler.profile_index import find_known_profiles, get_stored_profiles
+except ImportError:
+    def find_known_profiles(urls): return set()
+    def get_stored_profiles(urls): return {}
+
 logger = logging.getLogger(__name__)
 LINKEDIN_SEARCH_URL = "https://www.linkedin.com/search/results/people/?keywords={keywords}&geoUrn={location_code}"
 HUNTER_API_KEY = settings.HUNTER_API_KEY
 
+
+class SearchInterrupted(Exception):
+    """The search stopped before reaching end_page or the limit (login, page load, navigation or browser failure)"""
+
+
+def build_search_url(keywords: List[str], location_code: str, page: int = 1) -> str:
+    """Build the people search URL, jumping straight to `page` via LinkedIn's page= parameter"""
+    keyword_str = quote(" ".join(keywords), safe="")
+    geo_urn_param = quote(f'["{location_code}"]', safe="")
+    url = LINKEDIN_SEARCH_URL.format(keywords=keyword_str, location_code=geo_urn_param)
+    if page and page > 1:
+        url += f"&page={page}"
+    return url
+
 def safe_page_load(driver, url, max_retries=3, timeout=30):
     for attempt in range(max_retries):
         try:
@@ -259,6 +283,15 @@ def wait_and_validate_search_page(driver, broadcaster=None, email=None):
             broadcaster.send_log('ERROR', 'VALIDATE', f'Search page validation failed: {str(e)}')
         return False
 
+SEARCH_CARD_SELECTOR = 'div[data-chameleon-result-urn]'
+
+# Returns the outerHTML of every result card in one WebDriver round trip
+BULK_CARDS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (card) {
+    return card.outerHTML;
+});
+"""
+
 def collect_cards_from_page(driver, broadcaster=None):
     try:
         # Wait for page stability
@@ -272,7 +305,7 @@ def collect_cards_from_page(driver, broadcaster=None):
         
         # Wait for content to load after scroll
         WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-chameleon-result-urn]'))
+            EC.presence_of_element_located((By.CSS_SELECTOR, SEARCH_CARD_SELECTOR))
         )
         
         driver.execute_script("window.scrollTo(0, 0);")
@@ -282,75 +315,67 @@ def collect_cards_from_page(driver, broadcaster=None):
             lambda d: d.execute_script("return window.pageYOffset") == 0
         )
         
-        # Find cards with retry
-        cards = []
+        # Pull every card's HTML in a single round trip, with retry
+        card_htmls = []
         for attempt in range(3):
-            cards = driver.find_elements(By.CSS_SELECTOR, 'div[data-chameleon-result-urn]')
-            if cards:
+            card_htmls = driver.execute_script(BULK_CARDS_SCRIPT, SEARCH_CARD_SELECTOR) or []
+            if card_htmls:
                 break
             logger.warning(f"[COLLECT] No cards found on attempt {attempt + 1}, retrying...")
             time.sleep(2)
         
-        if not cards:
+        if not card_htmls:
             logger.warning(f"[COLLECT] No cards found on current page")
             if broadcaster:
                 broadcaster.send_log('WARNING', 'COLLECT', 'No profile cards found on current page')
             return []
             
-        logger.info(f"[COLLECT] Found {len(cards)} cards on this page")
+        logger.info(f"[COLLECT] Found {len(card_htmls)} cards on this page")
         if broadcaster:
-            broadcaster.send_log('INFO', 'COLLECT', f'Found {len(cards)} profile cards on page')
+            broadcaster.send_log('INFO', 'COLLECT', f'Found {len(card_htmls)} profile cards on page')
         
-        card_data_list = []
+        # Parse the whole page once and extract from each card sub-tree
+        soup = BeautifulSoup("".join(card_htmls), 'html.parser')
+        cards = soup.select(SEARCH_CARD_SELECTOR)
         
+        card_data_list = []
         for i, card in enumerate(cards):
             try:
-                logger.info(f"[COLLECT] Collecting data from card {i+1}/{len(cards)}")
-                
-                if broadcaster:
-                    broadcaster.send_update(
-                        action='collecting_card',
-                        message=f'Extracting data from profile {i+1}/{len(cards)}',
-                        data={'current_card': i+1, 'total_cards': len(cards)}
-                    )
-                
-                # Extract HTML immediately to avoid stale element issues
-                card_html = card.get_attribute('outerHTML')
-                soup = BeautifulSoup(card_html, 'html.parser')
-                
                 # Extract basic info from search card ONLY
-                name = extract_name(soup)
-                position = extract_position(soup)
-                profile_url = extract_profile_url_from_card(soup)
-                company = extract_company_from_search_card(soup)
+                name = extract_name(card)
+                position = extract_position(card)
+                profile_url = extract_profile_url_from_card(card)
+                company = extract_company_from_search_card(card)
                 
                 if not profile_url:
                     logger.debug(f"[COLLECT] No profile URL for {name}, skipping")
                     continue
 
                 # Store card data for later processing
-                card_data = {
+                card_data_list.append({
                     "name": name,
                     "position": position,
                     "company": company,
                     "profile_url": profile_url,
-                }
-                
-                card_data_list.append(card_data)
+                })
                 logger.info(f"[COLLECT] Collected #{len(card_data_list)}: {name} @ {company}")
                 
-                if broadcaster:
-                    broadcaster.send_log('INFO', 'COLLECT', f'Collected: {name} @ {company}')
-                
-                # Small delay between cards
-                time.sleep(random.uniform(0.3, 0.8))
-                
             except Exception as card_error:
                 logger.warning(f"[COLLECT] Error collecting card {i}: {card_error}")
                 if broadcaster:
                     broadcaster.send_log('ERROR', 'COLLECT', f'Failed to extract card {i+1}: {str(card_error)}')
                 continue
 
+        # Mark people we already have so enrichment can be skipped for them
+        known_urls = find_known_profiles([card_data["profile_url"] for card_data in card_data_list])
+        for card_data in card_data_list:
+            card_data["known"] = card_data["profile_url"] in known_urls
+        if known_urls:
+            logger.info(f"[COLLECT] {len(known_urls)} profiles on this page are already known")
+
+        if broadcaster:
+            broadcaster.send_log('INFO', 'COLLECT', f'Collected {len(card_data_list)}/{len(cards)} profiles from page ({len(known_urls)} already known)')
+
         return card_data_list
         
     except Exception as e:
@@ -359,154 +384,139 @@ def collect_cards_from_page(driver, broadcaster=None):
             broadcaster.send_log('ERROR', 'COLLECT', f'Fatal collection error: {str(e)}')
         return []
 
-def enhance_profiles_with_domains_and_emails(driver, card_data_list, visited_domains, broadcaster=None, email=None):
+def enhance_profile(driver, card_data, visited_domains, broadcaster=None, email=None, domain_resolver=None):
     """
-    PHASE 2: Enhance collected profiles with domains and emails
-    Enhanced with WebSocket updates and VNC support
+    Enhance a single collected card with its company domain and email.
+    With a domain_resolver the lookup runs on the resolver's own browser and the
+    search driver stays on the results page.
+    Always returns a profile dict - a basic one if enhancement fails.
     """
-    enhanced_profiles = []
-    
-    if broadcaster:
-        broadcaster.send_update(
-            action='enhancement_started',
-            message=f'Starting email enhancement for {len(card_data_list)} profiles...',
-            data={'total_to_enhance': len(card_data_list)}
-        )
-    
-    for i, card_data in enumerate(card_data_list):
-        try:
-            logger.info(f"[ENHANCE] Processing profile {i+1}/{len(card_data_list)}: {card_data['name']}")
-            
+    try:
+        company = card_data["company"]
+        
+        # Get domain (request-local dict first, then the shared cache, then a lookup)
+        domain = None
+        if company not in visited_domains:
+            hit, cached = get_cached_domain(company)
+            if hit:
+                visited_domains[company] = cached
+        
+        if company in visited_domains:
+            domain = visited_domains[company]
+            logger.info(f"[ENHANCE] Using cached domain for {company}: {domain}")
             if broadcaster:
-                broadcaster.send_update(
-                    action='enhancing_profile',
-                    message=f'Getting email for {card_data["name"]} @ {card_data["company"]}',
-                    data={'current': i+1, 'total': len(card_data_list), 'name': card_data['name']}
-                )
+                broadcaster.send_log('INFO', 'DOMAIN', f'Using cached domain for {company}: {domain}')
+        elif company != "Unknown" and domain_resolver:
+            domain = domain_resolver.resolve(company)
+            visited_domains[company] = domain
+            if broadcaster:
+                broadcaster.send_log('INFO', 'DOMAIN', f'Found domain for {company}: {domain}')
+        elif company != "Unknown":
+            logger.info(f"[ENHANCE] Getting domain for {company}...")
+            if broadcaster:
+                broadcaster.send_log('INFO', 'DOMAIN', f'Looking up domain for {company}...')
             
-            company = card_data["company"]
+            # Store current search URL to return to later
+            search_url = driver.current_url
             
-            # Get domain (with caching to avoid repeat lookups)
-            domain = None
-            if company in visited_domains:
-                domain = visited_domains[company]
-                logger.info(f"[ENHANCE] Using cached domain for {company}: {domain}")
-                if broadcaster:
-                    broadcaster.send_log('INFO', 'DOMAIN', f'Using cached domain for {company}: {domain}')
-            elif company != "Unknown":
-                logger.info(f"[ENHANCE] Getting domain for {company}...")
+            try:
+                domain = extract_domain(driver, company)
+                visited_domains[company] = domain
+                
                 if broadcaster:
-                    broadcaster.send_log('INFO', 'DOMAIN', f'Looking up domain for {company}...')
+                    broadcaster.send_log('INFO', 'DOMAIN', f'Found domain for {company}: {domain}')
                 
-                # Store current search URL to return to later
-                search_url = driver.current_url
+                # CRITICAL: Return to search page after domain extraction
+                logger.info(f"[ENHANCE] Returning to search page: {search_url}")
+                safe_page_load(driver, search_url, max_retries=2, timeout=20)
                 
+                # Wait for search page to load with VNC support
+                wait_and_validate_search_page(driver, broadcaster, email)
+                
+            except Exception as domain_error:
+                logger.warning(f"[ENHANCE] Domain extraction failed for {company}: {domain_error}")
+                if broadcaster:
+                    broadcaster.send_log('ERROR', 'DOMAIN', f'Domain lookup failed for {company}: {str(domain_error)}')
+                domain = None
+                
+                # Ensure we're back on search page even if domain extraction failed
                 try:
-                    domain = extract_domain(driver, company)
-                    visited_domains[company] = domain
-                    
-                    if broadcaster:
-                        broadcaster.send_log('INFO', 'DOMAIN', f'Found domain for {company}: {domain}')
-                    
-                    # CRITICAL: Return to search page after domain extraction
-                    logger.info(f"[ENHANCE] Returning to search page: {search_url}")
                     safe_page_load(driver, search_url, max_retries=2, timeout=20)
-                    
-                    # Wait for search page to load with VNC support
-                    wait_and_validate_search_page(driver, broadcaster, email)
-                    
-                except Exception as domain_error:
-                    logger.warning(f"[ENHANCE] Domain extraction failed for {company}: {domain_error}")
-                    if broadcaster:
-                        broadcaster.send_log('ERROR', 'DOMAIN', f'Domain lookup failed for {company}: {str(domain_error)}')
-                    domain = None
-                    
-                    # Ensure we're back on search page even if domain extraction failed
-                    try:
-                        safe_page_load(driver, search_url, max_retries=2, timeout=20)
-                    except:
-                        pass
-
-            # Extract email if we have a domain
-            email_found = None
-            if domain:
-                try:
+                except:
+                    pass
+
+        # Extract email if we have a domain
+        email_found = None
+        if domain:
+            try:
+                if broadcaster:
+                    broadcaster.send_log('INFO', 'EMAIL', f'Searching email for {card_data["name"]} @ {domain}')
+                
+                name_parts = card_data["name"].split()
+                first_name = name_parts[0] if len(name_parts) > 0 else ""
+                last_name = name_parts[-1] if len(name_parts) > 1 else ""
+                
+                email_found = extract_personal_email(
+                    first_name=first_name, 
+                    last_name=last_name, 
+                    domain=domain, 
+                    api_key=HUNTER_API_KEY,
+                    company=company
+                )
+                
+                if email_found:
                     if broadcaster:
-                        broadcaster.send_log('INFO', 'EMAIL', f'Searching email for {card_data["name"]} @ {domain}')
-                    
-                    name_parts = card_data["name"].split()
-                    first_name = name_parts[0] if len(name_parts) > 0 else ""
-                    last_name = name_parts[-1] if len(name_parts) > 1 else ""
-                    
-                    email_found = extract_personal_email(
-                        first_name=first_name, 
-                        last_name=last_name, 
-                        domain=domain, 
-                        api_key=HUNTER_API_KEY,
-                        company=company
-                    )
-                    
-                    if email_found:
-                        if broadcaster:
-                            broadcaster.send_log('INFO', 'EMAIL', f'✅ Found email: {email_found}')
-                    else:
-                        if broadcaster:
-                            broadcaster.send_log('WARNING', 'EMAIL', f'❌ No email found for {card_data["name"]}')
-                            
-                except Exception as email_error:
-                    logger.warning(f"[ENHANCE] Email extraction failed: {email_error}")
+                        broadcaster.send_log('INFO', 'EMAIL', f'✅ Found email: {email_found}')
+                else:
                     if broadcaster:
-                        broadcaster.send_log('ERROR', 'EMAIL', f'Email extraction failed: {str(email_error)}')
-
-            # Create enhanced profile
-            enhanced_profile = {
-                "name": card_data["name"],
-                "position": card_data["position"],
-                "company": company,
-                "email": email_found,
-                "profile_url": card_data["profile_url"],
-                "domain": domain
-            }
-            
-            enhanced_profiles.append(enhanced_profile)
-            logger.info(f"[ENHANCE] Enhanced #{len(enhanced_profiles)}: {card_data['name']} @ {company} (email: {'✓' if email_found else '✗'})")
-            
-            if broadcaster:
-                broadcaster.send_update(
-                    action='profile_enhanced',
-                    message=f'Enhanced profile {i+1}/{len(card_data_list)}: {card_data["name"]}',
-                    data={
-                        'enhanced_count': len(enhanced_profiles),
-                        'total': len(card_data_list),
-                        'has_email': bool(email_found),
-                        'progress_percentage': round((i+1) / len(card_data_list) * 100, 1)
-                    }
-                )
-            
-            # Delay between enhancements to avoid rate limiting
-            time.sleep(random.uniform(1.0, 2.0))
-            
-        except Exception as e:
-            logger.error(f"[ENHANCE] Error enhancing profile {card_data['name']}: {e}")
-            if broadcaster:
-                broadcaster.send_log('ERROR', 'ENHANCE', f'Enhancement failed for {card_data["name"]}: {str(e)}')
-            
-            # Still add basic profile even if enhancement fails
-            basic_profile = {
-                "name": card_data["name"],
-                "position": card_data["position"],
-                "company": card_data["company"],
-                "email": None,
-                "profile_url": card_data["profile_url"],
-                "domain": None
-            }
-            enhanced_profiles.append(basic_profile)
-
-    return enhanced_profiles
+                        broadcaster.send_log('WARNING', 'EMAIL', f'❌ No email found for {card_data["name"]}')
+                        
+            except Exception as email_error:
+                logger.warning(f"[ENHANCE] Email extraction failed: {email_error}")
+                if broadcaster:
+                    broadcaster.send_log('ERROR', 'EMAIL', f'Email extraction failed: {str(email_error)}')
+
+        return {
+            "name": card_data["name"],
+            "position": card_data["position"],
+            "company": company,
+            "email": email_found,
+            "profile_url": card_data["profile_url"],
+            "domain": domain
+        }
+        
+    except Exception as e:
+        logger.error(f"[ENHANCE] Error enhancing profile {card_data['name']}: {e}")
+        if broadcaster:
+            broadcaster.send_log('ERROR', 'ENHANCE', f'Enhancement failed for {card_data["name"]}: {str(e)}')
+        
+        # Still return basic profile even if enhancement fails
+        return {
+            "name": card_data["name"],
+            "position": card_data["position"],
+            "company": card_data["company"],
+            "email": None,
+            "profile_url": card_data["profile_url"],
+            "domain": None
+        }
+
+def reuse_stored_profile(card_data, stored):
+    """Profile built from an earlier request's ParsingInfo instead of a fresh enrichment"""
+    email = stored.get("email")
+    return {
+        "name": card_data["name"],
+        "position": card_data["position"] or stored.get("position"),
+        "company": card_data["company"] if card_data["company"] != "Unknown" else (stored.get("company_name") or "Unknown"),
+        "email": email,
+        "profile_url": card_data["profile_url"],
+        "domain": email.split("@", 1)[1] if email and "@" in email else None,
+        "reused": True
+    }
 
 def navigate_to_next_page(driver, broadcaster=None, email=None):
     """
-    Enhanced next page navigation with VNC support
+    Enhanced next page navigation with VNC support.
+    Returns False only when there is no next page; raises SearchInterrupted when navigation fails.
     """
     try:
         # Ensure we're still on search results
@@ -515,16 +525,22 @@ def navigate_to_next_page(driver, broadcaster=None, email=None):
             logger.error(f"[NAVIGATION] Not on search page: {current_url}")
             if broadcaster:
                 broadcaster.send_log('ERROR', 'NAVIGATION', f'Not on search page: {current_url}')
-            return False
+            raise SearchInterrupted(f"Not on search page: {current_url}")
             
         if broadcaster:
             broadcaster.send_log('INFO', 'NAVIGATION', 'Looking for next page button...')
             
         # Scroll to make sure all content is loaded and next button is visible
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".artdeco-pagination, button[aria-label='Next']"))
-                )
+        try:
+            WebDriverWait(driver, 5).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ".artdeco-pagination, button[aria-label='Next']"))
+                    )
+        except TimeoutException:
+            logger.info("[NAVIGATION] No pagination found - probably last page")
+            if broadcaster:
+                broadcaster.send_log('INFO', 'NAVIGATION', 'No pagination found - reached last page')
+            return False
         
         # Try multiple selectors for next button
         next_selectors = [
@@ -554,8 +570,10 @@ def navigate_to_next_page(driver, broadcaster=None, email=None):
                         return True
                     else:
                         logger.warning("[NAVIGATION] Failed to validate next page")
-                        return False
+                        raise SearchInterrupted("Failed to validate next page")
                     
+            except SearchInterrupted:
+                raise
             except Exception as e:
                 logger.debug(f"[NAVIGATION] Selector {selector} failed: {e}")
                 continue
@@ -565,22 +583,63 @@ def navigate_to_next_page(driver, broadcaster=None, email=None):
             broadcaster.send_log('INFO', 'NAVIGATION', 'No next button found - reached last page')
         return False
         
+    except SearchInterrupted:
+        raise
     except Exception as e:
         logger.warning(f"[NAVIGATION] Navigation error: {e}")
         if broadcaster:
             broadcaster.send_log('ERROR', 'NAVIGATION', f'Navigation error: {str(e)}')
-        return False
+        raise SearchInterrupted(f"Navigation error: {e}") from e
 
-def search_linkedin_profiles(
+def navigate_to_page(driver, keywords, location_code, page, broadcaster=None, email=None):
+    """
+    Load a search results page directly by number.
+    When the direct load fails, falls back to clicking "Next" on the previous page (reloading it first
+    if the browser is anywhere else).
+    Returns False when there is no such page; raises SearchInterrupted when it cannot be reached.
+    """
+    url = build_search_url(keywords, location_code, page)
+    previous_url = driver.current_url
+    logger.info(f"[NAVIGATION] Jumping to page {page}: {url}")
+    if broadcaster:
+        broadcaster.send_log('INFO', 'NAVIGATION', f'Loading page {page} directly')
+    
+    if safe_page_load(driver, url, max_retries=2, timeout=30) and wait_and_validate_search_page(driver, broadcaster, email):
+        return True
+    
+    logger.warning(f"[NAVIGATION] Direct load of page {page} failed, falling back to pagination")
+    if driver.current_url != previous_url:
+        # The fallback only advances one page, so get back to the page we came from -
+        # clicking Next anywhere else (e.g. a half-loaded page {page}) would skip or repeat pages
+        if not (safe_page_load(driver, previous_url, max_retries=2, timeout=30)
+                and wait_and_validate_search_page(driver, broadcaster, email)):
+            raise SearchInterrupted(f"Could not load page {page} or return to page {page - 1}")
+    return navigate_to_next_page(driver, broadcaster, email)
+
+def iter_linkedin_profiles(
     keywords: List[str],
     location: str = "France",
     limit: int = 50,
     start_page: int = 1,
     end_page: int = 10,
-    parser_request_id: Optional[int] = None
-) -> List[Dict]:
+    parser_request_id: Optional[int] = None,
+    resume_from: Optional[Dict] = None,
+    on_checkpoint: Optional[Callable[[Dict], None]] = None
+) -> Iterator[Dict]:
     """
-    Enhanced LinkedIn search with VNC challenge resolution
+    Streaming LinkedIn search with VNC challenge resolution.
+
+    Each page is collected and enhanced before moving to the next one, and every
+    enhanced profile is yielded as soon as it is ready (with the "page" it was found on),
+    so callers can save, broadcast and export while the crawl is still running.
+
+    on_checkpoint receives the search cursor (page, collected-but-unenriched cards,
+    enrichment cursor, domains seen) whenever it moves; passing that dict back as
+    resume_from continues an interrupted search instead of starting over.
+
+    The generator only returns normally once end_page, the limit or the end of the results
+    (no next page, or a page without cards) is reached; a failed login, page load, validation
+    or navigation raises SearchInterrupted so the caller keeps the checkpoint.
     """
     logger.info(f"[SEARCH] Starting LinkedIn search with VNC support")
     logger.info(f"[SEARCH] Keywords: {keywords}, Location: {location}, Pages: {start_page}-{end_page}")
@@ -588,6 +647,42 @@ def search_linkedin_profiles(
     # Initialize WebSocket broadcaster
     broadcaster = WebSocketBroadcaster(parser_request_id) if parser_request_id else None
     
+    # Restore the search cursor from a checkpoint
+    collected_count = 0
+    pending_cards = []
+    visited_domains = {}
+    if resume_from:
+        collected_count = resume_from.get("collected_count", 0)
+        visited_domains = dict(resume_from.get("visited_domains") or {})
+        pending_cards = list(resume_from.get("pending_cards") or [])[resume_from.get("enrich_cursor", 0):]
+        last_page_completed = resume_from.get("last_page_completed") or (start_page - 1)
+        resume_page = resume_from.get("page", last_page_completed + 1) if pending_cards else last_page_completed + 1
+        
+        if resume_page > end_page or (not pending_cards and collected_count >= limit):
+            logger.info(f"[RESUME] Checkpoint shows nothing left to do (page {resume_page}, {collected_count} collected)")
+            return
+        
+        start_page = max(start_page, resume_page)
+        logger.info(f"[RESUME] Resuming at page {start_page} with {len(pending_cards)} pending cards, {collected_count} already collected")
+        if broadcaster:
+            broadcaster.send_log('INFO', 'RESUME', f'Resuming from page {start_page} ({len(pending_cards)} profiles waiting for enhancement)')
+    
+    def emit_checkpoint(page, cards, cursor, last_completed):
+        if not on_checkpoint:
+            return
+        try:
+            on_checkpoint({
+                "page": page,
+                "last_page_completed": last_completed,
+                "pending_cards": cards,
+                "enrich_cursor": cursor,
+                "collected_count": collected_count,
+                "visited_domains": visited_domains,
+                "updated_at": time.time(),
+            })
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Failed to save checkpoint: {e}")
+    
     if broadcaster:
         broadcaster.send_log('INFO', 'SEARCH', f'Starting LinkedIn search for {keywords} in {location}')
         broadcaster.send_update(
@@ -597,45 +692,45 @@ def search_linkedin_profiles(
         )
     
     driver = None
+    pooled = None
+    domain_resolver = None
+    keep_driver = True
     current_email = None  # Track the current logged-in email
     
     try:
-        driver = get_logged_driver()
+        pooled = driver_pool.acquire()
+        driver = pooled.driver
         logger.info(f"[SEARCH] ✅ Successfully logged in")
         
-        # Get the current user's email for VNC purposes
-        try:
-            from parser.engine.core.acount_credits_operator import Credential
-            credential = Credential()
-            creds = credential.get_credentials()
-            current_email = creds.get("email") if creds else None
-            logger.info(f"[SEARCH] Current logged-in email: {current_email}")
-        except Exception as e:
-            logger.warning(f"[SEARCH] Could not get current email: {e}")
-            current_email = "unknown@email.com"  # Fallback
+        # The pool remembers which account the driver is logged into
+        current_email = pooled.email or "unknown@email.com"
+        logger.info(f"[SEARCH] Current logged-in email: {current_email}")
         
         if broadcaster:
-            broadcaster.send_log('INFO', 'LOGIN', 'Successfully logged into LinkedIn')
+            broadcaster.send_log('INFO', 'LOGIN', 'Successfully logged into LinkedIn' if pooled.is_fresh else 'Reusing warm LinkedIn session')
             
-        # Add a stabilization period after login
-        logger.info("[SEARCH] Stabilizing session after login...")
-        time.sleep(random.uniform(3, 6))
+        # Only a freshly launched browser needs a stabilization period
+        if pooled.is_fresh:
+            logger.info("[SEARCH] Stabilizing session after login...")
+            time.sleep(random.uniform(3, 6))
         
     except Exception as e:
         logger.error(f"[SEARCH] ❌ Failed to login: {e}")
         if broadcaster:
             broadcaster.send_log('ERROR', 'LOGIN', f'LinkedIn login failed: {str(e)}')
-        return []
+        raise SearchInterrupted(f"LinkedIn login failed: {e}") from e
 
     try:
+        # Company pages are visited by a separate browser so paging never waits on them
+        domain_resolver = create_domain_resolver(visited_domains)
+        
         location_code = LOCATION_CODES.get(location.lower())
         if not location_code:
             logger.warning(f"[LOCATION] Unknown location '{location}', defaulting to France.")
             location_code = LOCATION_CODES["france"]
 
-        keyword_str = quote(" ".join(keywords), safe="")
-        geo_urn_param = quote(f'["{location_code}"]', safe="")
-        final_url = LINKEDIN_SEARCH_URL.format(keywords=keyword_str, location_code=geo_urn_param)
+        # Jump straight to the start page instead of paging through the ones before it
+        final_url = build_search_url(keywords, location_code, start_page)
 
         logger.info(f"[SEARCH] Navigating to search URL: {final_url}")
         if broadcaster:
@@ -646,59 +741,59 @@ def search_linkedin_profiles(
             logger.error("[SEARCH] Failed to load search page")
             if broadcaster:
                 broadcaster.send_log('ERROR', 'SEARCH', 'Failed to load LinkedIn search page')
-            return []
+            raise SearchInterrupted("Failed to load search page")
         
         # Validate search page WITH VNC support
         if not wait_and_validate_search_page(driver, broadcaster, current_email):
             logger.error("[SEARCH] Search page validation failed")
-            return []
+            raise SearchInterrupted("Search page validation failed")
 
-        # Skip to start page if needed
-        current_page = 1
-        while current_page < start_page:
-            if broadcaster:
-                broadcaster.send_update(
-                    action='skipping_to_start',
-                    message=f'Skipping to start page {start_page} (currently on page {current_page})',
-                    data={'current_page': current_page, 'target_page': start_page}
-                )
-            if not navigate_to_next_page(driver, broadcaster, current_email):
-                logger.warning(f"[SEARCH] Failed to reach start page {start_page}")
-                return []
-            current_page += 1
+        current_page = start_page
 
-        # PHASE 1: Collect all card data from all pages
-        if broadcaster:
-            broadcaster.send_update(
-                action='phase_1_started',
-                message='Phase 1: Collecting profile cards from LinkedIn pages...',
-                data={'phase': 'collection', 'pages_to_process': end_page - start_page + 1}
-            )
-
-        all_card_data = []
-        visited_domains = {}
+        profiles_count = 0
+        emails_found = 0
 
-        while len(all_card_data) < limit and current_page <= end_page:
+        while current_page <= end_page and (pending_cards or collected_count < limit):
             logger.info(f"[SEARCH] Collecting data from page {current_page}: {driver.current_url}")
             
             if broadcaster:
                 broadcaster.send_update(
                     action='page_processing',
                     message=f'Processing page {current_page} of {end_page}',
-                    data={'current_page': current_page, 'total_pages': end_page, 'profiles_collected': len(all_card_data)}
+                    data={'current_page': current_page, 'total_pages': end_page, 'profiles_collected': collected_count}
                 )
             
-            # Collect all cards from current page
-            page_card_data = collect_cards_from_page(driver, broadcaster)
-            
-            if not page_card_data:
-                logger.warning(f"[SEARCH] No cards collected from page {current_page}, stopping")
-                if broadcaster:
-                    broadcaster.send_log('WARNING', 'SEARCH', f'No profiles found on page {current_page} - stopping')
-                break
+            if pending_cards:
+                # Cards restored from the checkpoint were already collected on this page
+                page_card_data, pending_cards = pending_cards, []
+                logger.info(f"[RESUME] Using {len(page_card_data)} checkpointed cards for page {current_page}")
+            else:
+                # Collect all cards from current page
+                page_card_data = collect_cards_from_page(driver, broadcaster)
                 
-            all_card_data.extend(page_card_data)
-            logger.info(f"[SEARCH] Collected {len(page_card_data)} cards from page {current_page}. Total: {len(all_card_data)}")
+                if not page_card_data:
+                    logger.warning(f"[SEARCH] No cards collected from page {current_page}, stopping")
+                    if broadcaster:
+                        broadcaster.send_log('WARNING', 'SEARCH', f'No profiles found on page {current_page} - stopping')
+                    break
+                
+                # Trim to limit
+                page_card_data = page_card_data[:limit - collected_count]
+                collected_count += len(page_card_data)
+            
+            # Stored data for people found by earlier requests replaces enrichment
+            stored_profiles = get_stored_profiles(
+                [card_data["profile_url"] for card_data in page_card_data if card_data.get("known")]
+            )
+            
+            # Start resolving this page's companies in the background right away
+            if domain_resolver:
+                for card_data in page_card_data:
+                    if card_data["profile_url"] not in stored_profiles and card_data["company"] not in visited_domains:
+                        domain_resolver.submit(card_data["company"])
+            
+            emit_checkpoint(current_page, page_card_data, 0, current_page - 1)
+            logger.info(f"[SEARCH] Collected {len(page_card_data)} cards from page {current_page}. Total: {collected_count}")
             
             if broadcaster:
                 broadcaster.send_update(
@@ -706,12 +801,50 @@ def search_linkedin_profiles(
                     message=f'Found {len(page_card_data)} profiles on page {current_page}',
                     data={
                         'page_cards': len(page_card_data),
-                        'total_collected': len(all_card_data),
+                        'total_collected': collected_count,
                         'current_page': current_page
                     }
                 )
+                broadcaster.send_update(
+                    action='enhancement_started',
+                    message=f'Starting email enhancement for {len(page_card_data)} profiles from page {current_page}...',
+                    data={'total_to_enhance': len(page_card_data), 'current_page': current_page}
+                )
 
-            if len(all_card_data) >= limit:
+            # Enhance this page's cards and hand each profile over immediately
+            for i, card_data in enumerate(page_card_data):
+                logger.info(f"[ENHANCE] Processing profile {i+1}/{len(page_card_data)} on page {current_page}: {card_data['name']}")
+                
+                if broadcaster:
+                    broadcaster.send_update(
+                        action='enhancing_profile',
+                        message=f'Getting email for {card_data["name"]} @ {card_data["company"]}',
+                        data={'current': i+1, 'total': len(page_card_data), 'name': card_data['name']}
+                    )
+                
+                stored = stored_profiles.get(card_data["profile_url"])
+                if stored:
+                    logger.info(f"[ENHANCE] {card_data['name']} already known - reusing stored data")
+                    profile = reuse_stored_profile(card_data, stored)
+                else:
+                    profile = enhance_profile(driver, card_data, visited_domains, broadcaster, current_email, domain_resolver)
+                profile["page"] = current_page
+                profiles_count += 1
+                if profile.get("email"):
+                    emails_found += 1
+                
+                yield profile
+                
+                # The consumer has handled this profile - move the enrichment cursor past it
+                emit_checkpoint(current_page, page_card_data, i + 1, current_page - 1)
+                
+                # Delay between enhancements to avoid rate limiting (reused profiles made no calls)
+                if i < len(page_card_data) - 1 and not stored:
+                    time.sleep(random.uniform(1.0, 2.0))
+            
+            emit_checkpoint(current_page + 1, [], 0, current_page)
+
+            if collected_count >= limit:
                 logger.info(f"[SEARCH] Reached limit of {limit} profiles")
                 if broadcaster:
                     broadcaster.send_log('INFO', 'SEARCH', f'Reached profile limit of {limit}')
@@ -719,7 +852,7 @@ def search_linkedin_profiles(
 
             # Navigate to next page
             if current_page < end_page:
-                if navigate_to_next_page(driver, broadcaster, current_email):
+                if navigate_to_page(driver, keywords, location_code, current_page + 1, broadcaster, current_email):
                     current_page += 1
                 else:
                     logger.info(f"[SEARCH] No more pages available")
@@ -728,58 +861,69 @@ def search_linkedin_profiles(
                 logger.info(f"[SEARCH] Reached end page {end_page}")
                 break
 
-        # Trim to limit
-        if len(all_card_data) > limit:
-            all_card_data = all_card_data[:limit]
-
-        logger.info(f"[SEARCH] ✅ PHASE 1 COMPLETE: Collected {len(all_card_data)} profiles from {current_page} pages")
+        logger.info(f"[RESULT] COMPLETED: Found {profiles_count} profiles total.")
         
         if broadcaster:
-            broadcaster.send_update(
-                action='phase_1_completed',
-                message=f'Phase 1 complete: Collected {len(all_card_data)} profiles from {current_page} pages',
-                data={'profiles_collected': len(all_card_data), 'pages_processed': current_page}
-            )
-
-        # PHASE 2: Enhance with domains and emails
-        logger.info(f"[SEARCH] PHASE 2: Enhancing profiles with domains and emails...")
-        
-        if broadcaster:
-            broadcaster.send_update(
-                action='phase_2_started',
-                message='Phase 2: Enhancing profiles with emails and domains...',
-                data={'phase': 'enhancement', 'profiles_to_enhance': len(all_card_data)}
-            )
-        
-        enhanced_profiles = enhance_profiles_with_domains_and_emails(driver, all_card_data, visited_domains, broadcaster, current_email)
-
-        logger.info(f"[RESULT] COMPLETED: Found {len(enhanced_profiles)} profiles total.")
-        
-        if broadcaster:
-            emails_found = sum(1 for profile in enhanced_profiles if profile.get('email'))
             broadcaster.send_update(
                 action='search_completed',
-                message=f'Search completed! Found {len(enhanced_profiles)} profiles, {emails_found} with emails',
+                message=f'Search completed! Found {profiles_count} profiles, {emails_found} with emails',
                 data={
-                    'total_profiles': len(enhanced_profiles),
+                    'total_profiles': profiles_count,
                     'emails_found': emails_found,
-                    'success_rate': round((emails_found / len(enhanced_profiles) * 100), 1) if enhanced_profiles else 0
+                    'success_rate': round((emails_found / profiles_count * 100), 1) if profiles_count else 0
                 }
             )
-        
-        return enhanced_profiles
 
+    except SearchInterrupted:
+        raise
     except Exception as e:
         logger.error(f"[SEARCH] Fatal error during search: {e}")
         if broadcaster:
             broadcaster.send_log('ERROR', 'SEARCH', f'Fatal search error: {str(e)}')
-        return []
+        keep_driver = False
+        raise SearchInterrupted(f"Fatal search error: {e}") from e
     finally:
+        if domain_resolver:
+            try:
+                domain_resolver.close()
+            except Exception as e:
+                logger.warning(f"[CLEANUP] Error stopping domain resolver: {e}")
         try:
-            if driver:
-                driver.quit()
-                logger.info(f"[CLEANUP] Browser closed successfully")
+            if pooled:
+                if keep_driver:
+                    driver_pool.release(pooled)
+                else:
+                    driver_pool.discard(pooled)
+                logger.info(f"[CLEANUP] Browser session handed back to pool")
                 if broadcaster:
-                    broadcaster.send_log('INFO', 'CLEANUP', 'Browser session closed')
+                    broadcaster.send_log('INFO', 'CLEANUP', 'Browser session released')
         except Exception as e:
-            logger.warning(f"[CLEANUP] Error closing browser: {e}")
\ No newline at end of file
+            logger.warning(f"[CLEANUP] Error releasing browser: {e}")
+
+def search_linkedin_profiles(
+    keywords: List[str],
+    location: str = "France",
+    limit: int = 50,
+    start_page: int = 1,
+    end_page: int = 10,
+    parser_request_id: Optional[int] = None
+) -> List[Dict]:
+    """
+    Enhanced LinkedIn search with VNC challenge resolution.
+    Returns every profile at once - use iter_linkedin_profiles to stream them instead.
+    An interrupted search returns what was collected before it stopped.
+    """
+    profiles = []
+    try:
+        for profile in iter_linkedin_profiles(
+            keywords=keywords,
+            location=location,
+            limit=limit,
+            start_page=start_page,
+            end_page=end_page,
+            parser_request_id=parser_request_id
+        ):
+            profiles.append(profile)
+    except SearchInterrupted as e:
+        logger.warning(f"[SEARCH] Search interrupted after {len(profiles)} profiles: {e}")
+    return profiles
@@ -9,8 +9,8 @@ from django.db import models
 from mailer.models import MessagesBlueprintText
 from mailer.tasks import smtp_send_mail
 from django.http import JsonResponse
-from .models import ParsingInfo, ParserRequest
-from .tasks import start_parsing
+from .models import ParsingInfo, ParserRequest, ExportOutbox
+from .tasks import start_parsing, can_resume_request
 from b2b_linkedin_app.permissions import PaidPermissionAdmin
 import redis
 import json
@@ -169,6 +169,15 @@ class ParserRequestAdmin(PaidPermissionAdmin):
                     Start
                 </a>
             '''
+            if can_resume_request(obj):
+                buttons_html += f'''
+                    <a href="{obj.pk}/resume-parser/" class="admin-btn admin-btn-purple">
+                        <svg width="12" height="12" fill="currentColor" viewBox="0 0 24 24">
+                            <path d="M6 5h2v14H6zm4 0v14l9-7z"/>
+                        </svg>
+                        Resume
+                    </a>
+                '''
         else:
             buttons_html += '''
                 <span class="admin-btn admin-btn-red" style="cursor: not-allowed; opacity: 0.7;">
@@ -231,6 +240,7 @@ class ParserRequestAdmin(PaidPermissionAdmin):
         urls = super().get_urls()
         custom_urls = [
             path('<int:pk>/start-parser/', self.admin_site.admin_view(self.start_parser_view), name='start-parser'),
+            path('<int:pk>/resume-parser/', self.admin_site.admin_view(self.resume_parser_view), name='resume-parser'),
             path('api/active-containers/', self.admin_site.admin_view(self.api_active_containers), name='api-active-containers'),
         ]
         return custom_urls + urls
@@ -256,6 +266,32 @@ class ParserRequestAdmin(PaidPermissionAdmin):
         self.message_user(request, f"Parsing task for location '{obj.location}' assigned to {obj.user.email} has been started.")
         return redirect(request.META.get('HTTP_REFERER', '/admin/'))
 
+    def resume_parser_view(self, request, pk):
+        obj = get_object_or_404(ParserRequest, pk=pk)
+        
+        if not obj.user:
+            self.message_user(request, "Cannot resume parsing: No user assigned to this request.", level="error")
+            return redirect(request.META.get('HTTP_REFERER', '/admin/'))
+        
+        if not can_resume_request(obj):
+            self.message_user(request, "Nothing to resume: no checkpoint saved or the request is still running.", level="error")
+            return redirect(request.META.get('HTTP_REFERER', '/admin/'))
+        
+        start_parsing.apply_async(kwargs={
+            "keywords": obj.keywords,
+            "location": obj.location,
+            "limit": obj.limit,
+            "start_page": obj.start_page,
+            "end_page": obj.end_page,
+            "parser_request_id": obj.id,
+            "user_email": obj.user.email,
+            "creator_email": obj.user.email,
+            "creator_id": obj.user.id,
+            "resume": True
+        })
+        self.message_user(request, f"Parsing task #{obj.id} resumed from page {obj.checkpoint.get('page', obj.current_page)}.")
+        return redirect(request.META.get('HTTP_REFERER', '/admin/'))
+
     def api_active_containers(self, request):
         """API endpoint that frontend polls"""
         try:
@@ -296,4 +332,18 @@ class ParserRequestAdmin(PaidPermissionAdmin):
                 "status": "error",
                 "message": str(e),
                 "containers": []
-            })
\ No newline at end of file
+            })
+
+
+@admin.register(ExportOutbox)
+class ExportOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'parsing_info', 'destination', 'status', 'attempts', 'claimed_at', 'updated_at', 'exported_at')
+    list_filter = ('destination', 'status')
+    search_fields = ('parsing_info__full_name', 'parsing_info__company_name', 'last_error')
+    raw_id_fields = ('parsing_info',)
+    actions = ['requeue']
+
+    def requeue(self, request, queryset):
+        updated = queryset.update(status='pending', attempts=0, claimed_at=None)
+        self.message_user(request, f"{updated} exports queued again.")
+    requeue.short_description = "Queue selected exports again"
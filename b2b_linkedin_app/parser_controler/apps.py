@@ -6,7 +6,8 @@ class ParserControlerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'parser_controler'
 
-    # def ready(self):
-    #     from . import scheduler
-    #
-    #     post_migrate.connect(scheduler.setup_periodic_tasks, sender=self)
\ No newline at end of file
+    def ready(self):
+        from . import scheduler
+
+        # post_migrate.connect(scheduler.setup_periodic_tasks, sender=self)
+        post_migrate.connect(scheduler.setup_background_tasks, sender=self)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from parser.engine.linkedin.search_options.email_patterns import best_pattern, rebuild_patterns_from_history
+
+
+class Command(BaseCommand):
+    help = 'Relearn per-domain email patterns from delivered / read outreach emails'
+
+    def handle(self, *args, **options):
+        self.stdout.write("🧠 Learning email patterns from delivery history...")
+        learned = rebuild_patterns_from_history()
+        for domain in sorted(learned, key=learned.get, reverse=True)[:20]:
+            pattern, confidence = best_pattern(domain)
+            self.stdout.write(f"  {domain}: {pattern} ({confidence}%, {learned[domain]} emails)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Learned patterns for {len(learned)} domains"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from parser_controler.profile_index import rebuild_profile_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the Redis index of known LinkedIn profile URLs from ParsingInfo'
+
+    def handle(self, *args, **options):
+        self.stdout.write("📇 Rebuilding profile index...")
+        count = rebuild_profile_index()
+        if count is None:
+            self.stdout.write(self.style.WARNING("⚠️ Another rebuild is already running"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {count} known profiles"))
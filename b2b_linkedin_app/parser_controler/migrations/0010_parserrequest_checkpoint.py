@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parser_controler', '0009_parserrequest_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parserrequest',
+            name='checkpoint',
+            field=models.JSONField(blank=True, help_text='Search cursor saved while parsing (page, pending cards, enrichment cursor)', null=True),
+        ),
+    ]
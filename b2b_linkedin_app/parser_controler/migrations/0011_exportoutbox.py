@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-16 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parser_controler', '0010_parserrequest_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destination', models.CharField(choices=[('sheets', 'Google Sheets'), ('csv', 'CSV')], default='sheets', max_length=20)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exported_at', models.DateTimeField(blank=True, null=True)),
+                ('parsing_info', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exports', to='parser_controler.parsinginfo')),
+            ],
+            options={
+                'verbose_name': 'Export Outbox',
+                'verbose_name_plural': 'Export Outbox',
+                'indexes': [models.Index(fields=['destination', 'status', 'id'], name='export_outbox_queue_idx')],
+                'unique_together': {('parsing_info', 'destination')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-16 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parser_controler', '0011_exportoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportoutbox',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a drainer claimed the row (in_progress)', null=True),
+        ),
+        migrations.AlterField(
+            model_name='exportoutbox',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In progress'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
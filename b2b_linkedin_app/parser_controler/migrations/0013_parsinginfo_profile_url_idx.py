@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-16 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parser_controler', '0012_exportoutbox_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='parsinginfo',
+            index=models.Index(fields=['profile_url'], name='parsing_info_profile_url_idx'),
+        ),
+    ]
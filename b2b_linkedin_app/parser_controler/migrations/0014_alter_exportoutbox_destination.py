@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parser_controler', '0013_parsinginfo_profile_url_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportoutbox',
+            name='destination',
+            field=models.CharField(choices=[('sheets', 'Google Sheets')], default='sheets', max_length=20),
+        ),
+    ]
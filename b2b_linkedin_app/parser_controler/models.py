@@ -48,6 +48,13 @@ class ParserRequest(models.Model):
     # Error handling
     error_message = models.TextField(null=True, blank=True)
     
+    # Resume support
+    checkpoint = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Search cursor saved while parsing (page, pending cards, enrichment cursor)"
+    )
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Parser Request"
@@ -82,6 +89,11 @@ class ParserRequest(models.Model):
             return (end_time - self.started_at).total_seconds()
         return 0
     
+    @property
+    def can_resume(self):
+        """A checkpoint exists and the request is not currently running (see tasks.can_resume_request for stale runs)"""
+        return bool(self.checkpoint) and self.status != 'running'
+    
     @property
     def progress_percentage(self):
         """Calculate progress percentage based on pages"""
@@ -129,6 +141,9 @@ class ParsingInfo(models.Model):
         
         # Prevent duplicate profiles within the same request
         unique_together = ['parser_request', 'full_name', 'company_name']
+        indexes = [
+            models.Index(fields=['profile_url'], name='parsing_info_profile_url_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} @ {self.company_name or 'Unknown Company'}"
@@ -150,4 +165,42 @@ class ParsingInfo(models.Model):
     @property
     def assigned_user(self):
         """Get the user assigned to this parsing info through the parser request"""
-        return self.parser_request.user if self.parser_request else self.creator
\ No newline at end of file
+        return self.parser_request.user if self.parser_request else self.creator
+
+class ExportOutbox(models.Model):
+    """One pending/finished export of a ParsingInfo row to an external destination"""
+    DESTINATION_CHOICES = [
+        ('sheets', 'Google Sheets'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('in_progress', 'In progress'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    parsing_info = models.ForeignKey(
+        ParsingInfo,
+        on_delete=models.CASCADE,
+        related_name='exports'
+    )
+    destination = models.CharField(max_length=20, choices=DESTINATION_CHOICES, default='sheets')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When a drainer claimed the row (in_progress)")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    exported_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Export Outbox"
+        verbose_name_plural = "Export Outbox"
+        unique_together = ['parsing_info', 'destination']
+        indexes = [
+            models.Index(fields=['destination', 'status', 'id'], name='export_outbox_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.parsing_info_id} -> {self.destination} ({self.status})"
@@ -0,0 +1,176 @@
+# parser_controler/profile_index.py - Redis index of profile URLs we already have
+import logging
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlsplit
+
+import redis
+
+from .models import ParsingInfo
+
+logger = logging.getLogger(__name__)
+
+KNOWN_PROFILES_KEY = "known_profile_urls"
+INDEX_BUILT_KEY = "known_profile_urls:built"
+INDEX_REBUILD_QUEUED_KEY = "known_profile_urls:rebuild_queued"
+INDEX_REBUILD_LOCK = "known_profile_urls:rebuild_lock"
+INDEX_REBUILD_INTERVAL = 24 * 3600  # resync with the DB once a day
+REBUILD_BATCH_SIZE = 5000
+REBUILD_LOCK_TIMEOUT = 30 * 60
+
+
+def get_redis():
+    return redis.Redis(host="redis", port=6379, decode_responses=True)
+
+
+def normalize_profile_url(url: str) -> str:
+    """https://www.linkedin.com/in/John-Doe/?miniProfileUrn=... -> linkedin.com/in/john-doe"""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def profile_url_variants(url: str) -> Set[str]:
+    """Spellings a stored profile_url can have for this profile (scheme, www., trailing slash, case)"""
+    if not url:
+        return set()
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+
+    variants = set()
+    for scheme in ("https", "http"):
+        for netloc in (f"www.{host}", host):
+            for variant_path in (path, path.lower()):
+                base = f"{scheme}://{netloc}{variant_path}"
+                variants.update((base, f"{base}/"))
+    return variants
+
+
+def rebuild_profile_index(r=None) -> Optional[int]:
+    """
+    Reload the index from every stored ParsingInfo.profile_url.
+    Only one rebuild runs at a time; returns None if another one holds the lock.
+    """
+    r = r or get_redis()
+    lock = r.lock(INDEX_REBUILD_LOCK, timeout=REBUILD_LOCK_TIMEOUT, blocking_timeout=0)
+    if not lock.acquire():
+        logger.info("📇 Profile index rebuild already running - skipping")
+        return None
+    try:
+        return _rebuild_profile_index(r)
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
+
+
+def _rebuild_profile_index(r) -> int:
+    tmp_key = f"{KNOWN_PROFILES_KEY}:rebuild"
+    r.delete(tmp_key)
+
+    count = 0
+    batch = []
+    urls = ParsingInfo.objects.exclude(profile_url__isnull=True).exclude(profile_url="").values_list("profile_url", flat=True)
+    for url in urls.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        normalized = normalize_profile_url(url)
+        if normalized:
+            batch.append(normalized)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            count += r.sadd(tmp_key, *batch)
+            batch = []
+    if batch:
+        count += r.sadd(tmp_key, *batch)
+
+    # Swap in atomically so lookups never see a half-built index
+    pipe = r.pipeline()
+    if count:
+        pipe.rename(tmp_key, KNOWN_PROFILES_KEY)
+    else:
+        pipe.delete(KNOWN_PROFILES_KEY)
+    pipe.set(INDEX_BUILT_KEY, 1, ex=INDEX_REBUILD_INTERVAL)
+    pipe.delete(INDEX_REBUILD_QUEUED_KEY)
+    pipe.execute()
+
+    logger.info(f"📇 Profile index rebuilt with {count} known profiles")
+    return count
+
+
+def ensure_profile_index(r=None):
+    """
+    Queue a background rebuild when the index is missing or stale (at most one queued at a time).
+    Lookups keep using the current set meanwhile; they never rebuild inline.
+    """
+    r = r or get_redis()
+    if r.exists(INDEX_BUILT_KEY) or not r.set(INDEX_REBUILD_QUEUED_KEY, 1, nx=True, ex=REBUILD_LOCK_TIMEOUT):
+        return
+    from parser_controler.tasks import rebuild_known_profile_index
+    rebuild_known_profile_index.delay()
+
+
+def find_known_profiles(urls: Iterable[str]) -> Set[str]:
+    """The subset of urls that already exist in ParsingInfo (empty if Redis is unavailable)"""
+    urls = [url for url in urls if url]
+    if not urls:
+        return set()
+    try:
+        r = get_redis()
+        ensure_profile_index(r)
+        pipe = r.pipeline()
+        for url in urls:
+            pipe.sismember(KNOWN_PROFILES_KEY, normalize_profile_url(url))
+        return {url for url, known in zip(urls, pipe.execute()) if known}
+    except Exception as e:
+        logger.warning(f"Profile index lookup failed: {e}")
+        return set()
+
+
+def add_known_profile(url: str):
+    if not url:
+        return
+    try:
+        get_redis().sadd(KNOWN_PROFILES_KEY, normalize_profile_url(url))
+    except Exception as e:
+        logger.warning(f"Failed to add profile to index: {e}")
+
+
+def add_known_profiles(urls: Iterable[str]):
+    normalized = [normalize_profile_url(url) for url in urls if url]
+    if not normalized:
+        return
+    try:
+        get_redis().sadd(KNOWN_PROFILES_KEY, *normalized)
+    except Exception as e:
+        logger.warning(f"Failed to add profiles to index: {e}")
+
+
+def get_stored_profiles(urls: Iterable[str]) -> Dict[str, dict]:
+    """
+    Latest stored data for each known url, keyed by the url as given.
+    Profiles with an email win over newer ones without.
+    """
+    wanted = {normalize_profile_url(url): url for url in urls if url}
+    if not wanted:
+        return {}
+
+    # Exact matches on the indexed column, over every spelling a stored URL can have
+    variants = set()
+    for url in wanted.values():
+        variants |= profile_url_variants(url)
+
+    stored = {}
+    rows = ParsingInfo.objects.filter(profile_url__in=variants).order_by("-created_at").values("full_name", "position", "company_name", "email", "profile_url")
+    for row in rows:
+        url = wanted.get(normalize_profile_url(row["profile_url"]))
+        if not url:
+            continue
+        current = stored.get(url)
+        if current is None or (not current["email"] and row["email"]):
+            stored[url] = row
+    return stored
@@ -5,13 +5,12 @@ import json
 
 logger = logging.getLogger(__name__)
 
-def setup_periodic_tasks(sender, **kwargs):
-    task_name = 'start_parsing'
-    periodic_name = 'Start Parsing Daily'
 
-    schedule, created = IntervalSchedule.objects.get_or_create(
-        every=1,
-        period=IntervalSchedule.DAYS
+def _ensure_periodic_task(periodic_name, task_name, every, period):
+    """Create the beat entry for a task once (an existing entry keeps any admin edits)"""
+    schedule, _ = IntervalSchedule.objects.get_or_create(
+        every=every,
+        period=period
     )
 
     task, created = PeriodicTask.objects.get_or_create(
@@ -29,3 +28,22 @@ def setup_periodic_tasks(sender, **kwargs):
         logger.info(f"Periodic task '{periodic_name}' created.")
     else:
         logger.info(f"Periodic task '{periodic_name}' already exists.")
+    return task
+
+
+def setup_periodic_tasks(sender, **kwargs):
+    _ensure_periodic_task('Start Parsing Daily', 'start_parsing', 1, IntervalSchedule.DAYS)
+
+
+def setup_background_tasks(sender, **kwargs):
+    """Register the periodic maintenance tasks (post_migrate receiver)"""
+    from django.conf import settings
+
+    _ensure_periodic_task('Drain Export Outbox', 'drain_export_outbox', 1, IntervalSchedule.MINUTES)
+    _ensure_periodic_task('Archive To Parquet Daily', 'archive_to_parquet', 1, IntervalSchedule.DAYS)
+    _ensure_periodic_task(
+        'Dispatch Mail Queue', 'dispatch_mail_queue',
+        getattr(settings, 'MAIL_DISPATCH_TICK_SECONDS', 10), IntervalSchedule.SECONDS
+    )
+    _ensure_periodic_task('Learn Email Patterns Daily', 'learn_email_patterns', 1, IntervalSchedule.DAYS)
+    _ensure_periodic_task('Rebuild Profile Index Daily', 'rebuild_profile_index', 1, IntervalSchedule.DAYS)
@@ -4,26 +4,39 @@ import random
 import logging
 import time
 
+from django.conf import settings
 from django.core.cache import cache
 from django_redis import get_redis_connection
 from django.utils import timezone
 
 from celery import shared_task
+from celery.signals import worker_process_shutdown
 from redis.lock import Lock
 from redis.client import Redis
 import redis
 
 from authorization.models import User
-from mailer.models import MessagesBlueprintText
-from mailer.tasks import smtp_send_mail
+from mailer.outreach import OutreachPlanner
 
-from parser_controler.utils import save_parsing_info, WebSocketBroadcaster
-from parser.engine.linkedin.search_profiles import search_linkedin_profiles
-from parser_controler.models import ParserRequest, ParsingInfo
+from parser_controler.utils import save_parsing_infos, save_parsing_checkpoint, get_request_counters, WebSocketBroadcaster
+from parser.engine.linkedin.search_profiles import iter_linkedin_profiles, SearchInterrupted
+from parser.engine.linkedin.driver_pool import driver_pool
+from parser_controler.models import ParserRequest
+from parser_controler.profile_index import rebuild_profile_index
 from exporter.google_sheets_exporter import GoogleSheetsExporter
+from exporter.outbox import drain_outbox, get_outbox_destinations
+from exporter.parquet_archive import archive_all
+from parser.engine.linkedin.search_options.email_patterns import rebuild_patterns_from_history
 
 logger = logging.getLogger(__name__)
 
+
+@worker_process_shutdown.connect
+def close_pooled_drivers(**kwargs):
+    """Quit warm Chrome drivers when the worker process exits"""
+    driver_pool.shutdown()
+
+
 @shared_task(bind=True, name="export_to_google_sheets", max_retries=3)
 def export_to_google_sheets(self, profile_data, parser_request_id=None):
     """
@@ -37,10 +50,13 @@ def export_to_google_sheets(self, profile_data, parser_request_id=None):
         logger.info(f"📊 Exporting to Google Sheets: {profile_data.get('full_name', 'Unknown')}")
         
         # Initialize the exporter
-        exporter = GoogleSheetsExporter()
+        exporter = GoogleSheetsExporter(parser_request_id=parser_request_id)
         
-        # Write the profile to Google Sheets
-        exporter.write_profile(profile_data)
+        # Write the profile to Google Sheets (upsert mode makes retries safe)
+        if getattr(settings, 'GSHEET_EXPORT_MODE', 'upsert') == 'upsert':
+            exporter.upsert_batch([profile_data])
+        else:
+            exporter.write_profile(profile_data)
         
         logger.info(f"✅ Successfully exported to Google Sheets: {profile_data.get('full_name', 'Unknown')}")
         
@@ -65,7 +81,7 @@ def export_to_google_sheets(self, profile_data, parser_request_id=None):
                 "profile_name": profile_data.get('full_name', 'Unknown')
             }
 
-@shared_task(bind=True, name="batch_export_to_google_sheets")
+@shared_task(bind=True, name="batch_export_to_google_sheets", max_retries=3)
 def batch_export_to_google_sheets(self, profiles_data, parser_request_id=None):
     """
     Export multiple profiles to Google Sheets in a batch
@@ -77,49 +93,117 @@ def batch_export_to_google_sheets(self, profiles_data, parser_request_id=None):
     try:
         logger.info(f"📊 Batch exporting {len(profiles_data)} profiles to Google Sheets")
         
-        exporter = GoogleSheetsExporter()
-        
-        successful_exports = 0
-        failed_exports = 0
+        exporter = GoogleSheetsExporter(parser_request_id=parser_request_id)
         
-        for i, profile_data in enumerate(profiles_data):
-            try:
-                exporter.write_profile(profile_data)
-                successful_exports += 1
-                logger.info(f"✅ Exported {i+1}/{len(profiles_data)}: {profile_data.get('full_name', 'Unknown')}")
-                
-                # Small delay to avoid hitting Google API rate limits
-                if i > 0 and i % 10 == 0:  # Every 10 profiles
-                    time.sleep(1)
-                    
-            except Exception as profile_error:
-                failed_exports += 1
-                logger.error(f"❌ Failed to export profile {i+1}: {profile_error}")
-                continue
+        # Upsert by profile_url so retries and re-runs don't duplicate rows; append mode
+        # writes the whole batch with one append_rows call
+        if getattr(settings, 'GSHEET_EXPORT_MODE', 'upsert') == 'upsert':
+            result = exporter.upsert_batch(profiles_data)
+        else:
+            result = exporter.write_batch(profiles_data, batch_size=max(len(profiles_data), 1))
         
-        logger.info(f"📊 Batch export completed: {successful_exports} successful, {failed_exports} failed")
+        logger.info(f"📊 Batch export completed: {result['count']} rows written")
         
         return {
             "success": True,
             "total_profiles": len(profiles_data),
-            "successful_exports": successful_exports,
-            "failed_exports": failed_exports
+            "successful_exports": result["count"],
+            "unchanged": result.get("unchanged", 0),
+            "failed_exports": len(profiles_data) - result["count"] - result.get("unchanged", 0)
         }
         
     except Exception as e:
         logger.error(f"❌ Batch export to Google Sheets failed: {e}")
+        
+        if self.request.retries < self.max_retries:
+            logger.info(f"🔄 Retrying batch Google Sheets export (attempt {self.request.retries + 1})")
+            raise self.retry(countdown=60 * (2 ** self.request.retries), exc=e)
+        
         return {
             "success": False,
             "error": str(e),
             "total_profiles": len(profiles_data)
         }
 
+@shared_task(bind=True, name="drain_export_outbox")
+def drain_export_outbox(self, destination=None, batch_size=None):
+    """
+    Export pending ExportOutbox rows in bulk (periodic, and triggered after each saved batch).
+    Runs for every configured destination unless one is given.
+    """
+    results = {}
+    for name in ([destination] if destination else get_outbox_destinations()):
+        try:
+            results[name] = drain_outbox(name, batch_size=batch_size)
+        except Exception as e:
+            logger.error(f"❌ Draining export outbox for {name} failed: {e}")
+            results[name] = {"error": str(e)}
+    return results
+
+
+@shared_task(bind=True, name="learn_email_patterns")
+def learn_email_patterns(self):
+    """Relearn per-domain email patterns from delivered / read outreach (daily)"""
+    learned = rebuild_patterns_from_history()
+    return {"domains": len(learned), "emails": sum(learned.values())}
+
+
+@shared_task(bind=True, name="rebuild_profile_index")
+def rebuild_known_profile_index(self):
+    """Resync the Redis index of known profile URLs with ParsingInfo (daily, or when it expired)"""
+    count = rebuild_profile_index()
+    return {"skipped": True} if count is None else {"profiles": count}
+
+
 LOCK_EXPIRE = 60 * 60  # 1 hour
 
+
+def parsing_lock_name(parser_request_id):
+    return f"start_parsing_lock_{parser_request_id}"
+
+
+def is_stale_run(parser_request):
+    """Marked running, but its worker is gone (task lock released or older than the lock timeout)"""
+    if parser_request.status != 'running':
+        return False
+    if not parser_request.started_at or (timezone.now() - parser_request.started_at).total_seconds() > LOCK_EXPIRE:
+        return True
+    try:
+        redis_conn = redis.StrictRedis(host="redis", port=6379, db=0)
+        return not redis_conn.exists(parsing_lock_name(parser_request.id))
+    except Exception:
+        return False
+
+
+def can_resume_request(parser_request):
+    """A checkpoint exists and the request is stopped, or its run is stale"""
+    return parser_request.can_resume or (bool(parser_request.checkpoint) and is_stale_run(parser_request))
+
+
+@shared_task(bind=True, name="archive_to_parquet")
+def archive_to_parquet(self, tables=None, batch_size=None):
+    """Append new ParsingInfo / ParserRequest rows to the Parquet archive (daily)"""
+    redis_conn = redis.StrictRedis(host="redis", port=6379, db=0)
+    lock = redis_conn.lock("archive_to_parquet_lock", timeout=LOCK_EXPIRE, blocking_timeout=0)
+    if not lock.acquire():
+        logger.info("🗄️ Parquet archive already running - skipping")
+        return {"skipped": True}
+    try:
+        return archive_all(tables, batch_size=batch_size)
+    except Exception as e:
+        logger.error(f"❌ Parquet archive failed: {e}")
+        raise
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            pass
+
+
 @shared_task(bind=True, name="start_parsing")
-def start_parsing(self, keywords, location, limit, start_page, end_page, parser_request_id=None, user_email=None, creator_email=None, creator_id=None):
+def start_parsing(self, keywords, location, limit, start_page, end_page, parser_request_id=None, user_email=None, creator_email=None, creator_id=None, resume=False):
     redis_conn = redis.StrictRedis(host="redis", port=6379, db=0)
-    lock = redis_conn.lock(f"start_parsing_lock_{parser_request_id}", timeout=LOCK_EXPIRE)
+    lock = redis_conn.lock(parsing_lock_name(parser_request_id), timeout=LOCK_EXPIRE)
 
     logger.info(f"Starting parsing task for request ID: {parser_request_id}")
     
@@ -140,20 +224,31 @@ def start_parsing(self, keywords, location, limit, start_page, end_page, parser_
 
             # Get the parser request object for updates
             parser_request = None
+            checkpoint = None
             if parser_request_id:
                 try:
                     parser_request = ParserRequest.objects.get(id=parser_request_id)
+                    
+                    # Resume mode continues from the saved checkpoint, otherwise start clean
+                    if resume and parser_request.checkpoint:
+                        checkpoint = parser_request.checkpoint
+                        logger.info(f"♻️ Resuming request {parser_request_id} from page {checkpoint.get('page')}")
+                    elif resume:
+                        logger.warning(f"No checkpoint saved for request {parser_request_id} - starting from scratch")
+                    
                     parser_request.status = 'running'
-                    parser_request.current_page = start_page
+                    parser_request.current_page = checkpoint.get('page', start_page) if checkpoint else start_page
                     parser_request.started_at = timezone.now()
-                    parser_request.save(update_fields=['status', 'current_page', 'started_at'])
+                    parser_request.completed_at = None
+                    parser_request.checkpoint = checkpoint
+                    parser_request.save(update_fields=['status', 'current_page', 'started_at', 'completed_at', 'checkpoint'])
                     logger.info(f"Parser request {parser_request_id} status set to 'running'")
                     
                     if broadcaster:
                         broadcaster.send_update(
                             action='status_changed',
-                            message='Status updated to running',
-                            data={'status': 'running', 'current_page': start_page}
+                            message='Status updated to running' + (' (resumed)' if checkpoint else ''),
+                            data={'status': 'running', 'current_page': parser_request.current_page, 'resumed': bool(checkpoint)}
                         )
                         
                 except ParserRequest.DoesNotExist:
@@ -195,157 +290,176 @@ def start_parsing(self, keywords, location, limit, start_page, end_page, parser_
                         data={'phase': 'initialization'}
                     )
                 
-                # Call search function with WebSocket support
-                profiles = search_linkedin_profiles(
+                # REAL-TIME PROCESSING: Save profiles as soon as the search yields them
+                # (a resumed request keeps counting from what it already saved)
+                saved_count = parser_request.profiles_found if checkpoint else 0
+                emails_count = parser_request.emails_extracted if checkpoint else 0
+                sheets_exported_count = 0  # 🔥 FIX: Initialize this variable
+                processed_count = 0
+                
+                if broadcaster:
+                    broadcaster.send_update(
+                        action='saving_started',
+                        message='Saving profiles to database and Google Sheets as they are found...',
+                        data={'total_to_save': limit}
+                    )
+                
+                # The search checkpoint is only persisted once the profiles it covers are saved
+                latest_checkpoint = {}
+                
+                def remember_checkpoint(state):
+                    latest_checkpoint["state"] = state
+                
+                # Stream profiles from the search engine with WebSocket support
+                profiles = iter_linkedin_profiles(
                     keywords=keywords,
                     location=location,
                     limit=limit,
                     start_page=start_page,
                     end_page=end_page,
-                    parser_request_id=parser_request_id  # ✅ This enables WebSocket!
+                    parser_request_id=parser_request_id,  # ✅ This enables WebSocket!
+                    resume_from=checkpoint,
+                    on_checkpoint=remember_checkpoint if parser_request_id else None
                 )
                 
-                logger.info(f"✅ Search completed with {len(profiles)} profiles")
+                # Blueprints for automatic emails are loaded once per run and assigned in memory
+                user = User.objects.filter(email=user_email).first() if user_email else None
+                outreach = OutreachPlanner.for_user(user)
                 
-                if broadcaster:
-                    broadcaster.send_update(
-                        action='search_completed',
-                        message=f'Search completed! Found {len(profiles)} profiles',
-                        data={'total_profiles': len(profiles), 'phase': 'saving'}
-                    )
-
-                # REAL-TIME PROCESSING: Save profiles one by one with progress updates
-                saved_count = 0
-                emails_count = 0
-                sheets_exported_count = 0  # 🔥 FIX: Initialize this variable
+                batch = []
+                batch_size = getattr(settings, 'PARSING_SAVE_BATCH_SIZE', 10)
+                flush_interval = getattr(settings, 'PARSING_SAVE_FLUSH_INTERVAL', 30)
+                last_flush = time.time()
                 
-                if broadcaster:
-                    broadcaster.send_update(
-                        action='saving_started',
-                        message='Starting to save profiles to database and Google Sheets...',
-                        data={'total_to_save': len(profiles)}
+                def flush_batch():
+                    nonlocal saved_count, emails_count, sheets_exported_count, last_flush
+                    last_flush = time.time()
+                    if not batch:
+                        return
+                    
+                    # Save to DATABASE first - one bulk upsert for the whole batch
+                    outcomes = save_parsing_infos(
+                        batch,
+                        parser_request_id=parser_request_id,
+                        creator_email=creator_email,
+                        creator_id=creator_id,
+                        export=True,
+                        raise_errors=True,
                     )
+                    
+                    to_export = []
+                    for outcome in outcomes:
+                        profile = outcome["profile"]
+                        result = outcome["instance"]
+                        if outcome["status"] == "skipped":
+                            logger.warning(f"⚠️ Profile not saved: {profile.get('name', 'Unknown')}")
+                            continue
+                        if outcome["status"] == "existing":
+                            logger.info(f"ℹ️ Profile already exists: {profile.get('name', 'Unknown')}")
+                            continue
+                        
+                        if outcome["status"] == "created":
+                            saved_count += 1
+                        
+                        if outcome["email_added"]:
+                            emails_count += 1
+                            
+                            # Send email if configured
+                            if outreach:
+                                outreach.add(result.id)
+                        
+                        to_export.append(result.id)
+                        
+                        logger.info(f"✅ SAVED profile #{saved_count}: {result.full_name} @ {result.company_name or 'Unknown'}")
+                    
+                    # Queue this batch's emails (sent over a single SMTP connection)
+                    if outreach:
+                        outreach.flush()
+                    
+                    # 🔥 GOOGLE SHEETS EXPORT - rows were queued in the outbox with the save, drain it now
+                    if to_export:
+                        sheets_exported_count += len(to_export)
+                        drain_export_outbox.delay()
+                    
+                    # Update database once per batch for the real-time dashboard
+                    if parser_request_id:
+                        # The search engine reports the page each profile came from
+                        current_page = min(batch[-1].get("page") or start_page, end_page)
+                        
+                        # profiles_found / emails_extracted are already incremented by the save
+                        ParserRequest.objects.filter(id=parser_request_id).update(current_page=current_page)
+                        if latest_checkpoint:
+                            save_parsing_checkpoint(parser_request_id, latest_checkpoint["state"])
+                        
+                        # Send progress update with Google Sheets info
+                        if broadcaster:
+                            total_saved, total_emails = get_request_counters(parser_request_id)
+                            broadcaster.send_update(
+                                action='progress_update',
+                                message=f'Progress: {total_saved} profiles saved, {total_emails} with emails, {sheets_exported_count} queued for Sheets',
+                                data={
+                                    'saved_count': total_saved,
+                                    'emails_count': total_emails,
+                                    'sheets_exported_count': sheets_exported_count,
+                                    'current_page': current_page,
+                                    'progress_percentage': min(100, round(processed_count / limit * 100, 1)) if limit else 0
+                                }
+                            )
+                    
+                    batch.clear()
                 
-                for i, profile in enumerate(profiles):
-                    try:
+                try:
+                    for i, profile in enumerate(profiles):
+                        processed_count = i + 1
+                    
                         # Send progress update before saving
                         if broadcaster:
                             broadcaster.send_update(
                                 action='saving_profile',
-                                message=f'Saving profile {i+1}/{len(profiles)}: {profile.get("name", "Unknown")}',
+                                message=f'Saving profile {i+1}/{limit}: {profile.get("name", "Unknown")}',
                                 data={
                                     'current_index': i+1,
-                                    'total': len(profiles),
+                                    'total': limit,
                                     'profile_name': profile.get("name", "Unknown"),
                                     'company': profile.get("company", "Unknown")
                                 }
                             )
-                        
-                        # Save to DATABASE first
-                        result = save_parsing_info(
-                            full_name=profile.get("name", ""),
-                            position=profile.get("position", ""),
-                            company_name=profile.get("company", ""),
-                            email=profile.get("email", None),
-                            profile_url=profile.get("profile_url", None),
-                            parser_request_id=parser_request_id,
-                            creator_email=creator_email,
-                            creator_id=creator_id,
-                        )
-                        
-                        if result:
-                            saved_count += 1
-                            if profile.get("email"):
-                                emails_count += 1
-                                
-                                # Send email if configured
-                                user = User.objects.filter(email=user_email).first()
-                                message_blueprint_obj = MessagesBlueprintText.objects.filter(
-                                    creator=user
-                                ).order_by("?").first() if user else None
-
-                                if message_blueprint_obj:
-                                    smtp_send_mail.delay(message_blueprint_obj.id, result.id)
-                            
-                            # 🔥 GOOGLE SHEETS EXPORT
-                            try:
-                                # Prepare data for Google Sheets (matching your exporter format)
-                                sheets_data = {
-                                    "full_name": profile.get("name", ""),
-                                    "position": profile.get("position", ""),
-                                    "company_name": profile.get("company", ""),
-                                    "email": profile.get("email", ""),
-                                    "profile_url": profile.get("profile_url", ""),
-                                }
-                                
-                                # Call the Google Sheets export task asynchronously
-                                export_result = export_to_google_sheets.delay(
-                                    profile_data=sheets_data,
-                                    parser_request_id=parser_request_id
-                                )
-                                
-                                # Optional: Wait for the result if you want immediate feedback
-                                try:
-                                    sheets_result = export_result.get(timeout=10)  # 10 second timeout
-                                    if sheets_result.get('success'):
-                                        sheets_exported_count += 1
-                                        logger.info(f"📊 Google Sheets export success: {profile.get('name', 'Unknown')}")
-                                        
-                                        if broadcaster:
-                                            broadcaster.send_log('INFO', 'SHEETS', f'✅ Exported to Google Sheets: {profile.get("name", "Unknown")}')
-                                    else:
-                                        logger.warning(f"📊 Google Sheets export failed: {sheets_result.get('error')}")
-                                        if broadcaster:
-                                            broadcaster.send_log('WARNING', 'SHEETS', f'❌ Failed to export: {profile.get("name", "Unknown")}')
-                                except Exception as timeout_error:
-                                    # If timeout, the task is still running in background
-                                    logger.info(f"📊 Google Sheets export queued (background): {profile.get('name', 'Unknown')}")
-                                    if broadcaster:
-                                        broadcaster.send_log('INFO', 'SHEETS', f'📋 Queued for export: {profile.get("name", "Unknown")}')
-                                
-                            except Exception as sheets_error:
-                                logger.error(f"📊 Error initiating Google Sheets export: {sheets_error}")
-                                if broadcaster:
-                                    broadcaster.send_log('ERROR', 'SHEETS', f'Export error: {str(sheets_error)}')
-
-                            # Update database immediately for real-time dashboard
-                            if parser_request_id:
-                                # Calculate current page based on profiles processed
-                                estimated_page = start_page + (i // 10)  # Assume ~10 profiles per page
-                                current_page = min(estimated_page, end_page)
-                                
-                                ParserRequest.objects.filter(id=parser_request_id).update(
-                                    profiles_found=saved_count,
-                                    emails_extracted=emails_count,
-                                    current_page=current_page
-                                )
-                                
-                                # Send progress update with Google Sheets info
-                                if broadcaster:
-                                    broadcaster.send_update(
-                                        action='progress_update',
-                                        message=f'Progress: {saved_count} profiles saved, {emails_count} with emails, {sheets_exported_count} exported to Sheets',
-                                        data={
-                                            'saved_count': saved_count,
-                                            'emails_count': emails_count,
-                                            'sheets_exported_count': sheets_exported_count,
-                                            'current_page': current_page,
-                                            'progress_percentage': round((i+1) / len(profiles) * 100, 1)
-                                        }
-                                    )
-                                
-                            logger.info(f"✅ SAVED profile #{saved_count}: {profile.get('name', 'Unknown')} @ {profile.get('company', 'Unknown')}")
-                            
-                            # Small delay for real-time dashboard effect
-                            time.sleep(0.5)  # Increased slightly for Google Sheets processing
-                            
-                    except Exception as save_error:
-                        logger.error(f"❌ Error saving profile {i+1}: {save_error}")
-                        if broadcaster:
-                            broadcaster.send_log('ERROR', 'SAVE', f'Failed to save profile {i+1}: {str(save_error)}')
-                        continue
+                    
+                        # Flush when the search moved to another page, the batch is full or it waited too long
+                        try:
+                            if batch and batch[-1].get("page") != profile.get("page"):
+                                flush_batch()
+                            batch.append(profile)
+                            if len(batch) >= batch_size or time.time() - last_flush >= flush_interval:
+                                flush_batch()
+                        except Exception as save_error:
+                            # The stored checkpoint still points before the unsaved profiles, so fail the
+                            # request here - a resume collects them again
+                            logger.error(f"❌ Error saving batch ending at profile {i+1}: {save_error}")
+                            if broadcaster:
+                                broadcaster.send_log('ERROR', 'SAVE', f'Failed to save profiles up to #{i+1}: {str(save_error)}')
+                            raise
+                except SearchInterrupted:
+                    # Save what was collected so the checkpoint covers it, then fail the request below
+                    flush_batch()
+                    raise
+                finally:
+                    # Hand the browser back even when we stop consuming the search early
+                    profiles.close()
+                
+                flush_batch()
+                
+                logger.info(f"✅ Search completed with {processed_count} profiles")
+                
+                if broadcaster:
+                    broadcaster.send_update(
+                        action='search_completed',
+                        message=f'Search completed! Processed {processed_count} profiles',
+                        data={'total_profiles': processed_count, 'phase': 'finalizing'}
+                    )
 
             except Exception as search_error:
+                # The checkpoint is kept so the request can be resumed
                 logger.error(f"❌ Search error: {search_error}")
                 
                 if broadcaster:
@@ -366,28 +480,22 @@ def start_parsing(self, keywords, location, limit, start_page, end_page, parser_
 
             # Final statistics update
             if parser_request_id and parser_request:
-                # Get final counts from database
-                final_total = ParsingInfo.objects.filter(parser_request=parser_request).count()
-                final_emails = ParsingInfo.objects.filter(
-                    parser_request=parser_request,
-                    email__isnull=False
-                ).exclude(email='').count()
-
+                # Final counts are the counters kept up to date by every save
                 ParserRequest.objects.filter(id=parser_request_id).update(
                     status='completed',
                     completed_at=timezone.now(),
-                    profiles_found=final_total,
-                    emails_extracted=final_emails,
-                    current_page=end_page
+                    current_page=end_page,
+                    checkpoint=None
                 )
+                final_total, final_emails = get_request_counters(parser_request_id)
 
-                logger.info(f"🎉 Parsing completed successfully. Found {final_total} profiles, {final_emails} with emails, {sheets_exported_count} exported to Google Sheets.")
+                logger.info(f"🎉 Parsing completed successfully. Found {final_total} profiles, {final_emails} with emails, {sheets_exported_count} queued for Google Sheets.")
                 
                 # Send final completion update
                 if broadcaster:
                     broadcaster.send_update(
                         action='parsing_completed',
-                        message=f'🎉 Parsing completed! Found {final_total} profiles, {final_emails} with emails, {sheets_exported_count} exported to Sheets',
+                        message=f'🎉 Parsing completed! Found {final_total} profiles, {final_emails} with emails, {sheets_exported_count} queued for Sheets',
                         data={
                             'final_total': final_total,
                             'final_emails': final_emails,
@@ -18,6 +18,7 @@ from .views import (
     dashboard_view,
     api_parsing_status,
     api_active_containers,
+    export_profiles,
     websocket_config_test,
     websocket_test_view,
     
@@ -51,6 +52,7 @@ urlpatterns = [
     path('dashboard/<int:request_id>/', dashboard_view, name='parsing-dashboard'),
     path('api/parsing-status/<int:request_id>/', api_parsing_status, name='api-parsing-status'),
     path('api/active-containers/', api_active_containers, name='api-active-containers'),
+    path('api/export/profiles/', export_profiles, name='api-export-profiles'),
     
     # Legacy compatibility (deprecated but maintained)
     path("start-captcha-container/", start_automated_captcha_solver, name="legacy_start_captcha"),
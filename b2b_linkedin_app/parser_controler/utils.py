@@ -1,10 +1,14 @@
 # parser_controler/utils.py - Enhanced for real-time updates
 from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Count
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 import logging
 
 from .models import ParsingInfo, ParserRequest
+from .profile_index import add_known_profile, add_known_profiles
+from exporter.outbox import enqueue_exports
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -58,6 +62,51 @@ class WebSocketBroadcaster:
                 logger.warning(f"Failed to send WebSocket log: {e}")
 
 
+def resolve_creator(creator_id=None, creator_email=None):
+    """Creator by id, then by email, falling back to a superuser / any user"""
+    creator = None
+
+    # FIXED: Try creator_id first, then creator_email
+    if creator_id:
+        try:
+            creator = User.objects.get(id=creator_id)
+            logger.info(f"✅ Found creator by ID: {creator.email}")
+        except User.DoesNotExist:
+            logger.warning(f"User with ID '{creator_id}' not found")
+    
+    if not creator and creator_email:
+        try:
+            creator = User.objects.get(email=creator_email)
+            logger.info(f"✅ Found creator by email: {creator.email}")
+        except User.DoesNotExist:
+            logger.warning(f"User with email '{creator_email}' not found")
+    
+    # CRITICAL: Fallback if no creator found
+    if not creator:
+        creator = User.objects.filter(is_superuser=True).first()
+        if not creator:
+            creator = User.objects.first()
+            if not creator:
+                logger.error("NO USERS FOUND IN DATABASE!")
+                return None
+        logger.warning(f"⚠️ Using fallback creator: {creator.email}")
+
+    return creator
+
+
+def clean_profile_fields(full_name, position, company_name, email=None, profile_url=None):
+    full_name = str(full_name).strip() if full_name else ''
+    position = str(position).strip() if position else ''
+    company_name = str(company_name).strip() if company_name else ''
+    email = str(email).strip() if email else None
+    profile_url = str(profile_url).strip() if profile_url else None
+
+    if email and (email.lower() in ['none', 'null', '', 'not found', 'n/a'] or '@' not in email):
+        email = None
+
+    return full_name, position, company_name, email, profile_url
+
+
 def save_parsing_info(full_name, position, company_name, email=None, profile_url=None, parser_request_id=None, creator_email=None, creator_id=None):
     try:
         parser_request = None
@@ -71,44 +120,18 @@ def save_parsing_info(full_name, position, company_name, email=None, profile_url
             except ParserRequest.DoesNotExist:
                 logger.warning(f"Parser request {parser_request_id} not found")
 
-        # FIXED: Try creator_id first, then creator_email
-        if creator_id:
-            try:
-                creator = User.objects.get(id=creator_id)
-                logger.info(f"✅ Found creator by ID: {creator.email}")
-            except User.DoesNotExist:
-                logger.warning(f"User with ID '{creator_id}' not found")
-        
-        if not creator and creator_email:
-            try:
-                creator = User.objects.get(email=creator_email)
-                logger.info(f"✅ Found creator by email: {creator.email}")
-            except User.DoesNotExist:
-                logger.warning(f"User with email '{creator_email}' not found")
-        
-        # CRITICAL: Fallback if no creator found
+        creator = resolve_creator(creator_id, creator_email)
         if not creator:
-            creator = User.objects.filter(is_superuser=True).first()
-            if not creator:
-                creator = User.objects.first()
-                if not creator:
-                    logger.error("NO USERS FOUND IN DATABASE!")
-                    return None
-            logger.warning(f"⚠️ Using fallback creator: {creator.email}")
-
-        full_name = str(full_name).strip() if full_name else ''
-        position = str(position).strip() if position else ''
-        company_name = str(company_name).strip() if company_name else ''
-        email = str(email).strip() if email else None
-        profile_url = str(profile_url).strip() if profile_url else None
+            return None
+
+        full_name, position, company_name, email, profile_url = clean_profile_fields(
+            full_name, position, company_name, email, profile_url
+        )
 
         if not full_name:
             logger.warning("Skipping profile save: no name provided")
             return None
 
-        if email and (email.lower() in ['none', 'null', '', 'not found', 'n/a'] or '@' not in email):
-            email = None
-
         with transaction.atomic():
             existing_profile = None
             if parser_request:
@@ -120,6 +143,7 @@ def save_parsing_info(full_name, position, company_name, email=None, profile_url
 
             if existing_profile:
                 updated = False
+                email_added = not existing_profile.email and bool(email)
                 if not existing_profile.email and email:
                     existing_profile.email = email
                     updated = True
@@ -134,9 +158,9 @@ def save_parsing_info(full_name, position, company_name, email=None, profile_url
                     existing_profile.updated_at = timezone.now()
                     existing_profile.save()
                     logger.info(f"✅ Updated existing profile: {full_name}")
+                    total_count, _ = increment_request_counters(parser_request.id, emails=int(email_added))
 
                     if broadcaster:
-                        total_count = ParsingInfo.objects.filter(parser_request=parser_request).count()
                         broadcaster.send_update(
                             action='profile_updated',
                             message=f'Updated: {full_name} @ {company_name or "Unknown"}',
@@ -170,9 +194,12 @@ def save_parsing_info(full_name, position, company_name, email=None, profile_url
             )
 
             logger.info(f"✅ SAVED: {full_name} @ {company_name or 'Unknown'} ({'with email' if email else 'no email'})")
+            add_known_profile(profile_url)
+            total_count = None
+            if parser_request:
+                total_count, _ = increment_request_counters(parser_request.id, profiles=1, emails=int(bool(email)))
 
             if broadcaster:
-                total_count = ParsingInfo.objects.filter(parser_request=parser_request).count()
                 broadcaster.send_update(
                     action='profile_saved',
                     message=f'Found: {full_name} @ {company_name or "Unknown"}',
@@ -194,12 +221,235 @@ def save_parsing_info(full_name, position, company_name, email=None, profile_url
         return None
 
 
+def save_parsing_infos(profiles, parser_request_id=None, creator_email=None, creator_id=None, export=False, raise_errors=False):
+    """
+    Save a batch of search profiles ({"name", "position", "company", "email", "profile_url", "page"})
+    in a handful of queries.
+
+    The request and creator are resolved once, existing rows of the request are loaded in one
+    query and filled in with bulk_update, and new rows go through one bulk_create that upserts
+    on (parser_request, full_name, company_name). Returns one outcome per input profile:
+    {"profile", "status": created|updated|existing|skipped, "instance", "email_added"}.
+    With export=True created/updated rows are queued in the export outbox in the same transaction.
+    With raise_errors=True a failed save is re-raised instead of reported as skipped outcomes.
+    """
+    outcomes = [{"profile": profile, "status": "skipped", "instance": None, "email_added": False} for profile in profiles]
+    if not profiles:
+        return outcomes
+
+    try:
+        parser_request = None
+        if parser_request_id:
+            parser_request = ParserRequest.objects.filter(id=parser_request_id).first()
+            if not parser_request:
+                logger.warning(f"Parser request {parser_request_id} not found")
+
+        creator = resolve_creator(creator_id, creator_email)
+        if not creator:
+            return outcomes
+
+        # Clean rows and drop duplicates inside the batch (same key as the unique constraint)
+        rows = {}
+        for outcome in outcomes:
+            profile = outcome["profile"]
+            full_name, position, company_name, email, profile_url = clean_profile_fields(
+                profile.get("name"), profile.get("position"), profile.get("company"),
+                profile.get("email"), profile.get("profile_url")
+            )
+            if not full_name:
+                continue
+            key = (full_name.lower(), company_name.lower())
+            if key in rows:
+                outcome["status"] = "existing"
+                rows[key]["duplicates"].append(outcome)
+                continue
+            rows[key] = {
+                "outcome": outcome,
+                "duplicates": [],
+                "fields": {
+                    "full_name": full_name,
+                    "position": position or None,
+                    "company_name": company_name or None,
+                    "email": email,
+                    "profile_url": profile_url,
+                    "page_found": profile.get("page"),
+                },
+            }
+
+        if not rows:
+            return outcomes
+
+        with transaction.atomic():
+            # One query for everything this request already has under these names
+            existing = {}
+            if parser_request:
+                names = {key[0] for key in rows}
+                for instance in ParsingInfo.objects.annotate(
+                    full_name_lower=Lower('full_name')
+                ).filter(parser_request=parser_request, full_name_lower__in=names):
+                    existing[(instance.full_name.lower(), (instance.company_name or '').lower())] = instance
+
+            to_update = []
+            to_create = []
+            now = timezone.now()
+            for key, row in rows.items():
+                fields = row["fields"]
+                outcome = row["outcome"]
+                instance = existing.get(key)
+
+                if instance is None:
+                    to_create.append((row, ParsingInfo(
+                        parser_request=parser_request,
+                        creator=creator,
+                        search_keywords=getattr(parser_request, 'keywords', None),
+                        search_location=getattr(parser_request, 'location', None),
+                        **fields
+                    )))
+                    continue
+
+                outcome["instance"] = instance
+                outcome["status"] = "existing"
+                for field in ("email", "position", "profile_url"):
+                    if not getattr(instance, field) and fields[field]:
+                        setattr(instance, field, fields[field])
+                        outcome["status"] = "updated"
+                        outcome["email_added"] = outcome["email_added"] or field == "email"
+                if outcome["status"] == "updated":
+                    instance.updated_at = now
+                    to_update.append(instance)
+
+            if to_update:
+                ParsingInfo.objects.bulk_update(to_update, ["email", "position", "profile_url", "updated_at"])
+
+            if to_create:
+                # Rows inserted concurrently by another run keep their data - only updated_at is touched
+                created = ParsingInfo.objects.bulk_create(
+                    [instance for _, instance in to_create],
+                    update_conflicts=True,
+                    unique_fields=["parser_request", "full_name", "company_name"],
+                    update_fields=["updated_at"],
+                )
+                # Merged rows keep the other run's created_at, inserted ones carry ours
+                stored = ParsingInfo.objects.in_bulk([instance.pk for instance in created])
+                inserted = []
+                for (row, _), instance in zip(to_create, created):
+                    current = stored.get(instance.pk)
+                    if current is not None and current.created_at != instance.created_at:
+                        row["outcome"]["instance"] = current
+                        row["outcome"]["status"] = "existing"
+                        continue
+                    row["outcome"]["instance"] = instance
+                    row["outcome"]["status"] = "created"
+                    row["outcome"]["email_added"] = bool(instance.email)
+                    inserted.append((row, instance))
+                to_create = inserted
+
+            if export:
+                enqueue_exports([
+                    row["outcome"]["instance"].id for row in rows.values()
+                    if row["outcome"]["status"] in ("created", "updated")
+                ])
+
+            # Keep the request's counters in step with the rows, in the same transaction
+            total_count = None
+            if parser_request:
+                total_count, _ = increment_request_counters(
+                    parser_request.id,
+                    profiles=len(to_create),
+                    emails=sum(1 for row in rows.values() if row["outcome"]["email_added"])
+                )
+
+        for row in rows.values():
+            for duplicate in row["duplicates"]:
+                duplicate["instance"] = row["outcome"]["instance"]
+
+        add_known_profiles([instance.profile_url for _, instance in to_create if instance.profile_url])
+
+        counts = {}
+        for outcome in outcomes:
+            counts[outcome["status"]] = counts.get(outcome["status"], 0) + 1
+        logger.info(f"✅ Batch saved: {counts}")
+
+        broadcaster = WebSocketBroadcaster(parser_request_id) if parser_request else None
+        if broadcaster:
+            for outcome in outcomes:
+                instance = outcome["instance"]
+                if outcome["status"] not in ("created", "updated") or not instance:
+                    continue
+                broadcaster.send_update(
+                    action='profile_saved' if outcome["status"] == "created" else 'profile_updated',
+                    message=f'{"Found" if outcome["status"] == "created" else "Updated"}: {instance.full_name} @ {instance.company_name or "Unknown"}',
+                    data={
+                        'profile_id': instance.id,
+                        'name': instance.full_name,
+                        'company': instance.company_name,
+                        'email': instance.email,
+                        'has_email': bool(instance.email),
+                        'total_count': total_count,
+                        'is_update': outcome["status"] == "updated"
+                    }
+                )
+
+    except Exception as e:
+        logger.error(f"❌ Error saving batch of {len(profiles)} profiles: {e}")
+        # The transaction was rolled back - nothing in this batch was created or updated
+        for outcome in outcomes:
+            outcome["status"] = "skipped"
+            outcome["instance"] = None
+            outcome["email_added"] = False
+        if raise_errors:
+            raise
+
+    return outcomes
+
+
+def increment_request_counters(parser_request_id, profiles=0, emails=0):
+    """
+    Atomically bump profiles_found / emails_extracted and return the new (profiles_found, emails_extracted).
+    Readers use these counters instead of counting ParsingInfo rows.
+    """
+    if profiles or emails:
+        ParserRequest.objects.filter(id=parser_request_id).update(
+            profiles_found=F('profiles_found') + profiles,
+            emails_extracted=F('emails_extracted') + emails
+        )
+    return get_request_counters(parser_request_id)
+
+
+def get_request_counters(parser_request_id):
+    counters = ParserRequest.objects.filter(id=parser_request_id).values_list('profiles_found', 'emails_extracted').first()
+    return counters or (0, 0)
+
+
+def recount_request_counters(parser_request_id):
+    """Rebuild the counters from the rows - only needed after rows are deleted or edited outside the pipeline"""
+    profiles = ParsingInfo.objects.filter(parser_request_id=parser_request_id)
+    counters = profiles.aggregate(
+        total=Count('id'),
+        with_email=Count('id', filter=Q(email__isnull=False) & ~Q(email=''))
+    )
+    ParserRequest.objects.filter(id=parser_request_id).update(
+        profiles_found=counters['total'],
+        emails_extracted=counters['with_email']
+    )
+    return counters['total'], counters['with_email']
+
+
+def save_parsing_checkpoint(parser_request_id, checkpoint):
+    """Persist the search cursor so an interrupted request can be resumed"""
+    try:
+        ParserRequest.objects.filter(id=parser_request_id).update(checkpoint=checkpoint)
+        logger.debug(f"Saved checkpoint for request {parser_request_id}: page {checkpoint.get('page') if checkpoint else None}")
+    except Exception as e:
+        logger.error(f"Error saving checkpoint: {e}")
+
+
 def get_parsing_statistics(parser_request_id):
     try:
         parser_request = ParserRequest.objects.get(id=parser_request_id)
         profiles = ParsingInfo.objects.filter(parser_request=parser_request)
-        total_profiles = profiles.count()
-        profiles_with_email = profiles.exclude(email__isnull=True).exclude(email__exact='').count()
+        total_profiles = parser_request.profiles_found
+        profiles_with_email = parser_request.emails_extracted
 
         return {
             'total_profiles': total_profiles,
@@ -255,6 +505,7 @@ def cleanup_duplicate_profiles(parser_request_id):
 
         if duplicates:
             deleted_count = ParsingInfo.objects.filter(id__in=duplicates).delete()[0]
+            recount_request_counters(parser_request_id)
             logger.info(f"Cleaned up {deleted_count} duplicate profiles")
             return deleted_count
 
@@ -13,6 +13,7 @@ import logging
 from typing import Iterator
 
 from .docker_manager import get_manager, AutomatedCaptchaHandler
+from exporter.csv_exporter import EXPORT_FORMATS, filter_parsing_infos, stream_export_response
 from parser.engine.core.captcha_handler import FullyAutomatedCaptchaHandler
 
 logger = logging.getLogger(__name__)
@@ -550,9 +551,9 @@ def api_parsing_status(request, request_id):
             parser_request=parser_request
         ).order_by('-id')  # Newest first for real-time feel
         
-        # Calculate statistics
-        total_profiles = profiles.count()
-        profiles_with_email = profiles.exclude(email__isnull=True).exclude(email__exact='').count()
+        # Statistics come from the counters maintained on every save
+        total_profiles = parser_request.profiles_found
+        profiles_with_email = parser_request.emails_extracted
         success_rate = round((profiles_with_email / total_profiles * 100)) if total_profiles > 0 else 0
         
         # Get latest profiles for preview (limit to 15 most recent)
@@ -741,6 +742,39 @@ def api_parsing_status(request, request_id):
             'timestamp': time.time()
         }, status=500)
 
+@staff_member_required
+def export_profiles(request):
+    """
+    Stream profiles as CSV or NDJSON.
+    GET params: request_id, user_id, date_from, date_to, has_email, format (csv|ndjson)
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unsupported format: {fmt}'}, status=400)
+
+    # Non-superusers only ever export their own profiles
+    user = None
+    if not request.user.is_superuser:
+        user = request.user
+    elif request.GET.get('user_id'):
+        user = request.GET['user_id']
+
+    try:
+        queryset = filter_parsing_infos(
+            parser_request_id=request.GET.get('request_id'),
+            user=user,
+            date_from=request.GET.get('date_from'),
+            date_to=request.GET.get('date_to'),
+            has_email=request.GET.get('has_email'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    request_id = request.GET.get('request_id')
+    filename = f"profiles_request_{request_id}.{fmt}" if request_id else None
+    logger.info(f"📄 Streaming {fmt} export for {request.user} ({dict(request.GET)})")
+    return stream_export_response(queryset, fmt, filename=filename)
+
 def get_status_message(status, current_page, end_page):
     """Get human-readable status message"""
     if status == 'pending':